@@ -1,5 +1,9 @@
 """Interface for agents."""
 import contextlib
+import copy
+import inspect
+import os
+import threading
 from abc import ABCMeta
 from dataclasses import asdict
 
@@ -9,12 +13,18 @@ from torch.optim.optimizer import Optimizer
 from tqdm import tqdm
 
 from rllib.dataset.datatypes import Loss
+from rllib.dataset.experience_replay import ExperienceReplay
 from rllib.dataset.utilities import average_dataclass
 from rllib.policy.nn_policy import NNPolicy
 from rllib.util.early_stopping import EarlyStopping
 from rllib.util.logger import Logger
-from rllib.util.neural_networks.utilities import DisableGradient
-from rllib.util.utilities import save_random_state, tensor_to_distribution
+from rllib.util.neural_networks.utilities import DisableGradient, get_batch_size
+from rllib.util.profiler import Profiler
+from rllib.util.utilities import (
+    deterministic_sample,
+    save_random_state,
+    tensor_to_distribution,
+)
 from rllib.value_function import NNQFunction
 
 
@@ -29,6 +39,9 @@ class AbstractAgent(object, metaclass=ABCMeta):
         initial exploratory steps.
     exploration_episodes: int, optional (default=0)
         initial exploratory episodes
+    profile: bool, optional (default=False)
+        Flag that indicates whether to record the time spent in each part of the
+        interaction and the training in `profiler'.
 
     Methods
     -------
@@ -44,6 +57,8 @@ class AbstractAgent(object, metaclass=ABCMeta):
         End an interaction with an environment.
     """
 
+    _transient_attributes = ("_checkpoint_thread", "_checkpoint_error", "profiler")
+
     def __init__(
         self,
         optimizer=None,
@@ -64,6 +79,7 @@ class AbstractAgent(object, metaclass=ABCMeta):
         device="cpu",
         log_dir=None,
         name=None,
+        profile=False,
         *args,
         **kwargs,
     ):
@@ -103,6 +119,9 @@ class AbstractAgent(object, metaclass=ABCMeta):
         self.last_trajectory = []
         self.params = {}
         self.device = device
+        self._checkpoint_thread = None
+        self._checkpoint_error = None
+        self.profiler = Profiler(enabled=profile)
 
     def set_policy(self, new_policy):
         """Set policy."""
@@ -149,32 +168,35 @@ class AbstractAgent(object, metaclass=ABCMeta):
         return str_
 
     def act(self, state):
-        """Ask the agent for an action to interact with the environment."""
+        """Ask the agent for an action to interact with the environment.
+
+        The state can also be a batch of states, e.g. one per environment copy, and
+        then the agent returns one action per state.
+        """
+        policy_ = self.acting_policy
+        if not isinstance(state, torch.Tensor):
+            state = torch.tensor(
+                state, dtype=torch.get_default_dtype(), device=self.device
+            )
         if self.total_steps < self.exploration_steps or (
             self.total_episodes < self.exploration_episodes
         ):
-            policy = self.policy.random()
+            batch_size = get_batch_size(state, policy_.dim_state)
+            policy = policy_.random(batch_size if batch_size else None)
         else:
-            if not isinstance(state, torch.Tensor):
-                state = torch.tensor(
-                    state, dtype=torch.get_default_dtype(), device=self.device
-                )
-            policy = self.policy(state)
+            with self.profiler.section("act_forward"):
+                policy = policy_(state)
 
-        self.pi = tensor_to_distribution(policy, **self.policy.dist_params)
-        if self.training:
-            action = self.pi.sample()
-        elif self.pi.has_enumerate_support:
-            action = torch.argmax(self.pi.probs)
-        else:
-            try:
-                action = self.pi.mean
-            except NotImplementedError:
-                action = self.pi.sample((100,)).mean(dim=0)
+        with self.profiler.section("act_distribution"):
+            self.pi = tensor_to_distribution(policy, **policy_.dist_params)
+            if self.training:
+                action = self.pi.sample()
+            else:
+                action = deterministic_sample(self.pi)
 
-        if not self.policy.discrete_action:
+        if not policy_.discrete_action:
             action = action.clamp(-1.0, 1.0)
-            action = self.policy.action_scale * action
+            action = policy_.action_scale * action
         return action.detach().to("cpu").numpy()
 
     def observe(self, observation):
@@ -246,7 +268,7 @@ class AbstractAgent(object, metaclass=ABCMeta):
 
     def end_interaction(self):
         """End the interaction with the environment."""
-        pass
+        self.wait_checkpoint()
 
     def learn(self, *args, **kwargs):
         """Train the agent."""
@@ -275,23 +297,34 @@ class AbstractAgent(object, metaclass=ABCMeta):
             else:
                 cm = DisableGradient(self.policy)
 
-            with cm:
+            with cm, self.profiler.section("learn_step"):
                 losses = self.optimizer.step(closure=closure)  # type: Loss
 
-            self.logger.update(**asdict(average_dataclass(losses)))
-            self.logger.update(**self.algorithm.info())
+            self._log_learn_step(
+                {**asdict(average_dataclass(losses)), **self.algorithm.info()}
+            )
 
             self.counters["train_steps"] += 1
             if self.train_steps % self.target_update_frequency == 0:
-                self.algorithm.update()
-                for param in self.params.values():
-                    param.update()
+                with self.profiler.section("learn_target_update"):
+                    self.algorithm.update()
+                    for param in self.params.values():
+                        param.update()
 
             if self.early_stop(losses, **self.algorithm.info()):
                 break
         self.algorithm.reset()
         self.early_stopping_algorithm.reset()
 
+    def _log_learn_step(self, info):
+        """Log the losses and the algorithm info of a learn step."""
+        self.logger.update(**info)
+
+    @property
+    def acting_policy(self):
+        """Return the policy with which the agent acts."""
+        return self.policy
+
     @property
     def train_episodes(self):
         """Return number of training episodes."""
@@ -345,34 +378,71 @@ class AbstractAgent(object, metaclass=ABCMeta):
         return self.__class__.__name__ if self._name is None else self._name
 
     def save_checkpoint(self):
-        """Save a checkpoint of the agent at the end of each episode."""
-        self.logger.export_to_json()
-        self.save("last.pkl")
-        save_random_state(self.logger.log_dir)
+        """Save a checkpoint of the agent at the end of each episode.
+
+        The checkpoint is written in a background thread.
+        """
+        with self.profiler.section("checkpoint"):
+            self.logger.export_to_json()
+            self.save("last.pkl", background=True)
+            save_random_state(self.logger.log_dir)
+
+    def wait_checkpoint(self):
+        """Wait until the checkpoint that is being written in background finishes.
+
+        Raises
+        ------
+        Exception
+            The exception raised while writing the checkpoint in background, if any.
+        """
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join()
+            self._checkpoint_thread = None
+        if self._checkpoint_error is not None:
+            error, self._checkpoint_error = self._checkpoint_error, None
+            raise error
+
+    @staticmethod
+    def _get_memory_path(path, key):
+        """Get the directory where the experience replay `key' is saved."""
+        return f"{os.path.splitext(path)[0]}_{key}"
 
-    def save(self, filename, directory=None):
+    def save(self, filename, directory=None, background=False):
         """Save agent.
 
+        The modules and optimizers are saved with `torch.save' in `filename', and each
+        experience replay is saved in its own directory next to it, where only the
+        observations appended since the last save are written.
+
         Parameters
         ----------
         filename: str.
             Filename with which to save the agent.
         directory: str, optional.
             Directory where to save the agent. By default use the log directory.
+        background: bool, optional (default=False).
+            Flag that indicates whether to write the files in a background thread.
+            The state of the agent is copied before the method returns.
 
         Returns
         -------
         path: str.
             Path where agent is saved.
         """
+        self.wait_checkpoint()
         if directory is None:
             directory = self.logger.log_dir
         path = f"{directory}/{filename}"
 
-        params = {}
+        params, writers = {}, []
         for key, value in self.__dict__.items():
             if isinstance(value, Logger) or key == "pi" or key == "logger":
                 continue
+            elif key in self._transient_attributes:
+                continue
+            elif isinstance(value, ExperienceReplay):
+                memory_path = self._get_memory_path(path, key)
+                writers.append(value.get_checkpoint_writer(memory_path))
             elif isinstance(value, nn.Module) or isinstance(value, Optimizer):
                 params[key] = value.state_dict()
             elif isinstance(value, AbstractAgent):
@@ -384,7 +454,25 @@ class AbstractAgent(object, metaclass=ABCMeta):
             else:
                 params[key] = value
 
-        torch.save(params, path)
+        if background:
+            params = copy.deepcopy(params)
+
+        def write():
+            torch.save(params, path)
+            for writer in writers:
+                writer()
+
+        def write_background():
+            try:
+                write()
+            except Exception as error:  # re-raised by `wait_checkpoint'.
+                self._checkpoint_error = error
+
+        if background:
+            self._checkpoint_thread = threading.Thread(target=write_background)
+            self._checkpoint_thread.start()
+        else:
+            write()
         return path
 
     def load(self, path):
@@ -395,11 +483,19 @@ class AbstractAgent(object, metaclass=ABCMeta):
         path: str.
             Full path to agent.
         """
-        agent_dict = torch.load(path)
+        self.wait_checkpoint()
+        kwargs = dict()
+        if "weights_only" in inspect.signature(torch.load).parameters:
+            kwargs["weights_only"] = False  # the agent stores python objects.
+        agent_dict = torch.load(path, **kwargs)
 
         for key, value in self.__dict__.items():
             if isinstance(value, Logger) or key == "pi":
                 continue
+            elif key in self._transient_attributes:
+                continue
+            elif isinstance(value, ExperienceReplay) and key not in agent_dict:
+                value.load(self._get_memory_path(path, key))
             elif isinstance(value, AbstractAgent):
                 # abstract agents can't be saved as a dict.
                 # if an agent has a sub-agent, then it should implement the loading.
@@ -1,5 +1,6 @@
 from abc import ABCMeta
-from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
+from threading import Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 
 from torch import Tensor
 from torch.distributions import Distribution
@@ -13,6 +14,7 @@ from rllib.value_function.abstract_value_function import AbstractQFunction
 from rllib.util.early_stopping import EarlyStopping
 from rllib.util.logger import Logger
 from rllib.util.parameter_decay import ParameterDecay
+from rllib.util.profiler import Profiler
 
 T = TypeVar("T", bound="AbstractAgent")
 
@@ -24,6 +26,10 @@ class AbstractAgent(object, metaclass=ABCMeta):
     counters: Dict[str, int]
     episode_steps: List[int]
     logger: Logger
+    _transient_attributes: Tuple[str, ...]
+    _checkpoint_thread: Optional[Thread]
+    _checkpoint_error: Optional[Exception]
+    profiler: Profiler
     early_stopping_algorithm: EarlyStopping
     gamma: float
     exploration_steps: int
@@ -62,6 +68,7 @@ class AbstractAgent(object, metaclass=ABCMeta):
         device: str = ...,
         log_dir: Optional[str] = ...,
         name: Optional[str] = ...,
+        profile: bool = ...,
         *args: Any,
         **kwargs: Any,
     ) -> None: ...
@@ -70,6 +77,8 @@ class AbstractAgent(object, metaclass=ABCMeta):
         cls: Type[T], environment: AbstractEnvironment, *args: Any, **kwargs: Any
     ) -> T: ...
     def act(self, state: State) -> Action: ...
+    @property
+    def acting_policy(self) -> AbstractPolicy: ...
     def observe(self, observation: Observation) -> None: ...
     def start_episode(self) -> None: ...
     def end_episode(self) -> None: ...
@@ -81,6 +90,7 @@ class AbstractAgent(object, metaclass=ABCMeta):
     def train(self, val: bool = True) -> None: ...
     def eval(self, val: bool = True) -> None: ...
     def _learn_steps(self, closure: Callable) -> Loss: ...
+    def _log_learn_step(self, info: Dict[str, Any]) -> None: ...
     @property
     def train_episodes(self) -> int: ...
     @property
@@ -98,7 +108,12 @@ class AbstractAgent(object, metaclass=ABCMeta):
     @property
     def name(self) -> str: ...
     def save_checkpoint(self) -> None: ...
-    def save(self, filename: str, directory: Optional[str] = ...) -> str: ...
+    def wait_checkpoint(self) -> None: ...
+    @staticmethod
+    def _get_memory_path(path: str, key: str) -> str: ...
+    def save(
+        self, filename: str, directory: Optional[str] = ..., background: bool = ...
+    ) -> str: ...
     def load(self, path: str) -> None: ...
     @staticmethod
     def default_policy(environment) -> AbstractPolicy: ...
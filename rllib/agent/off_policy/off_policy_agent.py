@@ -1,4 +1,6 @@
 """Off Policy Agent."""
+import copy
+import threading
 
 import torch
 
@@ -7,7 +9,43 @@ from rllib.dataset.experience_replay import ExperienceReplay
 
 
 class OffPolicyAgent(AbstractAgent):
-    """Template for an on-policy algorithm."""
+    """Template for an off-policy algorithm.
+
+    In asynchronous mode, the agent acts and appends the observations to the memory,
+    while a learner thread trains continuously on the same memory. The agent acts
+    with a snapshot of the policy, which the learner refreshes every
+    `max_policy_lag' learn calls. The learner holds a lock during each learn call,
+    and saving or loading the agent takes it, so checkpoints are never written in
+    the middle of an optimizer step. The learner buffers its logs, and the acting
+    thread writes them to the logger when it observes or ends an episode.
+
+    Parameters
+    ----------
+    memory: ExperienceReplay.
+        Memory where the observations are stored.
+    asynchronous: bool, optional (default=False).
+        Flag that indicates whether to learn in a background thread instead of inside
+        `observe' and `end_episode'.
+    max_replay_ratio: float, optional.
+        Maximum number of sampled transitions per observed transition in asynchronous
+        mode, i.e., the learner waits while train_steps * batch_size is larger than
+        max_replay_ratio * total_steps. By default, it is not bounded.
+    max_policy_lag: int, optional (default=1).
+        Number of learn calls, each of `num_iter' train steps, after which the learner
+        refreshes the policy with which the agent acts in asynchronous mode.
+    """
+
+    _transient_attributes = AbstractAgent._transient_attributes + (
+        "actor_policy",
+        "_learner",
+        "_learner_lock",
+        "_learner_logs",
+        "_log_lock",
+        "_memory_lock",
+        "_policy_lock",
+        "_new_data",
+        "_stop_learner",
+    )
 
     def __init__(
         self,
@@ -15,6 +53,9 @@ class OffPolicyAgent(AbstractAgent):
         train_frequency=1,
         batch_size=100,
         reset_memory_after_learn=False,
+        asynchronous=False,
+        max_replay_ratio=None,
+        max_policy_lag=1,
         *args,
         **kwargs,
     ):
@@ -24,6 +65,19 @@ class OffPolicyAgent(AbstractAgent):
         self.reset_memory_after_learn = reset_memory_after_learn
         self.memory = memory
 
+        self.asynchronous = asynchronous
+        self.max_replay_ratio = max_replay_ratio
+        self.max_policy_lag = max_policy_lag
+        self.actor_policy = None
+        self._learner = None
+        self._learner_lock = threading.RLock()
+        self._learner_logs = []
+        self._log_lock = threading.Lock()
+        self._memory_lock = threading.Lock()
+        self._policy_lock = threading.Lock()
+        self._new_data = threading.Condition(self._memory_lock)
+        self._stop_learner = threading.Event()
+
     @classmethod
     def default(
         cls,
@@ -39,46 +93,166 @@ class OffPolicyAgent(AbstractAgent):
             memory = ExperienceReplay(max_len=100000, num_memory_steps=num_memory_steps)
         return super().default(environment, memory=memory, *args, **kwargs)
 
+    @property
+    def acting_policy(self):
+        """Return the policy snapshot while the learner thread runs."""
+        if self._learner is None:
+            return self.policy
+        return self.actor_policy
+
+    def act(self, state):
+        """See `AbstractAgent.act'."""
+        with self._policy_lock:
+            return super().act(state)
+
     def observe(self, observation):
         """See `AbstractAgent.observe'."""
+        self._flush_learner_logs()
         super().observe(observation)  # this update total steps.
         if self.training:
-            self.memory.append(observation)
-        if self.train_at_observe and len(self.memory) >= self.batch_size:
+            with self._new_data, self.profiler.section("observe_memory"):
+                self.memory.append(observation)
+                self._new_data.notify()
+        if self.asynchronous:
+            if self.training:
+                self.start_learner()
+        elif self.train_at_observe and len(self.memory) >= self.batch_size:
             self.learn()
 
     def end_episode(self):
         """See `AbstractAgent.end_episode'."""
-        if self.train_at_end_episode and len(self.memory) >= self.batch_size:
+        if (
+            not self.asynchronous
+            and self.train_at_end_episode
+            and len(self.memory) >= self.batch_size
+        ):
             self.learn()
 
-        if len(self.memory) > 0 and self.training:  # Maybe learn() resets the memory.
-            self.memory.end_episode()
+        with self._memory_lock:
+            if len(self.memory) > 0 and self.training:  # Maybe learn() resets memory.
+                self.memory.end_episode()
 
+        self._flush_learner_logs()
         super().end_episode()  # this update total episodes.
 
+    def end_interaction(self):
+        """See `AbstractAgent.end_interaction'."""
+        self.stop_learner()
+        super().end_interaction()
+
+    def save(self, filename, directory=None, background=False):
+        """See `AbstractAgent.save'.
+
+        The learner is paused while the state of the agent is copied.
+        """
+        with self._learner_lock, self._memory_lock:
+            return super().save(filename, directory=directory, background=background)
+
+    def load(self, path):
+        """See `AbstractAgent.load'.
+
+        The learner is paused while the state of the agent is loaded.
+        """
+        with self._learner_lock, self._memory_lock:
+            super().load(path)
+
+    def _log_learn_step(self, info):
+        """Buffer the logs of the learner thread, see `_flush_learner_logs'."""
+        if threading.current_thread() is not self._learner:
+            super()._log_learn_step(info)
+            return
+        with self._log_lock:
+            self._learner_logs.append(info)
+
+    def _flush_learner_logs(self):
+        """Write the logs buffered by the learner thread to the logger."""
+        with self._log_lock:
+            logs, self._learner_logs = self._learner_logs, []
+        for info in logs:
+            super()._log_learn_step(info)
+
     def learn(self):
         """Train the off-policy agent."""
         #
 
         def closure():
             """Gradient calculation."""
-            observation, idx, weight = self.memory.sample_batch(self.batch_size)
+            with self._memory_lock, self.profiler.section("learn_sample"):
+                observation, idx, weight = self.memory.sample_batch(self.batch_size)
 
             self.optimizer.zero_grad()
-            losses_ = self.algorithm(observation.clone())
-            loss = (losses_.combined_loss * weight.detach()).mean()
-            loss.backward()
-            torch.nn.utils.clip_grad_norm_(
-                self.algorithm.parameters(), self.clip_gradient_val
-            )
+            with self.profiler.section("learn_forward"):
+                losses_ = self.algorithm(observation.clone())
+                loss = (losses_.combined_loss * weight.detach()).mean()
+            with self.profiler.section("learn_backward"):
+                loss.backward()
+                torch.nn.utils.clip_grad_norm_(
+                    self.algorithm.parameters(), self.clip_gradient_val
+                )
 
             # Update memory
-            self.memory.update(idx, losses_.td_error.abs().detach())
+            with self._memory_lock:
+                self.memory.update(idx, losses_.td_error.abs().detach())
 
             return losses_
 
         self._learn_steps(closure)
 
         if self.reset_memory_after_learn:
-            self.memory.reset()
+            with self._memory_lock:
+                self.memory.reset()
+
+    def _can_learn(self):
+        """Check if the learner thread can train, it must hold the memory lock."""
+        if not self.training or len(self.memory) < self.batch_size:
+            return False
+        if self.total_steps < self.exploration_steps:
+            return False
+        if self.total_episodes < self.exploration_episodes:
+            return False
+        if self.max_replay_ratio is None:
+            return True
+        num_samples = self.train_steps * self.batch_size
+        return num_samples < self.max_replay_ratio * self.total_steps
+
+    def _learner_loop(self):
+        """Train until the learner is stopped, refreshing the acting policy."""
+        num_learn_calls = 0
+        while not self._stop_learner.is_set():
+            with self._new_data:
+                if not self._can_learn():
+                    self._new_data.wait(timeout=0.1)
+                    continue
+            with self._learner_lock:
+                self.learn()
+            num_learn_calls += 1
+            if num_learn_calls % self.max_policy_lag == 0:
+                self._sync_actor_policy()
+
+    def _sync_actor_policy(self):
+        """Copy the parameters of the trained policy into the acting policy."""
+        with self._policy_lock:
+            self.actor_policy.load_state_dict(self.policy.state_dict())
+
+    def start_learner(self):
+        """Start the learner thread, if it is not running."""
+        if self._learner is not None:
+            return
+        if self.actor_policy is None:
+            self.actor_policy = copy.deepcopy(self.policy)
+        else:
+            self._sync_actor_policy()
+        self._stop_learner.clear()
+        self._learner = threading.Thread(target=self._learner_loop, daemon=True)
+        self._learner.start()
+
+    def stop_learner(self):
+        """Stop the learner thread and wait until its last learn call finishes."""
+        if self._learner is None:
+            return
+        self._stop_learner.set()
+        with self._new_data:
+            self._new_data.notify_all()
+        self._learner.join()
+        self._learner = None
+        self._flush_learner_logs()
@@ -1,21 +1,52 @@
-from typing import Any
+from threading import Condition, Event, Lock, RLock, Thread
+from typing import Any, Dict, List, Optional, Tuple
 
 from rllib.agent.abstract_agent import AbstractAgent
 from rllib.algorithms.abstract_algorithm import AbstractAlgorithm
+from rllib.dataset.datatypes import Action, State
 from rllib.dataset.experience_replay import ExperienceReplay
+from rllib.policy import AbstractPolicy
 
 class OffPolicyAgent(AbstractAgent):
-    """Template for an on-policy algorithm."""
-
+    _transient_attributes: Tuple[str, ...]
     algorithm: AbstractAlgorithm
     memory: ExperienceReplay
     reset_memory_after_learn: bool
+    asynchronous: bool
+    max_replay_ratio: Optional[float]
+    max_policy_lag: int
+    actor_policy: Optional[AbstractPolicy]
+    _learner: Optional[Thread]
+    _learner_lock: RLock
+    _learner_logs: List[Dict[str, Any]]
+    _log_lock: Lock
+    _memory_lock: Lock
+    _policy_lock: Lock
+    _new_data: Condition
+    _stop_learner: Event
     def __init__(
         self,
         memory: ExperienceReplay,
         num_iter: int = ...,
         batch_size: int = ...,
         reset_memory_after_learn: bool = ...,
+        asynchronous: bool = ...,
+        max_replay_ratio: Optional[float] = ...,
+        max_policy_lag: int = ...,
         *args: Any,
         **kwargs: Any,
     ) -> None: ...
+    @property
+    def acting_policy(self) -> AbstractPolicy: ...
+    def act(self, state: State) -> Action: ...
+    def save(
+        self, filename: str, directory: Optional[str] = ..., background: bool = ...
+    ) -> str: ...
+    def load(self, path: str) -> None: ...
+    def _log_learn_step(self, info: Dict[str, Any]) -> None: ...
+    def _flush_learner_logs(self) -> None: ...
+    def _can_learn(self) -> bool: ...
+    def _learner_loop(self) -> None: ...
+    def _sync_actor_policy(self) -> None: ...
+    def start_learner(self) -> None: ...
+    def stop_learner(self) -> None: ...
@@ -43,12 +43,13 @@ class OnPolicyAgent(AbstractAgent):
         def closure():
             """Gradient calculation."""
             self.optimizer.zero_grad()
-            losses = self.algorithm(trajectories)
-            losses.combined_loss.backward()
-
-            torch.nn.utils.clip_grad_norm_(
-                self.algorithm.parameters(), self.clip_gradient_val
-            )
+            with self.profiler.section("learn_forward"):
+                losses = self.algorithm(trajectories)
+            with self.profiler.section("learn_backward"):
+                losses.combined_loss.backward()
+                torch.nn.utils.clip_grad_norm_(
+                    self.algorithm.parameters(), self.clip_gradient_val
+                )
 
             return losses
 
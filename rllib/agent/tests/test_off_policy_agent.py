@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+import torch
+
+from rllib.agent import DQNAgent
+from rllib.environment import GymEnvironment
+from rllib.util.logger import Logger
+from rllib.util.rollout import step_env
+from rllib.util.utilities import deterministic_action
+
+SEED = 0
+
+
+@pytest.fixture(params=[False, True])
+def background(request):
+    return request.param
+
+
+def collect(agent, environment, num_steps):
+    state = environment.reset()
+    for _ in range(num_steps):
+        action = agent.act(state)
+        observation, state, done, _ = step_env(environment, state, action, 1.0)
+        agent.memory.append(observation)
+        if done:
+            agent.memory.end_episode()
+            state = environment.reset()
+
+
+def test_save_load(tmp_path, background):
+    environment = GymEnvironment("CartPole-v0", SEED)
+    agent = DQNAgent.default(environment)
+    collect(agent, environment, 50)
+    path = agent.save("agent.pkl", directory=str(tmp_path), background=background)
+    agent.wait_checkpoint()
+    assert os.path.isdir(agent._get_memory_path(path, "memory"))
+
+    # Observations appended after the first save are written incrementally.
+    collect(agent, environment, 10)
+    agent.save("agent.pkl", directory=str(tmp_path), background=background)
+    agent.wait_checkpoint()
+
+    loaded = DQNAgent.default(environment)
+    loaded.load(path)
+    assert loaded.memory.data_count == agent.memory.data_count
+    for x, y in zip(agent.memory.all_raw, loaded.memory.all_raw):
+        np.testing.assert_array_equal(x.numpy(), y.numpy())
+    for x, y in zip(agent.policy.parameters(), loaded.policy.parameters()):
+        torch.testing.assert_close(x, y)
+
+
+def test_act_evaluation():
+    environment = GymEnvironment("CartPole-v0", SEED)
+    agent = DQNAgent.default(environment)
+    agent.eval()
+    state = environment.reset()
+    expected = deterministic_action(agent.policy, torch.tensor(state).float())
+    np.testing.assert_array_equal(agent.act(state), expected.numpy())
+
+
+def test_background_save_error(tmp_path):
+    environment = GymEnvironment("CartPole-v0", SEED)
+    agent = DQNAgent.default(environment)
+    collect(agent, environment, 10)
+    agent.save("agent.pkl", directory=str(tmp_path / "missing"), background=True)
+    with pytest.raises((OSError, RuntimeError)):
+        agent.wait_checkpoint()
+    agent.wait_checkpoint()  # the error is raised only once.
+
+
+@pytest.fixture
+def asynchronous_agent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    environment = GymEnvironment("CartPole-v0", SEED)
+    agent = DQNAgent.default(environment, asynchronous=True, batch_size=4)
+    agent.logger = Logger(agent.name)
+    yield environment, agent
+    agent.stop_learner()
+
+
+def train(agent, environment, num_train_steps, max_steps=1000):
+    state = environment.reset()
+    agent.start_episode()
+    for _ in range(max_steps):
+        action = agent.act(state)
+        observation, state, done, _ = step_env(environment, state, action, 1.0)
+        agent.observe(observation)
+        if done:
+            agent.end_episode()
+            state = environment.reset()
+            agent.start_episode()
+        if agent.train_steps >= num_train_steps:
+            break
+        time.sleep(0.001)
+
+
+def test_start_stop_learner(asynchronous_agent):
+    environment, agent = asynchronous_agent
+    agent.start_learner()
+    learner = agent._learner
+    assert learner.is_alive()
+    agent.start_learner()  # it is already running.
+    assert agent._learner is learner
+    agent.stop_learner()
+    assert agent._learner is None
+    assert not learner.is_alive()
+    agent.stop_learner()  # it is already stopped.
+
+
+def test_train_with_learner(asynchronous_agent, monkeypatch):
+    environment, agent = asynchronous_agent
+    threads, losses = set(), []
+    update = agent.logger.update
+
+    def logger_update(**kwargs):
+        threads.add(threading.current_thread())
+        if "combined_loss" in kwargs:
+            losses.append(kwargs["combined_loss"])
+        update(**kwargs)
+
+    monkeypatch.setattr(agent.logger, "update", logger_update)
+    train(agent, environment, num_train_steps=5)
+    assert agent._learner is not None
+    agent.stop_learner()
+    assert agent.train_steps > 0
+
+    # The learner logs are written to the logger by the acting thread.
+    assert threads == {threading.main_thread()}
+    assert len(agent._learner_logs) == 0
+    assert len(losses) == agent.train_steps
+
+
+def test_save_with_learner(asynchronous_agent, tmp_path, background):
+    environment, agent = asynchronous_agent
+    train(agent, environment, num_train_steps=5)
+    assert agent._learner.is_alive()
+    path = agent.save("agent.pkl", directory=str(tmp_path), background=background)
+    agent.wait_checkpoint()
+    assert agent._learner.is_alive()
+    agent.stop_learner()
+
+    loaded = DQNAgent.default(environment, asynchronous=True, batch_size=4)
+    loaded.load(path)
+    assert 0 < loaded.train_steps <= agent.train_steps
+    assert 0 < loaded.memory.data_count <= agent.memory.data_count
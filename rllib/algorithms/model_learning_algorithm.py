@@ -80,12 +80,17 @@ class ModelLearningAlgorithm(object):
             num_heads = 1
 
         # Note: The transformations are shared by both data sets.
+        # The transformed data is cached unless the transformations are trained.
+        cache_transformations = not any(
+            p.requires_grad for p in self.dynamical_model.transformations.parameters()
+        )
         self.train_set = BootstrapExperienceReplay(
             max_len=max_memory,
             transformations=self.dynamical_model.transformations,
             num_bootstraps=num_heads,
             bootstrap=bootstrap,
             num_memory_steps=num_memory_steps,
+            cache_transformations=cache_transformations,
         )
         self.validation_set = BootstrapExperienceReplay(
             max_len=max_memory,
@@ -93,6 +98,7 @@ class ModelLearningAlgorithm(object):
             num_bootstraps=num_heads,
             bootstrap=bootstrap,
             num_memory_steps=num_memory_steps,
+            cache_transformations=cache_transformations,
         )
 
         self.num_epochs = num_epochs
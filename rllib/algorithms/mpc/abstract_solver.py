@@ -5,11 +5,16 @@ import numpy as np
 import torch
 import torch.nn as nn
 
-from rllib.dataset.utilities import stack_list_of_tuples
+from rllib.model.utilities import PredictionStrategy
 from rllib.util.multi_objective_reduction import MeanMultiObjectiveReduction
 from rllib.util.neural_networks.utilities import repeat_along_dimension, to_torch
-from rllib.util.rollout import rollout_actions
-from rllib.util.value_estimation import discount_sum
+from rllib.util.rollout import rollout_actions_returns
+
+PARTICLE_PROPAGATION = {
+    "moment_matching": "moment_matching",
+    "TS1": "sample_multiple_head",
+    "TSinf": "set_head_idx",
+}
 
 
 class MPCSolver(nn.Module, metaclass=ABCMeta):
@@ -42,6 +47,17 @@ class MPCSolver(nn.Module, metaclass=ABCMeta):
          Default action behavior.
     num_cpu: int, optional.
         Number of CPUs to run the solver.
+    jit_compile: bool, optional (default=False).
+        Flag that indicates whether to plan with diagonal Gaussian distributions and
+        with the TorchScript kernels of `rllib.algorithms.mpc.utilities'. Then, the
+        covariance attribute stores the variances of each action coordinate.
+    particle_propagation: str, optional.
+        How the particles propagate through an ensemble dynamical model.
+        - 'moment_matching': each step predicts with the moments of all heads.
+        - 'TS1': each step predicts with a random head for each particle.
+        - 'TSinf': each particle predicts with a single head along the horizon,
+        assigned in equal parts to the heads on each evaluation.
+        By default, the prediction strategy of the dynamical model is used.
     """
 
     def __init__(
@@ -61,6 +77,8 @@ class MPCSolver(nn.Module, metaclass=ABCMeta):
         action_scale=1.0,
         num_cpu=1,
         multi_objective_reduction=MeanMultiObjectiveReduction(dim=-1),
+        jit_compile=False,
+        particle_propagation=None,
         *args,
         **kwargs,
     ):
@@ -73,6 +91,9 @@ class MPCSolver(nn.Module, metaclass=ABCMeta):
         assert self.reward_model.model_kind == "rewards"
         if self.termination_model is not None:
             assert self.termination_model.model_kind == "termination"
+        if particle_propagation is not None:
+            assert particle_propagation in PARTICLE_PROPAGATION
+        self.particle_propagation = particle_propagation
 
         self.num_model_steps = num_model_steps
         self.gamma = gamma
@@ -87,9 +108,8 @@ class MPCSolver(nn.Module, metaclass=ABCMeta):
 
         self.mean = None
         self._scale = scale
-        self.covariance = (scale ** 2) * torch.eye(self.dim_action).repeat(
-            self.num_model_steps, 1, 1
-        )
+        self.jit_compile = jit_compile
+        self.covariance = self._initial_covariance(())
         if isinstance(action_scale, np.ndarray):
             action_scale = to_torch(action_scale)
         elif not isinstance(action_scale, torch.Tensor):
@@ -104,24 +124,34 @@ class MPCSolver(nn.Module, metaclass=ABCMeta):
         self.multi_objective_reduction = multi_objective_reduction
 
     def evaluate_action_sequence(self, action_sequence, state):
-        """Evaluate action sequence by performing a rollout."""
-        trajectory = stack_list_of_tuples(
-            rollout_actions(
-                self.dynamical_model,
-                self.reward_model,
-                self.action_scale * action_sequence,  # scale actions.
-                state,
-                self.termination_model,
-            ),
-            dim=-2,
+        """Evaluate action sequence by accumulating the returns of a model rollout."""
+        if self.particle_propagation is None:
+            return self._rollout_returns(action_sequence, state)
+
+        prediction_strategy = PARTICLE_PROPAGATION[self.particle_propagation]
+        with PredictionStrategy(
+            self.dynamical_model, prediction_strategy=prediction_strategy
+        ):
+            if self.particle_propagation == "TSinf":
+                self.dynamical_model.set_head_idx(self._particle_heads())
+            return self._rollout_returns(action_sequence, state)
+
+    def _rollout_returns(self, action_sequence, state):
+        """Accumulate the returns of a model rollout with the current strategy."""
+        return rollout_actions_returns(
+            self.dynamical_model,
+            self.reward_model,
+            self.action_scale * action_sequence,  # scale actions.
+            state,
+            termination_model=self.termination_model,
+            gamma=self.gamma,
+            terminal_reward=self.terminal_reward,
         )
 
-        returns = discount_sum(trajectory.reward, self.gamma)
-
-        if self.terminal_reward:
-            terminal_reward = self.terminal_reward(trajectory.next_state[..., -1, :])
-            returns = returns + self.gamma ** self.num_model_steps * terminal_reward
-        return returns
+    def _particle_heads(self):
+        """Assign the particles to the ensemble heads in equal parts at random."""
+        num_heads = self.dynamical_model.get_num_heads()
+        return torch.randperm(self.num_particles) % num_heads
 
     @abstractmethod
     def get_candidate_action_sequence(self):
@@ -153,7 +183,16 @@ class MPCSolver(nn.Module, metaclass=ABCMeta):
             self.mean = torch.cat((next_mean, final_action), dim=0)
         else:
             self.mean = torch.zeros(self.num_model_steps, *batch_shape, self.dim_action)
-        self.covariance = (self._scale ** 2) * torch.eye(self.dim_action).repeat(
+        self.covariance = self._initial_covariance(batch_shape)
+
+    def _initial_covariance(self, batch_shape):
+        """Get the initial covariance, or the variances if `jit_compile'."""
+        if self.jit_compile:
+            return torch.full(
+                (self.num_model_steps, *batch_shape, self.dim_action),
+                self._scale ** 2,
+            )
+        return (self._scale ** 2) * torch.eye(self.dim_action).repeat(
             self.num_model_steps, *batch_shape, 1, 1
         )
 
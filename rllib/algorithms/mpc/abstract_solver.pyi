@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import torch
 import torch.nn as nn
@@ -9,6 +9,8 @@ from rllib.model import AbstractModel
 from rllib.util.multi_objective_reduction import AbstractMultiObjectiveReduction
 from rllib.value_function import AbstractValueFunction
 
+PARTICLE_PROPAGATION: Dict[str, str]
+
 class MPCSolver(nn.Module, metaclass=ABCMeta):
     dynamical_model: AbstractModel
     reward_model: AbstractModel
@@ -27,6 +29,8 @@ class MPCSolver(nn.Module, metaclass=ABCMeta):
     _scale: float
     covariance: Tensor
     multi_objective_reduction: AbstractMultiObjectiveReduction
+    jit_compile: bool
+    particle_propagation: Optional[str]
     def __init__(
         self,
         dynamical_model: AbstractModel,
@@ -44,12 +48,16 @@ class MPCSolver(nn.Module, metaclass=ABCMeta):
         clamp: bool = ...,
         num_cpu: int = ...,
         multi_objective_reduction: AbstractMultiObjectiveReduction = ...,
+        jit_compile: bool = ...,
+        particle_propagation: Optional[str] = ...,
         *args: Any,
         **kwargs: Any,
     ) -> None: ...
     def evaluate_action_sequence(
         self, action_sequence: Tensor, state: Tensor
     ) -> Tensor: ...
+    def _rollout_returns(self, action_sequence: Tensor, state: Tensor) -> Tensor: ...
+    def _particle_heads(self) -> Tensor: ...
     @abstractmethod
     def get_candidate_action_sequence(self) -> Tensor: ...
     @abstractmethod
@@ -57,5 +65,6 @@ class MPCSolver(nn.Module, metaclass=ABCMeta):
     @abstractmethod
     def update_sequence_generation(self, elite_actions: Tensor) -> None: ...
     def initialize_actions(self, batch_shape: torch.Size) -> None: ...
+    def _initial_covariance(self, batch_shape: Tuple[int, ...]) -> Tensor: ...
     def forward(self, *args: Tensor, **kwargs: Any) -> Tensor: ...
     def reset(self, warm_action: Optional[Tensor] = ...) -> None: ...
@@ -6,6 +6,7 @@ from torch.distributions import MultivariateNormal
 from rllib.util.utilities import sample_mean_and_cov
 
 from .abstract_solver import MPCSolver
+from .utilities import fit_diagonal_gaussian, sample_diagonal_gaussian, select_elites
 
 
 class CEMShooting(MPCSolver):
@@ -57,27 +58,32 @@ class CEMShooting(MPCSolver):
 
     def get_candidate_action_sequence(self):
         """Get candidate actions by sampling from a multivariate normal."""
-        action_distribution = MultivariateNormal(self.mean, self.covariance)
-        action_sequence = action_distribution.sample((self.num_particles,))
-        action_sequence = action_sequence.permute(
-            tuple(torch.arange(1, action_sequence.dim() - 1)) + (0, -1)
-        )
+        if self.jit_compile:
+            action_sequence = sample_diagonal_gaussian(
+                self.mean, self.covariance, self.num_particles
+            )
+        else:
+            action_distribution = MultivariateNormal(self.mean, self.covariance)
+            action_sequence = action_distribution.sample((self.num_particles,))
+            action_sequence = action_sequence.permute(
+                tuple(torch.arange(1, action_sequence.dim() - 1)) + (0, -1)
+            )
         if self.clamp:
             return action_sequence.clamp(-1.0, 1.0)
         return action_sequence
 
     def get_best_action(self, action_sequence, returns):
-        """Get best action by averaging the num_elites samples."""
+        """Get the num_elites samples with the largest returns."""
         returns = self.multi_objective_reduction(returns)
-        idx = torch.topk(returns, k=self.num_elites, largest=True, dim=-1)[1]
-        idx = idx.unsqueeze(0).unsqueeze(-1)  # Expand dims to action_sequence.
-        idx = idx.repeat_interleave(self.num_model_steps, 0).repeat_interleave(
-            self.dim_action, -1
-        )
-        return torch.gather(action_sequence, -2, idx)
+        return select_elites(action_sequence, returns, self.num_elites)
 
     def update_sequence_generation(self, elite_actions):
         """Update distribution by the empirical mean and covariance of best actions."""
+        if self.jit_compile:
+            self.mean, self.covariance = fit_diagonal_gaussian(
+                elite_actions, self.mean, self.covariance, self.alpha
+            )
+            return
         new_mean, new_cov = sample_mean_and_cov(elite_actions.transpose(-1, -2))
         self.mean = self.alpha * self.mean + (1 - self.alpha) * new_mean
         self.covariance = self.alpha * self.covariance + (1 - self.alpha) * new_cov
@@ -1,10 +1,8 @@
 """A gradient based solver runs SGD on the action sequence."""
 from torch.optim import Adam
 
-from rllib.dataset.utilities import stack_list_of_tuples
 from rllib.util.neural_networks.utilities import DisableGradient
-from rllib.util.rollout import rollout_actions
-from rllib.util.value_estimation import discount_sum
+from rllib.util.rollout import rollout_actions_returns
 
 from .abstract_solver import MPCSolver
 
@@ -41,13 +39,13 @@ class GradientBasedSolver(MPCSolver):
         for i in range(self.num_iter):
             optimizer.zero_grad()
             with DisableGradient(self.dynamical_model, self.reward_model):
-                trajectory = rollout_actions(
-                    self.dynamical_model, self.reward_model, actions, state
+                returns = rollout_actions_returns(
+                    self.dynamical_model,
+                    self.reward_model,
+                    actions,
+                    state,
+                    gamma=self.gamma,
                 )
-
-            returns = discount_sum(
-                stack_list_of_tuples(trajectory, dim=-2).reward, gamma=self.gamma
-            )
             (-returns).sum().backward()
             optimizer.step()
 
@@ -0,0 +1,193 @@
+"""Serve MPC actions to many independent instances with batched planning."""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import torch
+
+
+class MPCServer(object):
+    """Serve the actions of an MPC solver to many independent instances.
+
+    Each instance, e.g., a plant or an environment copy, is identified by a hashable
+    id and keeps its own warm-start action sequence. The states of several instances
+    are planned in a single call to the solver with batch shape [num_instances], and
+    the warm-start sequences are gathered before and scattered back after planning.
+
+    The `act' and `submit' requests can come from several threads. When the server is
+    running, a worker thread batches the pending requests of different instances in
+    one planning call.
+
+    Parameters
+    ----------
+    mpc_solver: MPCSolver
+        Solver used to plan. Its warm start is managed by the server.
+    max_batch_size: int, optional.
+        Maximum number of instances planned in a single call. By default, unlimited.
+    max_wait: float, optional (default=0.0).
+        Seconds that the worker waits for more requests before planning a batch.
+
+    Methods
+    -------
+    plan(state, instance_ids):
+        Plan the action sequences of a batch of instances.
+    submit(instance_id, state):
+        Request the action of an instance, and return a future with it.
+    act(instance_id, state):
+        Request the action of an instance and wait for it.
+    reset(instance_id):
+        Forget the warm-start sequence of an instance.
+
+    Examples
+    --------
+    >>> with MPCServer(solver) as server:  # doctest: +SKIP
+    ...     action = server.act("plant-0", state)
+    """
+
+    def __init__(self, mpc_solver, max_batch_size=None, max_wait=0.0):
+        self.solver = mpc_solver
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.warm_actions = dict()
+
+        self._requests = deque()
+        self._condition = threading.Condition()
+        self._solver_lock = threading.Lock()
+        self._worker = None
+        self._running = False
+
+    def __enter__(self):
+        """Start the server when entering the context."""
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        """Stop the server when leaving the context."""
+        self.stop()
+
+    def plan(self, state, instance_ids):
+        """Plan the action sequences of a batch of instances.
+
+        Parameters
+        ----------
+        state: Tensor
+            States of the instances, with shape [num_instances x dim_state].
+        instance_ids: List[Hashable]
+            Distinct ids of the instances.
+
+        Returns
+        -------
+        action_sequence: Tensor
+            Action sequences, with shape [horizon x num_instances x dim_action].
+        """
+        solver = self.solver
+        zeros = torch.zeros(solver.num_model_steps, solver.dim_action)
+        with self._solver_lock, torch.no_grad():
+            solver.reset(
+                torch.stack(
+                    [self.warm_actions.get(i, zeros) for i in instance_ids], dim=1
+                )
+            )
+            action_sequence = solver(state)
+            for j, instance_id in enumerate(instance_ids):
+                self.warm_actions[instance_id] = solver.mean[:, j].clone()
+        return action_sequence
+
+    def submit(self, instance_id, state):
+        """Request the action of an instance.
+
+        Parameters
+        ----------
+        instance_id: Hashable
+        state: Tensor
+            State of the instance, with shape [dim_state].
+
+        Returns
+        -------
+        action: Future
+            Future with the first action of the planned sequence, as `MPCPolicy'.
+        """
+        future = Future()
+        with self._condition:  # stop() can not run between the check and the append.
+            running = self._running
+            if running:
+                self._requests.append((instance_id, state, future))
+                self._condition.notify()
+        if not running:
+            self._resolve([(instance_id, state, future)])
+        return future
+
+    def act(self, instance_id, state):
+        """Get the action of an instance. See `submit'."""
+        return self.submit(instance_id, state).result()
+
+    def reset(self, instance_id=None):
+        """Forget the warm-start sequence of an instance, by default of all of them."""
+        with self._solver_lock:
+            if instance_id is None:
+                self.warm_actions = dict()
+            else:
+                self.warm_actions.pop(instance_id, None)
+
+    def start(self):
+        """Start the worker thread that batches the requests."""
+        if self._running:
+            return
+        self._running = True
+        self._worker = threading.Thread(target=self._serve, daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """Stop the worker thread after it serves the pending requests."""
+        if not self._running:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._worker.join()
+        self._worker = None
+
+    def _next_batch(self):
+        """Pop the oldest pending request of at most `max_batch_size' instances.
+
+        The requests of instances that are already in the batch stay pending, so that
+        each instance is planned from its latest warm-start sequence.
+        """
+        batch, instance_ids, pending = [], set(), deque()
+        while len(self._requests):
+            request = self._requests.popleft()
+            full = self.max_batch_size and len(batch) >= self.max_batch_size
+            if full or request[0] in instance_ids:
+                pending.append(request)
+            else:
+                batch.append(request)
+                instance_ids.add(request[0])
+        self._requests = pending
+        return batch
+
+    def _serve(self):
+        """Serve the pending requests in batches until the server stops."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._requests or not self._running)
+                if not self._requests:
+                    return
+            if self.max_wait:
+                time.sleep(self.max_wait)
+            with self._condition:
+                batch = self._next_batch()
+            self._resolve(batch)
+
+    def _resolve(self, batch):
+        """Plan a batch of requests and set the results of their futures."""
+        instance_ids = [instance_id for instance_id, _, _ in batch]
+        try:
+            state = torch.stack([torch.as_tensor(state) for _, state, _ in batch])
+            action_sequence = self.plan(state, instance_ids)
+        except Exception as exception:
+            for _, _, future in batch:
+                future.set_exception(exception)
+            return
+        for j, (_, _, future) in enumerate(batch):
+            future.set_result(action_sequence[0, j])
@@ -0,0 +1,38 @@
+from collections import deque
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from torch import Tensor
+
+from .abstract_solver import MPCSolver
+
+_Request = Tuple[Hashable, Tensor, Future]
+
+class MPCServer(object):
+    solver: MPCSolver
+    max_batch_size: Optional[int]
+    max_wait: float
+    warm_actions: Dict[Hashable, Tensor]
+    _requests: deque
+    _condition: Condition
+    _solver_lock: Lock
+    _worker: Optional[Thread]
+    _running: bool
+    def __init__(
+        self,
+        mpc_solver: MPCSolver,
+        max_batch_size: Optional[int] = ...,
+        max_wait: float = ...,
+    ) -> None: ...
+    def __enter__(self) -> MPCServer: ...
+    def __exit__(self, *args: Any) -> None: ...
+    def plan(self, state: Tensor, instance_ids: List[Hashable]) -> Tensor: ...
+    def submit(self, instance_id: Hashable, state: Tensor) -> Future: ...
+    def act(self, instance_id: Hashable, state: Tensor) -> Tensor: ...
+    def reset(self, instance_id: Optional[Hashable] = ...) -> None: ...
+    def start(self) -> None: ...
+    def stop(self) -> None: ...
+    def _next_batch(self) -> List[_Request]: ...
+    def _serve(self) -> None: ...
+    def _resolve(self, batch: List[_Request]) -> None: ...
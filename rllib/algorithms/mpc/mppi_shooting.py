@@ -5,6 +5,12 @@ from torch.distributions import MultivariateNormal
 from rllib.util.parameter_decay import Constant, ParameterDecay
 
 from .abstract_solver import MPCSolver
+from .utilities import (
+    filter_noise,
+    noise_filter_matrix,
+    path_integral_average,
+    sample_diagonal_gaussian,
+)
 
 
 class MPPIShooting(MPCSolver):
@@ -32,45 +38,39 @@ class MPPIShooting(MPCSolver):
         self.kappa = kappa
         self.filter_coefficients = torch.tensor(filter_coefficients)
         self.filter_coefficients /= torch.sum(self.filter_coefficients)
+        self._filter_matrix = noise_filter_matrix(
+            self.filter_coefficients, self.num_model_steps
+        )
 
     def get_candidate_action_sequence(self):
-        """Get candidate actions by sampling from a multivariate normal."""
-        noise_dist = MultivariateNormal(torch.zeros_like(self.mean), self.covariance)
-        noise = noise_dist.sample((self.num_particles,))
-
-        lag = len(self.filter_coefficients)
-        for i in range(self.num_model_steps):
-            weights = self.filter_coefficients[: min(i + 1, lag)]
-            aux = torch.einsum(
-                "i, ki...j-> k...j",
-                weights.flip(0),
-                noise[:, max(0, i - lag + 1) : i + 1, ..., :],
+        """Get candidate actions by sampling from a multivariate normal.
+
+        The noise is correlated along the horizon with `filter_coefficients'.
+        """
+        if self.jit_compile:
+            noise = sample_diagonal_gaussian(
+                torch.zeros_like(self.mean), self.covariance, self.num_particles
             )
-            noise[:, i, ..., :] = aux / torch.sum(weights)
+        else:
+            noise_dist = MultivariateNormal(
+                torch.zeros_like(self.mean), self.covariance
+            )
+            noise = noise_dist.sample((self.num_particles,))
+            noise = noise.permute(tuple(torch.arange(1, noise.dim() - 1)) + (0, -1))
+        noise = filter_noise(noise, self._filter_matrix)
 
-        action_sequence = self.mean.unsqueeze(0).repeat_interleave(
-            self.num_particles, 0
-        )
-        action_sequence += noise
-        action_sequence = action_sequence.permute(
-            tuple(torch.arange(1, action_sequence.dim() - 1)) + (0, -1)
-        )
+        action_sequence = self.mean.unsqueeze(-2) + noise
         if self.clamp:
             return action_sequence.clamp(-1.0, 1.0)
         return action_sequence
 
     def get_best_action(self, action_sequence, returns):
-        """Get best action by a weighted average of e^kappa returns."""
-        returns = self.multi_objective_reduction(returns)
-        returns = self.kappa() * returns
-        weights = torch.exp(returns - torch.max(returns))
-        normalization = weights.sum()
+        """Get best action by a weighted average of e^kappa returns.
 
-        weights = weights.unsqueeze(0).unsqueeze(-1)
-        weights = weights.repeat_interleave(self.num_model_steps, 0).repeat_interleave(
-            self.dim_action, -1
-        )
-        return (weights * action_sequence).sum(dim=-2) / normalization
+        The weights of each batch element are normalized independently.
+        """
+        returns = self.multi_objective_reduction(returns)
+        return path_integral_average(action_sequence, returns, float(self.kappa()))
 
     def update_sequence_generation(self, elite_actions):
         """Update distribution by the fitting the elite_actions to the mean."""
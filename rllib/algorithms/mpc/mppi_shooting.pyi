@@ -9,6 +9,7 @@ from .abstract_solver import MPCSolver
 class MPPIShooting(MPCSolver):
     kappa: ParameterDecay
     filter_coefficients: Tensor
+    _filter_matrix: Tensor
     def __init__(
         self,
         kappa: Union[float, ParameterDecay] = ...,
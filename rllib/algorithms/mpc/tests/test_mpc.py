@@ -0,0 +1,253 @@
+import threading
+
+import pytest
+import torch
+
+from rllib.algorithms.mpc import CEMShooting, MPCServer, MPPIShooting, RandomShooting
+from rllib.algorithms.mpc.utilities import (
+    filter_noise,
+    noise_filter_matrix,
+    select_elites,
+)
+from rllib.model import (
+    AbstractModel,
+    EnsembleModel,
+    LinearModel,
+    NNModel,
+    TransformedModel,
+)
+from rllib.model.independent_ensemble_model import IndependentEnsembleModel
+
+
+class DistanceReward(AbstractModel):
+    def __init__(self):
+        super().__init__(dim_state=(2,), dim_action=(1,), model_kind="rewards")
+
+    def forward(self, state, action, next_state=None):
+        return -(next_state ** 2).sum(-1, keepdim=True), torch.zeros(1)
+
+
+@pytest.fixture(params=[CEMShooting, MPPIShooting, RandomShooting])
+def solver(request):
+    return request.param
+
+
+@pytest.fixture(params=[True, False])
+def jit_compile(request):
+    return request.param
+
+
+@pytest.fixture(params=[(), (3,)])
+def batch_shape(request):
+    return request.param
+
+
+def test_solver(solver, jit_compile, batch_shape):
+    torch.manual_seed(0)
+    dynamical_model = LinearModel(torch.eye(2), 0.1 * torch.ones(2, 1))
+    reward_model = DistanceReward()
+    mpc = solver(
+        dynamical_model=dynamical_model,
+        reward_model=reward_model,
+        num_model_steps=10,
+        num_particles=50,
+        jit_compile=jit_compile,
+    )
+    state = torch.ones(*batch_shape, 2)
+    action_sequence = mpc(state)
+    assert action_sequence.shape == (10, *batch_shape, 1)
+    assert torch.all(action_sequence.abs() <= 1.0)
+
+    # The solution moves the state towards the origin, where the reward is larger.
+    returns = mpc.evaluate_action_sequence(action_sequence, state)
+    zero_action_sequence = torch.zeros_like(action_sequence)
+    zero_returns = mpc.evaluate_action_sequence(zero_action_sequence, state)
+    assert torch.all(returns > zero_returns)
+
+
+@pytest.mark.parametrize("particle_propagation", ["moment_matching", "TS1", "TSinf"])
+def test_particle_propagation(solver, particle_propagation, batch_shape):
+    base_model = EnsembleModel(
+        num_heads=4, dim_state=(2,), dim_action=(1,), layers=(16,)
+    )
+    dynamical_model = TransformedModel(base_model, transformations=[])
+    mpc = solver(
+        dynamical_model=dynamical_model,
+        reward_model=DistanceReward(),
+        num_model_steps=5,
+        num_particles=20,
+        particle_propagation=particle_propagation,
+    )
+    state = torch.ones(*batch_shape, 2)
+    action_sequence = mpc(state)
+    assert action_sequence.shape == (5, *batch_shape, 1)
+    # The prediction strategy of the model is restored after planning.
+    assert dynamical_model.get_prediction_strategy() == "moment_matching"
+
+    if particle_propagation == "TSinf":
+        # Each particle keeps a head, and the heads have the same number of particles.
+        head_idx = dynamical_model.get_head_idx()
+        assert head_idx.shape == (20,)
+        assert torch.all(torch.bincount(head_idx, minlength=4) == 5)
+
+
+def test_independent_ensemble_particle_heads(solver, batch_shape):
+    models = torch.nn.ModuleList(
+        [NNModel(dim_state=(2,), dim_action=(1,), layers=(16,)) for _ in range(4)]
+    )
+    dynamical_model = IndependentEnsembleModel(models)
+    state, action = torch.randn(*batch_shape, 20, 2), torch.randn(*batch_shape, 20, 1)
+    head_idx = torch.randperm(20) % 4
+    dynamical_model.set_prediction_strategy("set_head_idx")
+    dynamical_model.set_head_idx(head_idx)
+    mean, scale = dynamical_model(state, action)
+    for particle, head in enumerate(head_idx):
+        head_mean, head_scale = models[head](state, action)
+        torch.testing.assert_close(mean[..., particle, :], head_mean[..., particle, :])
+        torch.testing.assert_close(
+            scale[..., particle, :, :], head_scale[..., particle, :, :]
+        )
+
+    dynamical_model.set_prediction_strategy("moment_matching")
+    mpc = solver(
+        dynamical_model=dynamical_model,
+        reward_model=DistanceReward(),
+        num_model_steps=5,
+        num_particles=20,
+        particle_propagation="TSinf",
+    )
+    action_sequence = mpc(torch.ones(*batch_shape, 2))
+    assert action_sequence.shape == (5, *batch_shape, 1)
+
+
+def test_mppi_best_action_jit_equivalence():
+    dynamical_model = LinearModel(torch.eye(2), 0.1 * torch.ones(2, 1))
+    mpc, jit_mpc = [
+        MPPIShooting(
+            dynamical_model=dynamical_model,
+            reward_model=DistanceReward(),
+            num_model_steps=5,
+            num_particles=20,
+            kappa=2.0,
+            jit_compile=jit_compile,
+        )
+        for jit_compile in [False, True]
+    ]
+    action_sequence = torch.randn(5, 3, 20, 1)  # [horizon x batch x particles x dim].
+    returns = torch.randn(3, 20, 1)  # [batch x particles x dim_reward].
+    returns[0] += 100.0  # the weights of each batch element are normalized apart.
+
+    best_action = mpc.get_best_action(action_sequence, returns)
+    torch.testing.assert_close(
+        best_action, jit_mpc.get_best_action(action_sequence, returns)
+    )
+    for i in range(3):
+        torch.testing.assert_close(
+            best_action[:, i],
+            mpc.get_best_action(action_sequence[:, i], returns[i]),
+        )
+
+
+def test_noise_filter_matrix():
+    coefficients = torch.tensor([0.25, 0.8, 0.1])
+    coefficients /= coefficients.sum()
+    noise = torch.randn(50, 10, 4, 2)  # [particles x horizon x batch x dim_action].
+
+    expected = noise.clone()
+    lag = len(coefficients)
+    for i in range(10):
+        weights = coefficients[: min(i + 1, lag)]
+        aux = torch.einsum(
+            "i, ki...j-> k...j",
+            weights.flip(0),
+            expected[:, max(0, i - lag + 1) : i + 1, ..., :],
+        )
+        expected[:, i, ..., :] = aux / torch.sum(weights)
+
+    filter_matrix = noise_filter_matrix(coefficients, 10)
+    filtered = filter_noise(noise.transpose(0, 1), filter_matrix)
+    torch.testing.assert_close(filtered.transpose(0, 1), expected)
+
+
+def test_select_elites():
+    action_sequence = torch.randn(10, 4, 50, 2)
+    returns = torch.randn(4, 50)
+    elites = select_elites(action_sequence, returns, 5)
+    assert elites.shape == (10, 4, 5, 2)
+
+    idx = torch.topk(returns, k=5, dim=-1)[1]
+    for i in range(4):
+        torch.testing.assert_close(elites[:, i], action_sequence[:, i, idx[i]])
+
+
+def get_server(**kwargs):
+    mpc = CEMShooting(
+        dynamical_model=LinearModel(torch.eye(2), 0.1 * torch.ones(2, 1)),
+        reward_model=DistanceReward(),
+        num_model_steps=10,
+        num_particles=50,
+    )
+    return MPCServer(mpc, **kwargs)
+
+
+def test_server_warm_start():
+    server = get_server()
+    action_sequence = server.plan(torch.ones(2, 2), ["a", "b"])
+    assert action_sequence.shape == (10, 2, 1)
+    assert set(server.warm_actions.keys()) == {"a", "b"}
+    warm_action = server.warm_actions["b"]
+
+    server.solver.reset()
+    server.plan(torch.ones(2, 2), ["b", "c"])
+    assert set(server.warm_actions.keys()) == {"a", "b", "c"}
+    # The solver starts from the warm-start sequence of each instance.
+    assert server.solver.mean.shape == (10, 2, 1)
+    assert not torch.equal(server.warm_actions["b"], warm_action)
+
+    server.reset("a")
+    assert set(server.warm_actions.keys()) == {"b", "c"}
+    server.reset()
+    assert server.warm_actions == {}
+
+
+def test_server_batching():
+    server = get_server(max_batch_size=4, max_wait=0.01)
+    batch_sizes = []
+    plan = server.plan
+
+    def counted_plan(state, instance_ids):
+        batch_sizes.append(len(instance_ids))
+        return plan(state, instance_ids)
+
+    server.plan = counted_plan
+    with server:
+        futures = [server.submit(i % 6, torch.ones(2)) for i in range(12)]
+        actions = [future.result() for future in futures]
+
+    assert all(action.shape == (1,) for action in actions)
+    assert sum(batch_sizes) == 12
+    assert max(batch_sizes) <= 4
+    assert len(batch_sizes) < 12
+    assert set(server.warm_actions.keys()) == set(range(6))
+
+    # Without a running worker, the requests are planned one by one.
+    assert server.act(0, torch.ones(2)).shape == (1,)
+    assert batch_sizes[-1] == 1
+
+
+def test_server_submit_while_stopping():
+    server = get_server()
+    for _ in range(5):
+        server.start()
+        futures = []
+        # Both threads wait for the lock, so stop() and submit() run in either order.
+        with server._condition:
+            submit = threading.Thread(
+                target=lambda: futures.append(server.submit(0, torch.ones(2)))
+            )
+            stop = threading.Thread(target=server.stop)
+            submit.start()
+            stop.start()
+        submit.join(timeout=10)
+        stop.join(timeout=10)
+        assert futures[0].result(timeout=10).shape == (1,)
@@ -0,0 +1,109 @@
+"""Sampling and refitting kernels of the shooting MPC solvers.
+
+The kernels work on action sequences with dimensions
+[horizon x batch_size x num_particles x dim_action] and on diagonal Gaussian
+distributions, whose means and variances have dimensions
+[horizon x batch_size x dim_action]. They are compiled with TorchScript.
+"""
+from typing import List, Tuple
+
+import torch
+from torch import Tensor
+
+
+def noise_filter_matrix(filter_coefficients, horizon):
+    r"""Get the matrix that filters white noise along the horizon.
+
+    The noise is filtered recursively as
+    ..math :: n_t = \sum_{k} c_k n_{t-k} / \sum_{k <= t} c_k,
+    where n_t in the right hand side is the white noise for k = 0 and the already
+    filtered noise for k > 0. As the filter is linear, the filtered noise is
+    L @ noise, with L a lower-triangular matrix.
+
+    Parameters
+    ----------
+    filter_coefficients: Tensor
+        Coefficients c of the filter.
+    horizon: int
+        Length of the noise sequences.
+
+    Returns
+    -------
+    filter_matrix: Tensor
+        Matrix L with shape [horizon x horizon].
+    """
+    lag = len(filter_coefficients)
+    filter_matrix = torch.eye(horizon)
+    for i in range(horizon):
+        weights = filter_coefficients[: min(i + 1, lag)]
+        past = filter_matrix[max(0, i - lag + 1) : i + 1]
+        filter_matrix[i] = weights.flip(0) @ past / torch.sum(weights)
+    return filter_matrix
+
+
+@torch.jit.script
+def sample_diagonal_gaussian(mean: Tensor, variance: Tensor, num_particles: int):
+    """Sample action sequences from a diagonal Gaussian.
+
+    Returns
+    -------
+    action_sequence: Tensor
+        Samples with dimensions [horizon x batch_size x num_particles x dim_action].
+    """
+    shape: List[int] = mean.shape[:-1] + [num_particles, mean.shape[-1]]
+    noise = torch.randn(shape, dtype=mean.dtype, device=mean.device)
+    return mean.unsqueeze(-2) + variance.sqrt().unsqueeze(-2) * noise
+
+
+@torch.jit.script
+def filter_noise(noise: Tensor, filter_matrix: Tensor):
+    """Filter the noise along the horizon, the first dimension, with a matrix."""
+    filtered_noise = filter_matrix.to(noise) @ noise.reshape(noise.shape[0], -1)
+    return filtered_noise.reshape(noise.shape)
+
+
+@torch.jit.script
+def select_elites(action_sequence: Tensor, returns: Tensor, num_elites: int):
+    """Select the action sequences with the largest returns.
+
+    Parameters
+    ----------
+    action_sequence: Tensor
+        Action sequences with dimensions [horizon x batch_size x num_particles x dim].
+    returns: Tensor
+        Returns with dimensions [batch_size x num_particles].
+    num_elites: int
+        Number of elite sequences.
+
+    Returns
+    -------
+    elite_actions: Tensor
+        Elite sequences with dimensions [horizon x batch_size x num_elites x dim].
+    """
+    idx = torch.topk(returns, k=num_elites, largest=True, dim=-1)[1]
+    dim_action = action_sequence.shape[-1]
+    shape: List[int] = action_sequence.shape[:-2] + [num_elites, dim_action]
+    idx = idx.unsqueeze(0).unsqueeze(-1).expand(shape)
+    return torch.gather(action_sequence, -2, idx)
+
+
+@torch.jit.script
+def fit_diagonal_gaussian(
+    elite_actions: Tensor, mean: Tensor, variance: Tensor, alpha: float
+) -> Tuple[Tensor, Tensor]:
+    """Fit a diagonal Gaussian to the elites, low-pass filtered with `alpha'."""
+    new_mean = elite_actions.mean(-2)
+    new_variance = elite_actions.var(-2, unbiased=False) + 1e-6
+    mean = alpha * mean + (1 - alpha) * new_mean
+    variance = alpha * variance + (1 - alpha) * new_variance
+    return mean, variance
+
+
+@torch.jit.script
+def path_integral_average(action_sequence: Tensor, returns: Tensor, kappa: float):
+    """Average the action sequences weighted by the exponential of kappa * returns.
+
+    The weights of each batch are normalized independently.
+    """
+    weights = torch.softmax(kappa * returns, dim=-1)
+    return (weights.unsqueeze(0).unsqueeze(-1) * action_sequence).sum(-2)
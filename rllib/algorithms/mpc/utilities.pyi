@@ -0,0 +1,18 @@
+from typing import Tuple
+
+from torch import Tensor
+
+def noise_filter_matrix(filter_coefficients: Tensor, horizon: int) -> Tensor: ...
+def sample_diagonal_gaussian(
+    mean: Tensor, variance: Tensor, num_particles: int
+) -> Tensor: ...
+def filter_noise(noise: Tensor, filter_matrix: Tensor) -> Tensor: ...
+def select_elites(
+    action_sequence: Tensor, returns: Tensor, num_elites: int
+) -> Tensor: ...
+def fit_diagonal_gaussian(
+    elite_actions: Tensor, mean: Tensor, variance: Tensor, alpha: float
+) -> Tuple[Tensor, Tensor]: ...
+def path_integral_average(
+    action_sequence: Tensor, returns: Tensor, kappa: float
+) -> Tensor: ...
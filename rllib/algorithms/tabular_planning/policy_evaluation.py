@@ -1,12 +1,14 @@
 """Policy Evaluation Algorithms."""
 
-import numpy as np
 import torch
 
-from rllib.environment import mdp2mrp, transitions2kernelreward
-from rllib.util.utilities import tensor_to_distribution
-
-from .utilities import init_value_function
+from .utilities import (
+    get_kernel_reward,
+    get_policy_probabilities,
+    get_terminal_mask,
+    init_value_function,
+    policy_evaluation_backups,
+)
 
 
 def linear_system_policy_evaluation(policy, model, gamma, value_function=None):
@@ -21,17 +23,20 @@ def linear_system_policy_evaluation(policy, model, gamma, value_function=None):
     if value_function is None:
         value_function = init_value_function(model.num_states, model.terminal_states)
 
-    mrp = mdp2mrp(environment=model, policy=policy)
+    kernel, reward = get_kernel_reward(model, sparse=False)
+    probabilities = get_policy_probabilities(policy, model.num_states)
+    terminal = get_terminal_mask(model)
 
-    kernel, reward = transitions2kernelreward(
-        mrp.transitions, model.num_states, model.num_actions
-    )
+    # Marginalize the actions; terminal states are absorbing with zero reward.
+    kernel = kernel.reshape(model.num_states, model.num_actions, model.num_states)
+    kernel = torch.einsum("sa,sat->st", probabilities, kernel)
+    reward = (probabilities * reward).sum(-1)
+    kernel[terminal] = torch.eye(model.num_states)[terminal]
+    reward[terminal] = 0
 
-    A = torch.eye(model.num_states) - gamma * kernel[:, 0, :]
-    # torch.testing.assert_allclose(A.inverse() @ A, torch.eye(model.num_states))
-    vals = A.inverse() @ reward[:, 0]
-    for state in range(model.num_states):
-        value_function.set_value(state, vals[state].item())
+    A = torch.eye(model.num_states) - gamma * kernel
+    vals = torch.linalg.solve(A, reward)
+    value_function.set_value(torch.arange(model.num_states), vals)
 
     return value_function
 
@@ -61,6 +66,10 @@ def iterative_policy_evaluation(
     value_function: TabularValueFunction
         value function associated with the policy.
 
+    Notes
+    -----
+    Each iteration is a synchronous Bellman backup of all the states at once with a
+    dense or sparse kernel.
 
     References
     ----------
@@ -75,34 +84,16 @@ def iterative_policy_evaluation(
     if value_function is None:
         value_function = init_value_function(model.num_states, model.terminal_states)
 
-    for _ in range(max_iter):
-        max_error = 0
-        for state in range(model.num_states):
-            if state in model.terminal_states:
-                continue
-
-            value_estimate = torch.tensor([0.0])
-            state = torch.tensor(state).long()
-            policy_ = tensor_to_distribution(policy(state), **policy.dist_params)
-            for action in np.where(policy_.probs.detach().numpy())[0]:
-                p_action = policy_.probs[action].item()
-                for transition in model.transitions[(state.item(), action)]:
-                    next_state = torch.tensor(transition["next_state"]).long()
-                    reward = torch.tensor(
-                        transition["reward"], dtype=torch.get_default_dtype()
-                    )
-                    value_estimate += (
-                        p_action
-                        * transition["probability"]
-                        * (reward + gamma * value_function(next_state))
-                    )
-
-            value = value_function(state)
-            error = torch.abs(value_estimate - value).item()
-            max_error = max(max_error, error)
-            value_function.set_value(state, value_estimate)
-
-        if max_error < eps:
-            break
+    kernel, reward = get_kernel_reward(model)
+    probabilities = get_policy_probabilities(policy, model.num_states)
+    terminal = get_terminal_mask(model)
 
+    states = torch.arange(model.num_states)
+    with torch.no_grad():
+        value = value_function(states).squeeze(-1)
+
+    value, _ = policy_evaluation_backups(
+        kernel, reward, probabilities, value, gamma, terminal, eps, max_iter
+    )
+    value_function.set_value(states, value)
     return value_function
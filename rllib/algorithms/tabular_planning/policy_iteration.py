@@ -1,15 +1,24 @@
 """Policy iteration algorithm."""
 
 import torch
-import torch.testing
 
 from rllib.policy import TabularPolicy
-
-from .policy_evaluation import iterative_policy_evaluation
-from .utilities import init_value_function
-
-
-def policy_iteration(model, gamma, eps=1e-6, max_iter=1000, value_function=None):
+from rllib.util.neural_networks.utilities import one_hot_encode
+
+from .utilities import (
+    bellman_backup,
+    convergence_tolerance,
+    get_kernel_reward,
+    get_policy_probabilities,
+    get_terminal_mask,
+    init_value_function,
+    policy_evaluation_backups,
+)
+
+
+def policy_iteration(
+    model, gamma, eps=1e-6, max_iter=1000, value_function=None, eval_iter=None
+):
     """Implement Policy Iteration algorithm.
 
     Parameters
@@ -19,6 +28,9 @@ def policy_iteration(model, gamma, eps=1e-6, max_iter=1000, value_function=None)
     eps: desired precision of policy evaluation step
     max_iter: maximum number of iterations
     value_function: initial estimate of value function, optional.
+    eval_iter: maximum number of backups of each policy evaluation step, optional.
+        By default, each policy is evaluated until convergence. With a small number
+        of backups, it is the modified policy iteration algorithm.
 
     Returns
     -------
@@ -32,6 +44,10 @@ def policy_iteration(model, gamma, eps=1e-6, max_iter=1000, value_function=None)
     MIT press.
     Chapter 4.3
 
+    Puterman, M. L., & Shin, M. C. (1978).
+    Modified policy iteration algorithms for discounted Markov decision problems.
+    Management Science.
+
     """
     if model.num_actions is None or model.num_states is None:
         raise NotImplementedError("Actions and States must be discrete and countable.")
@@ -40,36 +56,35 @@ def policy_iteration(model, gamma, eps=1e-6, max_iter=1000, value_function=None)
         value_function = init_value_function(model.num_states, model.terminal_states)
     policy = TabularPolicy(num_states=model.num_states, num_actions=model.num_actions)
 
+    kernel, reward = get_kernel_reward(model)
+    terminal = get_terminal_mask(model)
+    states = torch.arange(model.num_states)
+    with torch.no_grad():
+        value = value_function(states).squeeze(-1)
+
+    tolerance = convergence_tolerance(eps, gamma)
+    probabilities = get_policy_probabilities(policy, model.num_states)
+    action = probabilities.argmax(-1)
     for _ in range(max_iter):
-        value_function = iterative_policy_evaluation(
-            policy, model, gamma, eps, value_function=value_function
+        value, max_error = policy_evaluation_backups(
+            kernel,
+            reward,
+            probabilities,
+            value,
+            gamma,
+            terminal,
+            eps,
+            max_iter if eval_iter is None else eval_iter,
         )
 
-        policy_stable = True
-        for state in range(model.num_states):
+        old_action = probabilities.argmax(-1)
+        action = bellman_backup(kernel, reward, value, gamma).argmax(-1)
+        probabilities = one_hot_encode(action, num_classes=model.num_actions)
 
-            value_ = torch.zeros(model.num_actions)
-            for action in range(model.num_actions):
-                value_estimate = 0
-                for transition in model.transitions[(state, action)]:
-                    next_state = torch.tensor(transition["next_state"]).long()
-                    reward = torch.tensor(
-                        transition["reward"], dtype=torch.get_default_dtype()
-                    )
-                    value_estimate += transition["probability"] * (
-                        reward + gamma * value_function(next_state)
-                    )
-
-                value_[action] = value_estimate
-
-            state = torch.tensor(state).long()
-            old_action = policy(state)
-            action = torch.argmax(value_)
-            policy.set_value(state, action)
-
-            policy_stable &= (policy(state) == old_action).all().item()
-
-        if policy_stable:
+        if (action == old_action).all() and max_error < tolerance:
             break
 
+    policy.set_value(states, action)
+
+    value_function.set_value(states, value)
     return policy, value_function
@@ -10,4 +10,5 @@ def policy_iteration(
     eps: float = ...,
     max_iter: int = ...,
     value_function: Optional[TabularValueFunction] = ...,
+    eval_iter: Optional[int] = ...,
 ) -> Tuple[TabularPolicy, TabularValueFunction]: ...
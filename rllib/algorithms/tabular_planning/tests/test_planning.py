@@ -7,9 +7,13 @@ from rllib.algorithms.tabular_planning import (
     policy_iteration,
     value_iteration,
 )
+from rllib.algorithms.tabular_planning.utilities import (
+    bellman_backup,
+    get_kernel_reward,
+)
 from rllib.environment.gym_environment import GymEnvironment
 from rllib.environment.mdps import EasyGridWorld
-from rllib.policy import RandomPolicy
+from rllib.policy import RandomPolicy, TabularPolicy
 
 RANDOM_VALUE = (
     [3.3, 8.8, 4.4, 5.3, 1.5]
@@ -159,6 +163,57 @@ def test_value_iteration():
     )
 
 
+def test_sparse_kernel():
+    environment = EasyGridWorld(noise=0.2)
+    kernel, reward = get_kernel_reward(environment, sparse=False)
+    sparse_kernel, sparse_reward = get_kernel_reward(environment, sparse=True)
+    torch.testing.assert_close(sparse_kernel.to_dense(), kernel)
+    torch.testing.assert_close(sparse_reward, reward)
+
+    num_states, num_actions = environment.num_states, environment.num_actions
+    torch.testing.assert_close(
+        kernel.reshape(num_states, num_actions, num_states),
+        torch.tensor(environment.kernel, dtype=torch.get_default_dtype()),
+    )
+    torch.testing.assert_close(
+        reward, torch.tensor(environment.reward_matrix, dtype=torch.get_default_dtype())
+    )
+
+    value = torch.randn(num_states)
+    torch.testing.assert_close(
+        bellman_backup(sparse_kernel, reward, value, 0.9),
+        bellman_backup(kernel, reward, value, 0.9),
+    )
+
+
+def test_modified_policy_iteration():
+    environment = EasyGridWorld()
+    GAMMA = 0.9
+    EPS = 1e-3
+    policy, value_function = policy_iteration(environment, GAMMA, eps=EPS, eval_iter=3)
+
+    torch.testing.assert_allclose(
+        value_function.table,
+        torch.tensor([OPTIMAL_VALUE]).unsqueeze(-1),
+        atol=0.05,
+        rtol=EPS,
+    )
+    pred_p = policy.table.argmax(dim=0)
+    assert_policy_equality(environment, GAMMA, value_function, OPTIMAL_POLICY, pred_p)
+
+
+def test_policy_iteration_no_iterations():
+    environment = EasyGridWorld()
+    policy, value_function = policy_iteration(environment, 0.9, max_iter=0)
+    initial_policy = TabularPolicy(
+        num_states=environment.num_states, num_actions=environment.num_actions
+    )
+    # The policy is the greedy policy of the initial policy.
+    torch.testing.assert_close(
+        policy.table.argmax(dim=0), initial_policy.table.argmax(dim=0)
+    )
+
+
 def assert_policy_equality(environment, gamma, value_function, true_opt_p, pred_opt_p):
     """Assert equality by checking Bellman operator equality."""
     for state in range(environment.num_states):
@@ -1,7 +1,14 @@
 """Utilities for tabular planning functions."""
 
+import numpy as np
+import torch
+
+from rllib.policy import TabularPolicy
+from rllib.util.utilities import tensor_to_distribution
 from rllib.value_function import TabularValueFunction
 
+MAX_DENSE_KERNEL_SIZE = 10 ** 7
+
 
 def init_value_function(num_states, terminal_states=None):
     """Initialize value function."""
@@ -11,3 +18,138 @@ def init_value_function(num_states, terminal_states=None):
         value_function.set_value(terminal_state, 0)
 
     return value_function
+
+
+def get_kernel_reward(model, sparse=None):
+    """Get the transition kernel and the expected reward of a model as tensors.
+
+    Parameters
+    ----------
+    model: MDP
+        Model with compiled outcome tables and scalar rewards.
+    sparse: bool, optional.
+        Flag that indicates whether to return a sparse CSR kernel. By default, the
+        kernel is sparse when the dense kernel has more than `MAX_DENSE_KERNEL_SIZE'
+        entries.
+
+    Returns
+    -------
+    kernel: Tensor
+        Kernel with shape [num_states * num_actions x num_states], where the row
+        state * num_actions + action has the next state distribution.
+    reward: Tensor
+        Expected reward with shape [num_states x num_actions].
+    """
+    num_states, num_actions = model.num_states, model.num_actions
+    if sparse is None:
+        sparse = num_states * num_actions * num_states > MAX_DENSE_KERNEL_SIZE
+    if model._rewards.shape[3:] != (1,):
+        raise ValueError("Tabular planning requires scalar rewards.")
+
+    # Reuse the outcome tables compiled by the MDP, padded outcomes have probability 0.
+    cum_probs = model._cum_probs - model._rows[..., np.newaxis]
+    probabilities = np.diff(cum_probs, axis=-1, prepend=0)
+    reward = (probabilities * model._rewards[..., 0]).sum(-1)
+
+    outcomes = probabilities > 0
+    rows = np.broadcast_to(model._rows[..., np.newaxis], outcomes.shape)[outcomes]
+    next_states = model._next_states[outcomes]
+
+    dtype = torch.get_default_dtype()
+    kernel = torch.sparse_coo_tensor(
+        torch.from_numpy(np.stack((rows, next_states))),
+        torch.tensor(probabilities[outcomes], dtype=dtype),
+        (num_states * num_actions, num_states),
+    ).coalesce()
+    kernel = kernel.to_sparse_csr() if sparse else kernel.to_dense()
+    return kernel, torch.tensor(reward, dtype=dtype)
+
+
+def get_policy_probabilities(policy, num_states):
+    """Get the action probabilities of a policy at every state.
+
+    Returns
+    -------
+    probabilities: Tensor
+        Probabilities with shape [num_states x num_actions].
+    """
+    with torch.no_grad():
+        if isinstance(policy, TabularPolicy):  # Avoid one-hot encoding all states.
+            logits = policy.table.T
+        else:
+            logits = policy(torch.arange(num_states))
+        pi = tensor_to_distribution(logits, **policy.dist_params)
+    return pi.probs
+
+
+def get_terminal_mask(model):
+    """Get a boolean mask of the terminal states of a model."""
+    terminal = torch.zeros(model.num_states, dtype=torch.bool)
+    terminal[list(model.terminal_states)] = True
+    return terminal
+
+
+def convergence_tolerance(eps, gamma):
+    """Get the tolerance of the change of the values between two backups.
+
+    As the Bellman operators are gamma-contractions, if two consecutive values differ
+    by less than eps * (1 - gamma) / gamma, the values are eps-close to the fixed
+    point. Without discount, the tolerance is eps.
+    """
+    if gamma < 1:
+        return eps * (1 - gamma) / gamma
+    return eps
+
+
+def bellman_backup(kernel, reward, value, gamma):
+    """Compute the state-action values of all states with a single contraction.
+
+    Q(s, a) = r(s, a) + gamma * sum_s' P(s' | s, a) V(s')
+
+    Parameters
+    ----------
+    kernel: Tensor
+        Dense or sparse kernel with shape [num_states * num_actions x num_states].
+    reward: Tensor
+        Expected reward with shape [num_states x num_actions].
+    value: Tensor
+        Value of each state with shape [num_states].
+    gamma: float
+        Discount factor.
+
+    Returns
+    -------
+    q_value: Tensor
+        State-action values with shape [num_states x num_actions].
+    """
+    next_value = kernel @ value.unsqueeze(-1)
+    return reward + gamma * next_value.reshape(reward.shape)
+
+
+def policy_evaluation_backups(
+    kernel, reward, probabilities, value, gamma, terminal, eps=1e-6, max_iter=1000
+):
+    """Iterate the Bellman expectation backup of a policy until convergence.
+
+    The values of the terminal states are kept fixed. The iterations stop when the
+    values are `eps'-close to the fixed point (see `convergence_tolerance').
+
+    Returns
+    -------
+    value: Tensor
+        Value of each state with shape [num_states].
+    max_error: float
+        Largest change of the values in the last iteration.
+    """
+    max_error, tolerance = float("inf"), convergence_tolerance(eps, gamma)
+    for _ in range(max_iter):
+        q_value = bellman_backup(kernel, reward, value, gamma)
+        value_estimate = (probabilities * q_value).sum(-1)
+        value_estimate = torch.where(terminal, value, value_estimate)
+
+        max_error = torch.abs(value_estimate - value).max().item()
+        value = value_estimate
+        if max_error < tolerance:
+            break
+
+    return value, max_error
@@ -1,9 +1,34 @@
 """Utilities for tabular planning functions."""
 
-from typing import List
+from typing import List, Optional, Tuple
 
+from torch import Tensor
+
+from rllib.environment import MDP
+from rllib.policy import AbstractPolicy
 from rllib.value_function import TabularValueFunction
 
+MAX_DENSE_KERNEL_SIZE: int
+
 def init_value_function(
     num_states: int, terminal_states: List[int]
 ) -> TabularValueFunction: ...
+def get_kernel_reward(
+    model: MDP, sparse: Optional[bool] = ...
+) -> Tuple[Tensor, Tensor]: ...
+def get_policy_probabilities(policy: AbstractPolicy, num_states: int) -> Tensor: ...
+def get_terminal_mask(model: MDP) -> Tensor: ...
+def convergence_tolerance(eps: float, gamma: float) -> float: ...
+def bellman_backup(
+    kernel: Tensor, reward: Tensor, value: Tensor, gamma: float
+) -> Tensor: ...
+def policy_evaluation_backups(
+    kernel: Tensor,
+    reward: Tensor,
+    probabilities: Tensor,
+    value: Tensor,
+    gamma: float,
+    terminal: Tensor,
+    eps: float = ...,
+    max_iter: int = ...,
+) -> Tuple[Tensor, float]: ...
@@ -2,7 +2,13 @@
 
 import torch
 
-from rllib.algorithms.tabular_planning.utilities import init_value_function
+from rllib.algorithms.tabular_planning.utilities import (
+    bellman_backup,
+    convergence_tolerance,
+    get_kernel_reward,
+    get_terminal_mask,
+    init_value_function,
+)
 from rllib.policy import TabularPolicy
 
 
@@ -22,6 +28,11 @@ def value_iteration(model, gamma, eps=1e-6, max_iter=1000, value_function=None):
     policy:
     value_function:
 
+    Notes
+    -----
+    Each iteration is a synchronous Bellman optimality backup of all the states at
+    once with a dense or sparse kernel. The values of terminal states are fixed.
+
     References
     ----------
     Sutton, R. S., & Barto, A. G. (2018). Reinforcement learning: An introduction.
@@ -36,31 +47,22 @@ def value_iteration(model, gamma, eps=1e-6, max_iter=1000, value_function=None):
         value_function = init_value_function(model.num_states, model.terminal_states)
     policy = TabularPolicy(num_states=model.num_states, num_actions=model.num_actions)
 
-    for _ in range(max_iter):
-        error = 0
-        for state in range(model.num_states):
-
-            value_ = torch.zeros(model.num_actions)
-            for action in range(model.num_actions):
-                value_estimate = 0
-                for transition in model.transitions[(state, action)]:
-                    next_state = torch.tensor(transition["next_state"]).long()
-                    reward = torch.tensor(
-                        transition["reward"], dtype=torch.get_default_dtype()
-                    )
-                    value_estimate += transition["probability"] * (
-                        reward + gamma * value_function(next_state)
-                    )
-                value_[action] = value_estimate
-            state = torch.tensor(state).long()
-            value = value_function(state)
-            value_, action = torch.max(value_, 0)
+    kernel, reward = get_kernel_reward(model)
+    terminal = get_terminal_mask(model)
+    states = torch.arange(model.num_states)
+    with torch.no_grad():
+        value = value_function(states).squeeze(-1)
 
-            error = max(error, torch.abs(value_ - value.item()))
-            value_function.set_value(state, value_)
-            policy.set_value(state, action)
+    tolerance = convergence_tolerance(eps, gamma)
+    for _ in range(max_iter):
+        value_, action = torch.max(bellman_backup(kernel, reward, value, gamma), -1)
+        value_ = torch.where(terminal, value, value_)
 
-        if error < eps:
+        error = torch.abs(value_ - value).max().item()
+        value = value_
+        if error < tolerance:
             break
 
+    value_function.set_value(states, value)
+    policy.set_value(states, action)
     return policy, value_function
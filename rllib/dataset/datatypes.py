@@ -1,6 +1,7 @@
 """Project Data-types."""
-from dataclasses import dataclass, field
-from typing import List, Tuple, Type, TypeVar, Union
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
+from typing import Any, Dict, List, Tuple, Type, TypeVar, Union
 
 import numpy as np
 import torch
@@ -22,9 +23,28 @@ NaN = float("nan")
 T = TypeVar("T", bound="Observation")
 
 
+def _add_slots(cls):
+    """Re-create a dataclass with `__slots__' for its fields.
+
+    The instances have no `__dict__', hence they are faster to create, to access and
+    to iterate. The defaults of the fields are kept by the `__init__' method.
+    """
+    names = tuple(f.name for f in fields(cls))
+    cls_dict = {k: v for k, v in cls.__dict__.items() if k not in names}
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    cls_dict["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+@_add_slots
 @dataclass
 class Observation:
-    """Observation datatype."""
+    """Observation datatype.
+
+    The observation is a slotted dataclass, so that it is cheap to create, clone and
+    iterate in the rollout loops. Iterating an observation yields its fields in order.
+    """
 
     state: State
     action: Action = torch.tensor(NaN)
@@ -40,7 +60,22 @@ class Observation:
 
     def __iter__(self):
         """Iterate the properties of the observation."""
-        yield from self.__dict__.values()
+        return iter(_get_observation_fields(self))
+
+    def __setstate__(self, state):
+        """Set the fields of an unpickled observation.
+
+        The state is either the `(None, slots)' tuple of a slotted observation, or the
+        `__dict__' of an observation pickled before it had slots.
+        """
+        if isinstance(state, tuple):
+            state = state[1]
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def _asdict(self) -> Dict[str, Any]:
+        """Get a dictionary with the fields of the observation, without copying."""
+        return dict(zip(self.__slots__, self))
 
     @property
     def shape(self):
@@ -213,15 +248,18 @@ class Observation:
 
     def clone(self):
         """Get a cloned copy of the current observation."""
-        return Observation(*tuple(x.clone() for x in self.to_torch()))
+        return Observation(*[to_torch(x).clone() for x in self])
 
     def to(self, *args, **kwargs):
         """Perform dtypes and device conversions. See torch.to()."""
-        return Observation(*tuple(x.to(*args, **kwargs) for x in self.to_torch()))
+        return Observation(*[to_torch(x).to(*args, **kwargs) for x in self])
 
     def to_torch(self):
         """Transform to torch."""
-        return Observation(*map(lambda x: to_torch(x), self))
+        return Observation(*map(to_torch, self))
+
+
+_get_observation_fields = attrgetter(*Observation.__slots__)
 
 
 @dataclass
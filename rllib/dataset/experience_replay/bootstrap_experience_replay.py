@@ -41,6 +41,44 @@ class BootstrapExperienceReplay(ExperienceReplay):
         self.mask_distribution = Poisson(torch.ones(num_bootstraps))
         self.bootstrap = bootstrap
 
+    @classmethod
+    def from_other(cls, other, num_memory_steps=None):
+        """Initialize a Bootstrap Experience Replay from another one.
+
+        The bootstrap masks are copied together with the observations.
+        """
+        new = cls(
+            num_bootstraps=other.weights.shape[-1],
+            bootstrap=other.bootstrap,
+            max_len=other.max_len,
+            transformations=other.transformations,
+            num_memory_steps=other.num_memory_steps
+            if num_memory_steps is None
+            else num_memory_steps,
+            columnar=other.columnar,
+            cache_transformations=other.cache_transformations,
+        )
+        new._copy_from(other)
+        return new
+
+    def _sample_masks(self, num_masks):
+        """Sample the bootstrap masks of `num_masks' new observations."""
+        if self.bootstrap:
+            return self.mask_distribution.sample((num_masks,)).int()
+        else:
+            return torch.ones(
+                num_masks, *self.mask_distribution.batch_shape, dtype=torch.int
+            )
+
+    def _copy_weights(self, other, source, target):
+        """Copy the masks of `other', or sample them as for new observations."""
+        if isinstance(other, BootstrapExperienceReplay) and (
+            other.weights.shape == self.weights.shape
+        ):
+            super()._copy_weights(other, source, target)
+        else:
+            self.weights[target] = self._sample_masks(len(target))
+
     def append(self, observation):
         """Append new observation to the dataset.
 
@@ -66,6 +104,26 @@ class BootstrapExperienceReplay(ExperienceReplay):
             self.weights[self.ptr] = torch.ones(self.mask_distribution.batch_shape)
         super().append(observation)
 
+    def append_batch(self, observation):
+        """Append a batch of new observations to the dataset.
+
+        Every observation in the batch gets its own bootstrap mask.
+
+        Parameters
+        ----------
+        observation: Observation
+
+        Raises
+        ------
+        TypeError
+            If the new observation is not of type Observation.
+        """
+        data_count = self.data_count
+        super().append_batch(observation)
+        num_new = min(self.data_count - data_count, self.max_len)
+        indexes = (self.data_count - num_new + torch.arange(num_new)) % self.max_len
+        self.weights[indexes] = self._sample_masks(num_new)
+
     def split(self, ratio=0.8, *args, **kwargs):
         """Split into two data sets."""
         return super().split(
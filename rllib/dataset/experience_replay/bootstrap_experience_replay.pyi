@@ -1,10 +1,15 @@
-from typing import Any
+from typing import Any, Optional, Type, TypeVar
 
 import numpy as np
+from torch import Tensor
 from torch.distributions import Poisson
 
+from rllib.dataset.datatypes import Observation
+
 from .experience_replay import ExperienceReplay
 
+T = TypeVar("T", bound="BootstrapExperienceReplay")
+
 class BootstrapExperienceReplay(ExperienceReplay):
     mask_distribution: Poisson
     bootstrap: bool
@@ -15,3 +20,12 @@ class BootstrapExperienceReplay(ExperienceReplay):
         *args: Any,
         **kwargs: Any,
     ) -> None: ...
+    @classmethod
+    def from_other(
+        cls: Type[T], other: T, num_memory_steps: Optional[int] = ...
+    ) -> T: ...
+    def _sample_masks(self, num_masks: int) -> Tensor: ...
+    def _copy_weights(
+        self, other: ExperienceReplay, source: Tensor, target: Tensor
+    ) -> None: ...
+    def append_batch(self, observation: Observation) -> None: ...
@@ -1,4 +1,5 @@
 """Implementation of an EXP3 Experience Replay Buffer."""
+import math
 
 import torch
 
@@ -27,6 +28,9 @@ class EXP3ExperienceReplay(PrioritizedExperienceReplay):
 
     ..math :: r_{t} / p_{:, t} 1[I_{t} = k]
 
+    The weights w_{k, t} are stored in the segment trees of the prioritized
+    experience replay, and the uniform mixture is sampled separately.
+
     Parameters
     ----------
     max_len: int.
@@ -64,11 +68,26 @@ class EXP3ExperienceReplay(PrioritizedExperienceReplay):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    @property
-    def probabilities(self):
-        """Get list of probabilities."""
-        probs = self.weights[: len(self)].reciprocal()
-        return probs / torch.sum(probs)
+    def _get_tree_values(self, indexes):
+        """Get the exponential weights, shifted by the maximum priority."""
+        return torch.exp(self._priorities[indexes] - self.max_priority)
+
+    def _value_to_probability(self, value):
+        """Get the sampling probability of a segment tree leaf value."""
+        num = len(self)
+        probs = value / self._sum_tree.reduce()
+        return ((1 - self.beta()) * probs + self.beta() / num).float()
+
+    def _probability_to_weight(self, probability):
+        """Get the importance sampling weight of a sampling probability."""
+        return 1.0 / (probability * len(self))
+
+    def _sample_indexes(self, batch_size):
+        """Sample from the mixture of the exponential weights and a uniform."""
+        indexes = self._sum_tree.sample(batch_size)
+        uniform = torch.rand(batch_size) < self.beta()
+        indexes[uniform] = self._valid_set.sample(uniform.sum().item())
+        return indexes
 
     def update(self, indexes, td):
         """Update experience replay sampling distribution with set of weights."""
@@ -76,21 +95,16 @@ class EXP3ExperienceReplay(PrioritizedExperienceReplay):
             indexes, return_counts=True, return_inverse=True
         )
 
-        inv_prob = self.probabilities[indexes].reciprocal()
+        inv_prob = self._get_probabilities(indexes).reciprocal()
         self._priorities[indexes] += self.alpha() * td * inv_prob * counts[inverse_idx]
 
-        self.max_priority = max(
-            self.max_priority, torch.max(self._priorities[idx]).item()
-        )
+        max_priority = max(self.max_priority, torch.max(self._priorities[idx]).item())
+        if max_priority > self.max_priority:  # Shift all the exponential weights.
+            factor = math.exp(self.max_priority - max_priority)
+            self._sum_tree.rescale(factor)
+            self._min_tree.rescale(factor)
+            self.max_priority = max_priority
+
         self.alpha.update()
         self.beta.update()
-        self._update_weights()
-
-    def _update_weights(self):
-        """Update priorities and weights."""
-        num = len(self)
-        probs = torch.exp(self._priorities[:num] - self.max_priority)
-        probs = (1 - self.beta()) * probs / torch.sum(probs) + self.beta() / num
-
-        weights = 1.0 / (probs * num)
-        self.weights[:num] = weights
+        self._update_trees(idx)
@@ -1,3 +1,6 @@
+from torch import Tensor
+
 from .prioritized_experience_replay import PrioritizedExperienceReplay
 
-class EXP3ExperienceReplay(PrioritizedExperienceReplay): ...
+class EXP3ExperienceReplay(PrioritizedExperienceReplay):
+    def update(self, indexes: Tensor, td: Tensor) -> None: ...
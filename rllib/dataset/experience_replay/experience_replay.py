@@ -1,15 +1,19 @@
 """Implementation of an Experience Replay Buffer."""
+import copy
+import json
 import math
+import os
 import warnings
 from dataclasses import asdict
 
 import numpy as np
 import torch
 from torch.utils import data
-from torch.utils.data._utils.collate import default_collate
 
 from rllib.dataset.datatypes import Observation
-from rllib.dataset.utilities import stack_list_of_tuples
+from rllib.dataset.utilities import map_observation, stack_list_of_tuples
+
+from .index_set import IndexSet
 
 
 class ExperienceReplay(data.Dataset):
@@ -27,11 +31,25 @@ class ExperienceReplay(data.Dataset):
         callable that takes an observation as input and returns a modified observation.
         If they have an `update` method it will be called whenever a new trajectory
         is added to the dataset.
+    num_memory_steps: int, optional.
+        Number of steps in return vector.
+    columnar: bool, optional (default=False).
+        Flag that indicates whether to store each field of the observations in its own
+        pre-allocated `[max_len, ...]' tensor instead of an array of observations.
+        The columns are allocated lazily at the first `append'.
+    cache_transformations: bool, optional (default=False).
+        Flag that indicates whether to keep the transformed observations materialized.
+        The cached observations are transformed again only when they are overwritten or
+        when a transformation is updated, see `AbstractTransform.version'. It assumes
+        that the transformations act on each transition independently and that they
+        only change through `update'.
 
     Methods
     -------
     append(observation) -> None:
         append an observation to the dataset.
+    append_batch(observation) -> None:
+        append a batch of observations to the dataset.
     is_full: bool
         check if buffer is full.
     update(indexes, td_error):
@@ -40,10 +58,18 @@ class ExperienceReplay(data.Dataset):
         Get all the transformed data.
     sample_batch(batch_size):
         Get a batch of data.
+    sample_episode_starts(batch_size):
+        Get a batch of indexes of first observations of the episodes.
+    get_episode(idx):
+        Get the episode that starts at a given index.
     reset():
         Reset the memory to zero.
     get_observation(idx):
         Get the observation at a given index.
+    save(path):
+        Save the buffer to a directory, writing only what changed since the last save.
+    load(path):
+        Load a buffer from a directory with memory maps.
 
     References
     ----------
@@ -54,13 +80,25 @@ class ExperienceReplay(data.Dataset):
     TODO: Make this class robust, easy to use, and fast.
     """
 
-    def __init__(self, max_len, transformations=None, num_memory_steps=0):
+    _checkpoint_arrays = ("valid", "weights")
+
+    def __init__(
+        self,
+        max_len,
+        transformations=None,
+        num_memory_steps=0,
+        columnar=False,
+        cache_transformations=False,
+    ):
         super().__init__()
         self.max_len = max_len
-        self.memory = np.empty((self.max_len,), dtype=Observation)
+        self.columnar = columnar
+        self.memory = None if self.columnar else np.empty((max_len,), dtype=Observation)
 
+        self._episode_start = torch.zeros(self.max_len, dtype=torch.bool)
+        self._new_episode = True
         self.valid = torch.zeros(self.max_len)
-        self.weights = torch.ones(self.max_len)
+        self._init_weights()
         self.data_count = 0
 
         self.transformations = transformations or list()
@@ -68,6 +106,13 @@ class ExperienceReplay(data.Dataset):
         self.zero_observation = None
 
         self.raw = False
+        self._checkpoint_path = None
+        self._checkpoint_count = 0
+
+        self.cache_transformations = cache_transformations
+        self._cache = None
+        self._cache_version = None
+        self._cache_count = 0
 
         if self.num_memory_steps < 0:
             raise ValueError("Number of steps must be non-negative.")
@@ -76,57 +121,122 @@ class ExperienceReplay(data.Dataset):
     def from_other(cls, other, num_memory_steps=None):
         """Create a Experience Replay from another one.
 
-        All observations will be added sequentially, but only that will be copied.
-        Weights will be initialized as if these were new observations.
+        The valid observations are copied in blocks, as if they were appended
+        sequentially. The weights are copied when both buffers use the same kind of
+        weights, otherwise they are initialized as if these were new observations.
         """
         num_memory_steps = (
             other.num_memory_steps if num_memory_steps is None else num_memory_steps
         )
-        new = cls(other.max_len, other.transformations, num_memory_steps)
-
-        start_idx = other.ptr
-        for i in range(other.max_len):
-            # Start iterating at the next location.
-            # In this case, when the num_memory_steps change,
-            # old observations are erased.
-
-            if other.valid[(start_idx + i) % other.max_len]:
-                observation = other.memory[(start_idx + i) % other.max_len]
-                new.append(observation)
-            elif other.valid[(start_idx + i - 1) % other.max_len]:  # Last of episode.
-                new.end_episode()
-            else:  # Either empty or belongs to some padding.
-                pass
-
+        new = cls(
+            max_len=other.max_len,
+            transformations=other.transformations,
+            num_memory_steps=num_memory_steps,
+            columnar=other.columnar,
+            cache_transformations=other.cache_transformations,
+        )
+        new._copy_from(other)
         return new
 
+    def _copy_from(self, other):
+        """Copy the observations of another buffer with block copies.
+
+        It mimics appending the valid observations sequentially, starting at the
+        oldest one, and ending an episode whenever a padding block starts. When the
+        number of memory steps changes, the oldest observations may be erased.
+        """
+        self._episode_start = torch.zeros(self.max_len, dtype=torch.bool)
+        self._new_episode = other._new_episode
+        self.valid = torch.zeros(self.max_len)
+        self.data_count = 0
+        self.zero_observation = other.zero_observation
+
+        order = (other.ptr + torch.arange(other.max_len)) % other.max_len
+        valid = other.valid[order].bool()
+        episode_end = ~valid & other.valid[(order - 1) % other.max_len].bool()
+        if not valid.any():
+            empty = torch.zeros(0, dtype=torch.long)
+            self._copy_weights(other, empty, empty)
+            return
+
+        # Position of each write in the sequence of appends of the new buffer.
+        num_steps = self.num_memory_steps
+        position = torch.cumsum(valid.long(), 0) - 1
+        position += num_steps * torch.cumsum(episode_end.long(), 0)
+        position = position[valid]
+        source = order[valid]
+
+        # Only the last `max_len' written positions survive in the ring buffer.
+        last = position[-1].item() + num_steps
+        first = max(position[0].item(), last - self.max_len + 1)
+        keep = position >= first
+        target = position[keep] % self.max_len
+        padding = torch.arange(first, last + 1) % self.max_len
+
+        if self.columnar:
+            self.memory = Observation(*[torch.zeros_like(x) for x in other.memory])
+            self._write(padding, self.zero_observation)
+            for column, other_column in zip(self.memory, other.memory):
+                column[target] = other_column[source[keep]]
+        else:
+            self.memory = np.empty((self.max_len,), dtype=Observation)
+            for idx in padding.tolist():
+                self.memory[idx] = self.zero_observation
+            self.memory[target.numpy()] = other.memory[source[keep].numpy()]
+
+        self._valid[target] = 1
+        self._episode_start[target] = other._episode_start[source[keep]]
+        self._build_indexes()
+        self._copy_weights(other, source[keep], target)
+        self.data_count = valid.sum().item() + num_steps * episode_end.sum().item()
+
+        _, observation = other._get_rows(source)
+        for transformation in self.transformations:
+            transformation.update(observation)
+
+    def _init_weights(self):
+        """Initialize the weights of the observations."""
+        self.weights = torch.ones(self.max_len)
+
+    def _get_weights(self, indexes):
+        """Get the weights of a batch of indexes."""
+        return self.weights[indexes]
+
+    def _copy_weights(self, other, source, target):
+        """Copy the weights of the observations of `other' at `source' to `target'."""
+        if other.weights.shape[1:] == self.weights.shape[1:]:
+            self.weights[target] = other.weights[source].to(self.weights.dtype)
+
     def add_dataset(self, other, start_idx=None, length=None):
         """Appends Experience Replay from another one.
 
-        All observations will be added sequentially, but only that will be copied.
-        Weights will be initialized as if these were new observations.
+        The valid observations are appended as one batch, in the order in which they
+        were stored in `other'. Weights will be initialized as if these were new
+        observations.
         """
-
-        self_transformations = sorted([str(type(transformation)) for transformation in self.transformations])
-        other_transformations = sorted([str(type(transformation)) for transformation in other.transformations])
-        
+        self_transformations = sorted(
+            [str(type(transformation)) for transformation in self.transformations]
+        )
+        other_transformations = sorted(
+            [str(type(transformation)) for transformation in other.transformations]
+        )
         assert self_transformations == other_transformations
-        
+
         if start_idx is None:
             start_idx = other.ptr
-        
+
         if length is None:
             length = other.max_len
-            
-        for i in range(length):
-            if other.valid[(start_idx + i) % other.max_len]:
-                observation = other.memory[(start_idx + i) % other.max_len]
-                self.append(observation.clone())
-            else:  # Either empty or belongs to some padding.
-                pass
+
+        rows = (start_idx + torch.arange(length)) % other.max_len
+        rows = rows[other.valid[rows].bool()]
+        if len(rows) == 0:
+            return
+        _, observation = other._get_rows(rows)
+        self.append_batch(observation)
 
     def split(self, ratio=0.8, *args, **kwargs):
-        """Split into two data sets."""
+        """Split into two data sets with a random permutation of the indexes."""
         idx = np.arange(0, len(self))
         np.random.shuffle(idx)
         split_idx = math.ceil(ratio * len(self))
@@ -134,19 +244,38 @@ class ExperienceReplay(data.Dataset):
         test_idx = idx[split_idx:]
 
         train = type(self)(
-            max_len=self.max_len, transformations=self.transformations, *args, **kwargs
+            max_len=self.max_len,
+            transformations=self.transformations,
+            columnar=self.columnar,
+            cache_transformations=self.cache_transformations,
+            *args,
+            **kwargs,
         )
         test = type(self)(
-            max_len=self.max_len, transformations=self.transformations, *args, **kwargs
+            max_len=self.max_len,
+            transformations=self.transformations,
+            columnar=self.columnar,
+            cache_transformations=self.cache_transformations,
+            *args,
+            **kwargs,
         )
 
         for dataset, idx in zip([train, test], [train_idx, test_idx]):
-            for i in idx:
-                dataset.memory[i] = self.memory[i]
-                dataset.valid[i] = self.valid[i]
-                dataset.weights[i] = self.weights[i]
-                dataset.data_count += 1
-
+            index = torch.as_tensor(idx, dtype=torch.long)
+            if self.columnar:
+                if self.memory is not None:
+                    zeros = [torch.zeros_like(x) for x in self.memory]
+                    dataset.memory = Observation(*zeros)
+                    for column, self_column in zip(dataset.memory, self.memory):
+                        column[index] = self_column[index]
+            else:
+                dataset.memory[idx] = self.memory[idx]
+            dataset.zero_observation = self.zero_observation
+            dataset._valid[index] = self.valid[index]
+            dataset._episode_start[index] = self._episode_start[index]
+            dataset._build_indexes()
+            dataset._copy_weights(self, index, index)
+            dataset.data_count = len(idx)
         return train, test
 
     def __len__(self):
@@ -171,9 +300,12 @@ class ExperienceReplay(data.Dataset):
 
         """
         if self.valid[idx] == 0:  # when a non-valid index is sampled.
-            idx = np.random.choice(self.valid_indexes).item()
+            idx = self._valid_set.sample(1).item()
 
-        return asdict(self._get_observation(idx)), idx, self.weights[idx]
+        observation = self._get_observation(idx)
+        if self.columnar:  # Gathered tensors are already copies of the memory.
+            return observation._asdict(), idx, self._get_weights(idx)
+        return asdict(observation), idx, self._get_weights(idx)
 
     def _init_observation(self, observation):
         if observation.state.ndim == 0:
@@ -193,35 +325,59 @@ class ExperienceReplay(data.Dataset):
             num_actions=num_actions,
         )
 
+    def _init_memory(self, observation):
+        """Pre-allocate one `[max_len, ...]' column per observation field."""
+        self.memory = Observation(
+            *[
+                torch.zeros((self.max_len,) + x.shape, dtype=x.dtype, device=x.device)
+                for x in observation
+            ]
+        )
+
+    def _write(self, idx, observation):
+        """Write an observation at position(s) `idx' of the memory."""
+        if self.columnar:
+            for column, value in zip(self.memory, observation):
+                column[idx] = value.detach().to(column.dtype)
+        else:
+            self.memory[idx] = observation
+
+    def _get_window_indexes(self, start_idx, num_memory_steps):
+        """Get the indexes of the windows of consecutive observations.
+
+        The windows that go past the end of the memory wrap around the circular buffer.
+        For a batch of start indexes, the output is a `[batch, num_steps]' matrix.
+        """
+        index = torch.as_tensor(start_idx).unsqueeze(-1)
+        return (index + torch.arange(max(1, num_memory_steps))) % self.max_len
+
     def _get_consecutive_observations(self, start_idx, num_memory_steps):
-        if num_memory_steps == 0 and not (
-            isinstance(start_idx, int) or isinstance(start_idx, int)
-        ):
-            observation = stack_list_of_tuples(self.memory[start_idx])
-            return Observation(*map(lambda x: x.unsqueeze(1), observation))
-        num_memory_steps = max(1, num_memory_steps)
-        if start_idx + num_memory_steps <= self.max_len:
-            obs_list = self.memory[start_idx : start_idx + num_memory_steps]
-        else:  # The trajectory is split by the circular buffer.
-            delta_idx = start_idx + num_memory_steps - self.max_len
-            obs_list = np.concatenate(
-                (self.memory[start_idx : self.max_len], self.memory[:delta_idx])
-            )
+        index = self._get_window_indexes(start_idx, num_memory_steps)
+        if self.columnar:
+            return Observation(*[x[index] for x in self.memory])
 
-        return stack_list_of_tuples(obs_list)
+        # Stack all the windows at once and reshape them as `[batch, num_steps]'.
+        observation = stack_list_of_tuples(self.memory[index.reshape(-1).numpy()])
+        return Observation(*[x.reshape(index.shape + x.shape[1:]) for x in observation])
 
     def _get_observation(self, idx):
         """Return any desired observation.
 
         Parameters
         ----------
-        idx: int
+        idx: int or array
+            Index or batch of indexes of the first observation of each window.
 
         Returns
         -------
         observation: Observation
 
         """
+        if self.cache_transformations and not self.raw:
+            self._update_cache()
+            index = self._get_window_indexes(idx, self.num_memory_steps)
+            return Observation(*[x[index] for x in self._cache])
+
         observation = self._get_consecutive_observations(idx, self.num_memory_steps)
         if self.raw:
             return observation
@@ -229,12 +385,79 @@ class ExperienceReplay(data.Dataset):
             observation = transform(observation)
         return observation
 
+    def _get_transformations_version(self):
+        """Get a key that changes whenever a transformation is replaced or updated."""
+        return tuple(
+            (id(transformation), getattr(transformation, "version", 0))
+            for transformation in self.transformations
+        )
+
+    def _update_cache(self):
+        """Transform the observations written since the cache was last updated."""
+        version = self._get_transformations_version()
+        if self._cache is None or version != self._cache_version:
+            rows = self._get_written_rows()
+        else:
+            rows = self._get_written_rows(self._cache_count)
+        self._cache_version, self._cache_count = version, self.data_count
+
+        rows, observation = self._get_rows(rows)
+        if observation is None:
+            return
+        with torch.no_grad():
+            for transformation in self.transformations:
+                observation = transformation(observation)
+
+        if self._cache is None:
+            self._cache = Observation(
+                *[
+                    torch.zeros((self.max_len,) + x.shape[1:], dtype=x.dtype)
+                    for x in observation
+                ]
+            )
+        for column, value in zip(self._cache, observation):
+            column[rows] = value.to(column.dtype)
+
+    def _get_written_rows(self, count=None):
+        """Get the slots written since the data count was `count'.
+
+        If `count' is None, or if the buffer was reset after it, get all the slots.
+        """
+        if count is None or count > self.data_count:
+            return torch.arange(self.max_len)
+        end = self.data_count + self.num_memory_steps
+        start = max(count, end - self.max_len)
+        return torch.arange(start, end) % self.max_len
+
+    def _get_rows(self, rows):
+        """Gather the observations stored at `rows' as contiguous columns.
+
+        Only the rows that have been written are returned.
+        """
+        if self.columnar:
+            if self.memory is None:
+                return rows, None
+            return rows, Observation(*[x[rows].detach().clone() for x in self.memory])
+
+        written = [isinstance(x, Observation) for x in self.memory[rows.numpy()]]
+        rows = rows[torch.tensor(written, dtype=torch.bool)]
+        if len(rows) == 0:
+            return rows, None
+        return rows, stack_list_of_tuples(self.memory[rows.numpy()])
+
     def reset(self):
         """Reset memory to empty."""
-        self.memory = np.empty((self.max_len,), dtype=Observation)
+        if self.columnar:
+            self.memory = None
+        else:
+            self.memory = np.empty((self.max_len,), dtype=Observation)
+        self._episode_start = torch.zeros(self.max_len, dtype=torch.bool)
+        self._new_episode = True
         self.valid = torch.zeros(self.max_len)
         self.data_count = 0
         self.zero_observation = None
+        self._checkpoint_path = None
+        self._cache = None
 
     def end_episode(self):
         """Terminate an episode.
@@ -243,14 +466,15 @@ class ExperienceReplay(data.Dataset):
         """
         for _ in range(self.num_memory_steps):
             self.data_count += 1
+        self._new_episode = True
 
     def append_invalid(self):
         """Append an invalid transition."""
         if self.zero_observation is None:
             warnings.warn("Buffer not initialized.", RuntimeWarning)
         else:
-            self.memory[self.ptr] = self.zero_observation
-            self.valid[self.ptr] = 0
+            self._write(self.ptr, self.zero_observation)
+            self._set_valid([], self.ptr)
             self.data_count += 1
 
     def append(self, observation):
@@ -273,27 +497,121 @@ class ExperienceReplay(data.Dataset):
         if self.zero_observation is None:
             self._init_observation(observation)
 
-        self.memory[self.ptr] = observation.clone()
-        self.valid[self.ptr] = 1
+        if self.columnar:
+            if self.memory is None:
+                self._init_memory(observation.to_torch())
+            self._write(self.ptr, observation.to_torch())
+            padding = torch.arange(self.ptr + 1, self.ptr + 1 + self.num_memory_steps)
+            self._write(padding % self.max_len, self.zero_observation)
+            self._set_valid(self.ptr, padding % self.max_len)
+            self.data_count += 1
+        else:
+            self.memory[self.ptr] = observation.clone()
+
+            padding = []
+            for i in range(self.num_memory_steps):
+                self.memory[(self.ptr + i + 1) % self.max_len] = self.zero_observation
+                padding.append((self.ptr + i + 1) % self.max_len)
+            self._set_valid(self.ptr, padding)
+            self.data_count += 1
+
+        for transformation in self.transformations:
+            transformation.update(observation.clone())
+
+    def append_batch(self, observation):
+        """Append a batch of new observations to the dataset.
+
+        The observations are written as if they were appended sequentially, but with
+        one slice assignment and one update of the transformations per batch.
 
-        for i in range(self.num_memory_steps):
-            self.memory[(self.ptr + i + 1) % self.max_len] = self.zero_observation
-            self.valid[(self.ptr + i + 1) % self.max_len] = 0
-        self.data_count += 1
+        Parameters
+        ----------
+        observation: Observation
+            Batched observation. All the attributes that have the batch shape of the
+            observation as leading dimensions are split, the rest are repeated.
+
+        Raises
+        ------
+        TypeError
+            If the new observation is not of type Observation.
+        """
+        if not isinstance(observation, Observation):
+            raise TypeError(
+                f"input has to be of type Observation, and it was {type(observation)}"
+            )
+        observation = map_observation(lambda x: x.detach(), observation.to_torch())
+        observation = self._flatten_batch(observation)
+        batch_size = observation.state.shape[0]
+        if batch_size == 0:
+            return
+        if self.zero_observation is None:
+            self._init_observation(Observation(*[x[0] for x in observation]))
+
+        # Only the last `max_len' observations of the batch fit in the buffer.
+        num_new = min(batch_size, self.max_len)
+        start = self.data_count + batch_size - num_new
+        index = (start + torch.arange(num_new)) % self.max_len
+        padding = start + num_new + torch.arange(self.num_memory_steps)
+        padding = padding % self.max_len
+
+        if self.columnar:
+            if self.memory is None:
+                self._init_memory(Observation(*[x[0] for x in observation]))
+            self._write(index, Observation(*[x[-num_new:] for x in observation]))
+            self._write(padding, self.zero_observation)
+        else:
+            batch = observation.clone()
+            for i, idx in enumerate(index.tolist(), batch_size - num_new):
+                self.memory[idx] = Observation(*[x[i] for x in batch])
+            for idx in padding.tolist():
+                self.memory[idx] = self.zero_observation
+        self._set_valid(index, padding)
+        self.data_count += batch_size
 
         for transformation in self.transformations:
             transformation.update(observation.clone())
-            transformed_observation = transformation(observation.clone())
+
+    @staticmethod
+    def _flatten_batch(observation):
+        """Reshape the attributes of a batched observation to `[batch_size, ...]'."""
+        batch_shape = observation.shape
+        batch_size = int(np.prod(batch_shape))
+
+        def _flatten(tensor):
+            if tensor.shape[: len(batch_shape)] == batch_shape:
+                return tensor.reshape(batch_size, *tensor.shape[len(batch_shape) :])
+            return tensor.expand(batch_size, *tensor.shape)
+
+        return Observation(*map(_flatten, observation))
 
     def sample_batch(self, batch_size):
         """Sample a batch of observations."""
-        indices = np.random.choice(self.valid_indexes, batch_size)
-        if self.num_memory_steps == 0:
-            obs = self._get_observation(indices)
-            return obs, torch.tensor(indices), self.weights[indices]
-        else:
-            obs, idx, weight = default_collate([self[i] for i in indices])
-            return Observation(**obs), idx, weight
+        indices = self._valid_set.sample(batch_size)
+        obs = self._get_observation(indices)
+        return obs, indices, self._get_weights(indices)
+
+    def sample_episode_starts(self, batch_size):
+        """Sample the indexes of the first observation of `batch_size' episodes."""
+        return self._start_set.sample(batch_size)
+
+    def sample_initial_states(self, batch_size):
+        """Sample `batch_size' raw initial states of the episodes in the buffer."""
+        _, observation = self._get_rows(self.sample_episode_starts(batch_size))
+        return observation.state
+
+    def get_episode(self, idx):
+        """Get the raw observations of the episode that starts at index `idx'.
+
+        The episode ends before an invalid slot, before the start of another episode,
+        or at the newest observation of the buffer.
+        """
+        order = (idx + torch.arange(self.max_len)) % self.max_len
+        in_episode = self.valid[order].bool() & ~self._episode_start[order]
+        in_episode[0] = True
+        length = torch.cumprod(in_episode.long(), 0).sum().item()
+        length = min(length, (self.ptr - idx - 1) % self.max_len + 1)
+        _, observation = self._get_rows(order[:length])
+        return observation
 
     @property
     def is_full(self):
@@ -308,6 +626,9 @@ class ExperienceReplay(data.Dataset):
     @property
     def all_data(self):
         """Get all the data."""
+        if self.cache_transformations:
+            self._update_cache()
+            return Observation(*[x[self.valid_indexes] for x in self._cache])
         all_obs = self.all_raw
 
         for transformation in self.transformations:
@@ -317,6 +638,9 @@ class ExperienceReplay(data.Dataset):
     @property
     def all_raw(self):
         """Get all the un-transformed data."""
+        if self.columnar:
+            valid_indexes = self.valid_indexes
+            return Observation(*[x[valid_indexes] for x in self.memory])
         all_raw = stack_list_of_tuples(self.memory[self.valid_indexes])
         return all_raw
 
@@ -325,11 +649,61 @@ class ExperienceReplay(data.Dataset):
         """Return data pointer where the next transition will be written."""
         return self.data_count % self.max_len
 
+    @property
+    def valid(self):
+        """Get the flags that indicate which slots hold a valid observation."""
+        return self._valid
+
+    @valid.setter
+    def valid(self, value):
+        """Set the flags of valid slots and rebuild the indexes."""
+        self._valid = value
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """Build the compact indexes of valid slots and of episode starts.
+
+        Besides the recorded episode starts, a valid slot that follows an invalid one
+        starts an episode.
+        """
+        valid = self._valid.bool()
+        self._episode_start = valid & (self._episode_start | ~valid.roll(1))
+        self._valid_set = IndexSet.from_mask(valid)
+        self._start_set = IndexSet.from_mask(self._episode_start)
+
+    def _set_valid(self, valid_index, invalid_index):
+        """Flag slots as valid or invalid and update the indexes in O(len(index)).
+
+        The first valid slot written after `end_episode' starts an episode.
+        """
+        valid_index = torch.as_tensor(valid_index, dtype=torch.long).reshape(-1)
+        invalid_index = torch.as_tensor(invalid_index, dtype=torch.long).reshape(-1)
+        self._valid[valid_index] = 1
+        self._valid[invalid_index] = 0
+        self._valid_set.add(valid_index)
+        self._valid_set.remove(invalid_index)
+
+        written = torch.cat((valid_index, invalid_index))
+        self._episode_start[written] = False
+        self._start_set.remove(written)
+        if self._new_episode and len(valid_index) > 0:
+            self._episode_start[valid_index[0]] = True
+            self._start_set.add(valid_index[0])
+            self._new_episode = False
+
     @property
     def valid_indexes(self):
-        """Return list of valid indexes."""
+        """Return list of valid indexes, sorted.
+
+        Use `_valid_set' to sample valid indexes without scanning the buffer.
+        """
         return torch.nonzero(self.valid, as_tuple=False).squeeze(1)
 
+    @property
+    def episode_start_indexes(self):
+        """Return the indexes of the first observation of the episodes, unsorted."""
+        return self._start_set.to_tensor()
+
     @property
     def num_memory_steps(self):
         """Return the number of steps."""
@@ -337,14 +711,109 @@ class ExperienceReplay(data.Dataset):
 
     @num_memory_steps.setter
     def num_memory_steps(self, value):
-        """Reset the number of steps."""
+        """Reset the number of steps and re-arrange the memory with block copies."""
+        other = copy.copy(self)
         self._num_memory_steps = value
-        other = ExperienceReplay.from_other(self, num_memory_steps=value)
-        self.memory = other.memory
-        self.valid = other.valid
-        self.data_count = other.data_count
-        self.weights = other.weights
+        self._copy_from(other)
+        self._checkpoint_path = None
+        self._cache = None
 
     def update(self, indexes, td_error):
         """Update experience replay sampling distribution with set of weights."""
         pass
+
+    def save(self, path):
+        """Save the buffer to the directory `path'.
+
+        Each observation field is stored as a contiguous `[max_len, ...]' `.npy' file.
+        When the buffer was last saved to the same directory, only the slots written
+        since then are written again.
+        """
+        self.get_checkpoint_writer(path)()
+
+    def get_checkpoint_writer(self, path):
+        """Copy the slots written since the last save and return a writer function.
+
+        The data is copied when this method is called, so the returned writer only
+        does I/O and it can run in a background thread while the buffer changes.
+        """
+        if path == self._checkpoint_path:
+            rows = self._get_written_rows(self._checkpoint_count)
+        else:
+            rows = self._get_written_rows()
+        rows, columns = self._get_rows(rows)
+
+        overwrite = path != self._checkpoint_path
+        arrays = {name: getattr(self, name).clone() for name in self._checkpoint_arrays}
+        arrays["episode_start"] = self._episode_start.clone()
+        metadata = dict(
+            max_len=self.max_len,
+            num_memory_steps=self.num_memory_steps,
+            data_count=self.data_count,
+            initialized=self.zero_observation is not None,
+            new_episode=self._new_episode,
+        )
+        self._checkpoint_path, self._checkpoint_count = path, self.data_count
+
+        def write():
+            os.makedirs(path, exist_ok=True)
+            for name, column in zip(Observation.__dataclass_fields__, columns or []):
+                file = os.path.join(path, f"{name}.npy")
+                array = np.lib.format.open_memmap(
+                    file,
+                    mode="w+" if overwrite or not os.path.exists(file) else "r+",
+                    dtype=column.numpy().dtype,
+                    shape=(self.max_len,) + tuple(column.shape[1:]),
+                )
+                array[rows.numpy()] = column.numpy()
+                array.flush()
+            for name, tensor in arrays.items():
+                np.save(os.path.join(path, f"{name}.npy"), tensor.numpy())
+            with open(os.path.join(path, "metadata.json"), "w") as file:
+                json.dump(metadata, file)
+
+        return write
+
+    def load(self, path):
+        """Load a buffer saved with `save' from the directory `path'.
+
+        The observation columns are memory-mapped copy-on-write, so they are only read
+        from disk when they are accessed and the files are never modified.
+        The statistics of the transformations are not stored with the buffer.
+        """
+        with open(os.path.join(path, "metadata.json"), "r") as file:
+            metadata = json.load(file)
+        for key in ["max_len", "num_memory_steps"]:
+            if metadata[key] != getattr(self, key):
+                raise ValueError(
+                    f"Stored buffer has {key}={metadata[key]} and it was "
+                    f"initialized with {key}={getattr(self, key)}."
+                )
+
+        self.reset()
+        self.data_count = metadata["data_count"]
+        self._new_episode = metadata.get("new_episode", True)
+        episode_start = os.path.join(path, "episode_start.npy")
+        if os.path.exists(episode_start):  # the indexes are built with the valid flags.
+            self._episode_start = torch.from_numpy(np.load(episode_start))
+        for name in self._checkpoint_arrays:
+            array = np.load(os.path.join(path, f"{name}.npy"))
+            setattr(self, name, torch.from_numpy(array))
+
+        if metadata["initialized"]:
+            memory = Observation(
+                *[
+                    torch.from_numpy(
+                        np.load(os.path.join(path, f"{name}.npy"), mmap_mode="c")
+                    )
+                    for name in Observation.__dataclass_fields__
+                ]
+            )
+            if self.columnar:
+                self.memory = memory
+            else:
+                num_written = min(self.max_len, self.data_count + self.num_memory_steps)
+                for i in range(num_written):
+                    self.memory[i] = Observation(*[x[i] for x in memory])
+            self._init_observation(Observation(*[x[0] for x in memory]))
+        self._checkpoint_path, self._checkpoint_count = path, self.data_count
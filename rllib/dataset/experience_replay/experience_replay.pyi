@@ -1,49 +1,95 @@
-from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union
 
 import torch.nn as nn
 from numpy import ndarray
 from torch import Tensor
 from torch.utils import data
 
-from rllib.dataset.datatypes import Observation
+from rllib.dataset.datatypes import Index, Observation
 from rllib.dataset.transforms import AbstractTransform
 
+from .index_set import IndexSet
+
 T = TypeVar("T", bound="ExperienceReplay")
 
 class ExperienceReplay(data.Dataset):
     max_len: int
-    memory: ndarray
-    valid: Tensor
+    columnar: bool
+    memory: Optional[Union[ndarray, Observation]]
+    _valid: Tensor
+    _valid_set: IndexSet
+    _episode_start: Tensor
+    _start_set: IndexSet
+    _new_episode: bool
     weights: Tensor
     transformations: List[AbstractTransform]
     data_count: int
     _num_memory_steps: int
     zero_observation: Optional[Observation]
     raw: bool
+    _checkpoint_path: Optional[str]
+    _checkpoint_count: int
+    _checkpoint_arrays: Tuple[str, ...]
+    cache_transformations: bool
+    _cache: Optional[Observation]
+    _cache_version: Optional[Tuple[Tuple[int, int], ...]]
+    _cache_count: int
     def __init__(
         self,
         max_len: int,
         transformations: Optional[Union[List[AbstractTransform], nn.ModuleList]] = ...,
         num_memory_steps: int = ...,
+        columnar: bool = ...,
+        cache_transformations: bool = ...,
     ) -> None: ...
     @classmethod
     def from_other(
         cls: Type[T], other: T, num_memory_steps: Optional[int] = ...
     ) -> T: ...
+    def _copy_from(self, other: ExperienceReplay) -> None: ...
+    def _init_weights(self) -> None: ...
+    def _get_weights(self, indexes: Index) -> Tensor: ...
+    def _copy_weights(
+        self, other: ExperienceReplay, source: Tensor, target: Tensor
+    ) -> None: ...
+    def add_dataset(
+        self,
+        other: ExperienceReplay,
+        start_idx: Optional[int] = ...,
+        length: Optional[int] = ...,
+    ) -> None: ...
     def split(self, ratio: float = ..., *args: Any, **kwargs: Any) -> Tuple[T, T]: ...
     def __len__(self) -> int: ...
     def __getitem__(self, item: int) -> Tuple[Dict[str, Tensor], int, Tensor]: ...
     def _init_observation(self, observation: Observation) -> None: ...
+    def _init_memory(self, observation: Observation) -> None: ...
+    def _write(self, idx: Union[int, Tensor], observation: Observation) -> None: ...
+    def _get_window_indexes(self, start_idx: Index, num_memory_steps: int) -> Tensor: ...
     def _get_consecutive_observations(
-        self, start_idx: int, num_memory_steps: int
+        self, start_idx: Index, num_memory_steps: int
     ) -> Observation: ...
-    def _get_observation(self, idx: int) -> Observation: ...
+    def _get_observation(self, idx: Index) -> Observation: ...
+    def _get_transformations_version(self) -> Tuple[Tuple[int, int], ...]: ...
+    def _update_cache(self) -> None: ...
+    def _get_written_rows(self, count: Optional[int] = ...) -> Tensor: ...
+    def _get_rows(self, rows: Tensor) -> Tuple[Tensor, Optional[Observation]]: ...
+    def _build_indexes(self) -> None: ...
+    def _set_valid(self, valid_index: Index, invalid_index: Index) -> None: ...
     def reset(self) -> None: ...
     def end_episode(self) -> None: ...
     def append(self, observation: Observation) -> None: ...
+    def append_batch(self, observation: Observation) -> None: ...
+    @staticmethod
+    def _flatten_batch(observation: Observation) -> Observation: ...
     def append_invalid(self) -> None: ...
     def sample_batch(self, batch_size: int) -> Tuple[Observation, Tensor, Tensor]: ...
+    def sample_episode_starts(self, batch_size: int) -> Tensor: ...
+    def sample_initial_states(self, batch_size: int) -> Tensor: ...
+    def get_episode(self, idx: int) -> Observation: ...
     def update(self, indexes: Tensor, td_error: Tensor) -> None: ...
+    def save(self, path: str) -> None: ...
+    def get_checkpoint_writer(self, path: str) -> Callable[[], None]: ...
+    def load(self, path: str) -> None: ...
     @property
     def all_data(self) -> Observation: ...
     @property
@@ -53,8 +99,14 @@ class ExperienceReplay(data.Dataset):
     @property
     def ptr(self) -> int: ...
     @property
+    def valid(self) -> Tensor: ...
+    @valid.setter
+    def valid(self, value: Tensor) -> None: ...
+    @property
     def valid_indexes(self) -> Tensor: ...
     @property
+    def episode_start_indexes(self) -> Tensor: ...
+    @property
     def num_memory_steps(self) -> int: ...
     @num_memory_steps.setter
     def num_memory_steps(self, value: int) -> None: ...
@@ -0,0 +1,84 @@
+"""Implementation of a compact set of slot indexes used by the experience replays."""
+import numpy as np
+import torch
+
+
+class IndexSet(object):
+    """A set of integers in [0, max_len) that supports O(1) uniform sampling.
+
+    The members are stored contiguously in the first `len(self)' entries of `indexes',
+    and `position' maps every integer to its entry in `indexes', or to -1 if it is not
+    a member. Removing a member moves the last member to its entry.
+
+    Parameters
+    ----------
+    max_len: int.
+        Size of the universe of the set.
+
+    Methods
+    -------
+    add(index):
+        add a (batch of) index(es) to the set.
+    remove(index):
+        remove a (batch of) index(es) from the set.
+    sample(batch_size):
+        sample members uniformly at random with replacement.
+    """
+
+    def __init__(self, max_len):
+        self.max_len = max_len
+        self.indexes = torch.zeros(max_len, dtype=torch.long)
+        self.position = torch.full((max_len,), -1, dtype=torch.long)
+        self.size = 0
+
+    @classmethod
+    def from_mask(cls, mask):
+        """Create a set with the non-zero entries of `mask'."""
+        index_set = cls(len(mask))
+        index_set.add(torch.nonzero(mask, as_tuple=False).squeeze(1))
+        return index_set
+
+    def __len__(self):
+        """Return the number of members of the set."""
+        return self.size
+
+    def __contains__(self, index):
+        """Check if `index' is a member of the set."""
+        return bool(self.position[index] >= 0)
+
+    def to_tensor(self):
+        """Return the members of the set, in no particular order."""
+        return self.indexes[: self.size]
+
+    def add(self, index):
+        """Add `index' to the set."""
+        index = torch.as_tensor(index, dtype=torch.long).reshape(-1)
+        index = torch.unique(index[self.position[index] < 0])
+        new_size = self.size + len(index)
+        self.indexes[self.size : new_size] = index
+        self.position[index] = torch.arange(self.size, new_size)
+        self.size = new_size
+
+    def remove(self, index):
+        """Remove `index' from the set."""
+        index = torch.as_tensor(index, dtype=torch.long).reshape(-1)
+        index = torch.unique(index[self.position[index] >= 0])
+        if len(index) == 0:
+            return
+        new_size = self.size - len(index)
+        holes = self.position[index]
+        self.position[index] = -1
+
+        # Move the members that are after `new_size' to the holes before it.
+        holes = holes[holes < new_size]
+        tail = self.indexes[new_size : self.size]
+        tail = tail[self.position[tail] >= 0]
+        self.indexes[holes] = tail
+        self.position[tail] = holes
+        self.size = new_size
+
+    def sample(self, batch_size):
+        """Sample `batch_size' members uniformly at random with replacement."""
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty set.")
+        return self.indexes[np.random.randint(self.size, size=batch_size)]
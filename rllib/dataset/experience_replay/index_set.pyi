@@ -0,0 +1,22 @@
+from typing import Type, TypeVar
+
+from torch import Tensor
+
+from rllib.dataset.datatypes import Index
+
+T = TypeVar("T", bound="IndexSet")
+
+class IndexSet(object):
+    max_len: int
+    indexes: Tensor
+    position: Tensor
+    size: int
+    def __init__(self, max_len: int) -> None: ...
+    @classmethod
+    def from_mask(cls: Type[T], mask: Tensor) -> T: ...
+    def __len__(self) -> int: ...
+    def __contains__(self, index: int) -> bool: ...
+    def to_tensor(self) -> Tensor: ...
+    def add(self, index: Index) -> None: ...
+    def remove(self, index: Index) -> None: ...
+    def sample(self, batch_size: int) -> Tensor: ...
@@ -0,0 +1,176 @@
+"""Implementation of a disk-backed Experience Replay Buffer."""
+import json
+import os
+
+import numpy as np
+import torch
+
+from rllib.dataset.datatypes import Observation
+
+from .experience_replay import ExperienceReplay
+
+
+class MemoryMappedExperienceReplay(ExperienceReplay):
+    """An Experience Replay Buffer whose storage lives in memory-mapped files.
+
+    Each field of the observations is stored in its own `[max_len, ...]' `.npy' file
+    inside `path', and the buffer reads and writes these files through torch tensors
+    that share the memory map. Hence, the buffer can be larger than the RAM and only
+    the pages that are accessed are loaded by the operating system.
+
+    The buffer is columnar, so it appends batches of observations with slice writes.
+    The sampled indexes are sorted before the gather, so that the reads traverse the
+    files in order. The bookkeeping is stored in a json file, which is written at the
+    end of every episode and by `flush', so that the buffer persists across process
+    restarts without pickling it. The statistics of the transformations are not
+    stored, they must be saved together with the modules that own them.
+
+    Parameters
+    ----------
+    max_len: int.
+        buffer size of experience replay algorithm.
+    path: str.
+        Directory where the memory-mapped files are stored. If it contains a buffer,
+        this buffer is loaded.
+    transformations: list of transforms.AbstractTransform, optional.
+        A sequence of transformations to apply to the dataset.
+    num_memory_steps: int, optional.
+        Number of steps in return vector.
+
+    Methods
+    -------
+    flush():
+        flush the memory maps and write the metadata to disk.
+    """
+
+    METADATA = "metadata.json"
+
+    def __init__(self, max_len, path, transformations=None, num_memory_steps=0):
+        super().__init__(
+            max_len=max_len,
+            transformations=transformations,
+            num_memory_steps=num_memory_steps,
+            columnar=True,
+        )
+        self.path = path
+        self._arrays = dict()
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(self._file(self.METADATA)):
+            self._load()
+        else:
+            self.valid = self._open("valid", torch.zeros(self.max_len))
+            self.weights = self._open("weights", torch.ones(self.max_len))
+            self._write_metadata()
+
+    def _file(self, name):
+        """Get the path of a file of the buffer."""
+        return os.path.join(self.path, name)
+
+    def _open(self, name, initial_value):
+        """Create a memory-mapped file and return a tensor that shares its memory."""
+        array = np.lib.format.open_memmap(
+            self._file(f"{name}.npy"),
+            mode="w+",
+            dtype=initial_value.numpy().dtype,
+            shape=tuple(initial_value.shape),
+        )
+        self._arrays[name] = array
+        tensor = torch.from_numpy(array)
+        tensor[:] = initial_value
+        return tensor
+
+    def _map(self, name):
+        """Return a tensor that shares the memory of an existing memory-mapped file."""
+        self._arrays[name] = np.load(self._file(f"{name}.npy"), mmap_mode="r+")
+        return torch.from_numpy(self._arrays[name])
+
+    def _load(self):
+        """Load the buffer stored in `path'."""
+        with open(self._file(self.METADATA), "r") as file:
+            metadata = json.load(file)
+        for key in ["max_len", "num_memory_steps"]:
+            if metadata[key] != getattr(self, key):
+                raise ValueError(
+                    f"Stored buffer has {key}={metadata[key]} and it was "
+                    f"initialized with {key}={getattr(self, key)}."
+                )
+
+        self.valid = self._map("valid")
+        self.weights = self._map("weights")
+        self.data_count = metadata["data_count"]
+        if metadata["initialized"]:
+            self.memory = Observation(*[self._map(name) for name in self._fields])
+            self._init_observation(Observation(*[x[0] for x in self.memory]))
+
+    def _write_metadata(self):
+        """Write the bookkeeping of the buffer to disk."""
+        metadata = dict(
+            max_len=self.max_len,
+            num_memory_steps=self.num_memory_steps,
+            data_count=self.data_count,
+            initialized=self.memory is not None,
+        )
+        with open(self._file(self.METADATA), "w") as file:
+            json.dump(metadata, file)
+
+    @property
+    def _fields(self):
+        """Get the names of the observation fields."""
+        return list(Observation.__dataclass_fields__)
+
+    def _init_memory(self, observation):
+        """Create one `[max_len, ...]' memory-mapped file per observation field."""
+        self.memory = Observation(
+            *[
+                self._open(name, torch.zeros((self.max_len,) + x.shape, dtype=x.dtype))
+                for name, x in zip(self._fields, observation)
+            ]
+        )
+
+    def flush(self):
+        """Flush the memory maps and write the metadata to disk."""
+        for array in self._arrays.values():
+            array.flush()
+        self._write_metadata()
+
+    def end_episode(self):
+        """Terminate an episode and write the metadata to disk."""
+        super().end_episode()
+        self._write_metadata()
+
+    def reset(self):
+        """Reset memory to empty.
+
+        The memory-mapped files of the fields are re-created at the next `append'.
+        """
+        super().reset()
+        self._arrays = dict()
+        self.valid = self._open("valid", torch.zeros(self.max_len))
+        self.weights = self._open("weights", torch.ones(self.max_len))
+        self._write_metadata()
+
+    def sample_batch(self, batch_size):
+        """Sample a batch of observations, gathered in increasing order of index."""
+        indices = torch.sort(self._valid_set.sample(batch_size))[0]
+        obs = self._get_observation(indices)
+        return obs, indices, self._get_weights(indices)
+
+    @property
+    def num_memory_steps(self):
+        """Return the number of steps."""
+        return self._num_memory_steps
+
+    @num_memory_steps.setter
+    def num_memory_steps(self, value):
+        """Reset the number of steps and re-arrange the memory in place."""
+        self._num_memory_steps = value
+        other = ExperienceReplay.from_other(self, num_memory_steps=value)
+        if other.memory is not None:
+            for column, other_column in zip(self.memory, other.memory):
+                column[:] = other_column
+        self.valid[:] = other.valid
+        self._episode_start = other._episode_start
+        self._build_indexes()
+        self.weights[:] = other.weights
+        self.data_count = other.data_count
+        self._write_metadata()
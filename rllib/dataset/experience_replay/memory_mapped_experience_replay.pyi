@@ -0,0 +1,31 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import torch.nn as nn
+from torch import Tensor
+
+from rllib.dataset.datatypes import Observation
+from rllib.dataset.transforms import AbstractTransform
+
+from .experience_replay import ExperienceReplay
+
+class MemoryMappedExperienceReplay(ExperienceReplay):
+    METADATA: str
+    path: str
+    _arrays: Dict[str, np.memmap]
+    def __init__(
+        self,
+        max_len: int,
+        path: str,
+        transformations: Optional[Union[List[AbstractTransform], nn.ModuleList]] = ...,
+        num_memory_steps: int = ...,
+    ) -> None: ...
+    def _file(self, name: str) -> str: ...
+    def _open(self, name: str, initial_value: Tensor) -> Tensor: ...
+    def _map(self, name: str) -> Tensor: ...
+    def _load(self) -> None: ...
+    def _write_metadata(self) -> None: ...
+    @property
+    def _fields(self) -> List[str]: ...
+    def flush(self) -> None: ...
+    def sample_batch(self, batch_size: int) -> Tuple[Observation, Tensor, Tensor]: ...
@@ -1,13 +1,12 @@
 """Implementation of a Prioritized Experience Replay Buffer."""
+import math
 
-import numpy as np
 import torch
-from torch.utils.data._utils.collate import default_collate
 
-from rllib.dataset.datatypes import Observation
 from rllib.util.parameter_decay import Constant, ParameterDecay
 
 from .experience_replay import ExperienceReplay
+from .segment_tree import MinTree, SumTree
 
 
 class PrioritizedExperienceReplay(ExperienceReplay):
@@ -25,6 +24,9 @@ class PrioritizedExperienceReplay(ExperienceReplay):
     ..math :: w_i = (N P(i)) ^ \beta,
     where \beta is a parameter.
 
+    The priorities are stored in a sum-tree and in a min-tree, so that sampling and
+    updating a batch of priorities is O(log N) and the maximum weight is O(1).
+
     Parameters
     ----------
     max_len: int.
@@ -50,6 +52,8 @@ class PrioritizedExperienceReplay(ExperienceReplay):
     Prioritized experience replay. ICLR.
     """
 
+    _checkpoint_arrays = ("valid", "priorities")
+
     def __init__(
         self, alpha=0.6, beta=0.4, epsilon=0.01, max_priority=10.0, *args, **kwargs
     ):
@@ -68,11 +72,15 @@ class PrioritizedExperienceReplay(ExperienceReplay):
 
         self.max_priority = max_priority
         self._priorities = torch.zeros(self.max_len)
-        self.weights = torch.zeros(self.max_len)
+        self._sum_tree = SumTree(self.max_len)
+        self._min_tree = MinTree(self.max_len)
 
     @classmethod
     def from_other(cls, other, num_memory_steps=None):
-        """Initialize EXP3Experience Replay from another one."""
+        """Initialize a Prioritized Experience Replay from another one.
+
+        The priorities are copied together with the observations.
+        """
         new = cls(
             max_len=other.max_len,
             alpha=other.alpha,
@@ -83,13 +91,22 @@ class PrioritizedExperienceReplay(ExperienceReplay):
             num_memory_steps=num_memory_steps
             if num_memory_steps
             else other.num_memory_steps,
+            columnar=other.columnar,
+            cache_transformations=other.cache_transformations,
         )
 
-        for observation in other.memory:
-            if isinstance(observation, Observation):
-                new.append(observation)
+        new._copy_from(other)
         return new
 
+    def _copy_weights(self, other, source, target):
+        """Copy the priorities of `other', or initialize them as new observations."""
+        priorities = torch.zeros(self.max_len)
+        if isinstance(other, PrioritizedExperienceReplay):
+            priorities[target] = other.priorities[source]
+        else:
+            priorities[target] = self.max_priority
+        self.priorities = priorities
+
     @property
     def priorities(self):
         """Get list of priorities."""
@@ -99,19 +116,96 @@ class PrioritizedExperienceReplay(ExperienceReplay):
     def priorities(self, value):
         """Set list of priorities."""
         self._priorities = value
-        self._update_weights()
+        self._update_trees(torch.arange(self.max_len))
+
+    def _init_weights(self):
+        """Weights are computed from the priorities, hence they are not stored."""
+        pass
+
+    @property
+    def weights(self):
+        """Get the importance sampling weights of all the observations in O(N).
+
+        Batches of weights are computed with `_get_weights'.
+        """
+        weights = torch.zeros(self.max_len)
+        weights[: len(self)] = self._get_weights(torch.arange(len(self)))
+        return weights
+
+    @weights.setter
+    def weights(self, value):
+        """Weights are computed from the priorities, hence they can't be set."""
+        raise AttributeError(
+            "The weights are computed from the priorities, set the priorities instead."
+        )
+
+    @property
+    def max_weight(self):
+        """Get the largest importance sampling weight in the buffer in O(1)."""
+        min_probability = self._value_to_probability(self._min_tree.reduce())
+        return self._probability_to_weight(min_probability)
 
     @property
     def probabilities(self):
         """Get list of probabilities."""
-        num = len(self)
-        return self._priorities[:num] / torch.sum(self._priorities[:num])
+        return self._get_probabilities(torch.arange(len(self)))
+
+    def _get_tree_values(self, indexes):
+        """Get the values of the segment tree leaves from the priorities."""
+        return self._priorities[indexes]
+
+    def _value_to_probability(self, value):
+        """Get the sampling probability of a segment tree leaf value."""
+        return (value / self._sum_tree.reduce()).float()
+
+    def _get_probabilities(self, indexes):
+        """Get the sampling probabilities of a batch of indexes in O(1)."""
+        return self._value_to_probability(self._sum_tree[indexes])
+
+    def _probability_to_weight(self, probability):
+        """Get the importance sampling weight of a sampling probability."""
+        return torch.pow(probability * len(self), -self.beta())
+
+    def _get_weights(self, indexes):
+        """Get the importance sampling weights of a batch of indexes."""
+        return self._probability_to_weight(self._get_probabilities(indexes))
+
+    def _sample_indexes(self, batch_size):
+        """Sample a batch of indexes proportionally to the priorities in O(log N)."""
+        return self._sum_tree.sample(batch_size)
+
+    def _update_trees(self, indexes):
+        """Update the segment tree leaves at indexes, invalid indexes are emptied."""
+        indexes = torch.as_tensor(indexes, dtype=torch.long).reshape(-1)
+        values = self._get_tree_values(indexes).double()
+        valid = self.valid[indexes].bool()
+        self._sum_tree[indexes] = torch.where(valid, values, torch.zeros_like(values))
+        self._min_tree[indexes] = torch.where(
+            valid, values, torch.full_like(values, math.inf)
+        )
 
     def sample_batch(self, batch_size):
         """Get a batch of data."""
-        probs = self.probabilities.numpy()
-        indices = np.random.choice(len(self), batch_size, p=probs / np.sum(probs))
-        return default_collate([self[i] for i in indices])
+        indexes = self._sample_indexes(batch_size)
+        invalid = self.valid[indexes] == 0
+        if invalid.any():  # when a non-valid index is sampled.
+            indexes[invalid] = self._valid_set.sample(invalid.sum().item())
+
+        observation = self._get_observation(indexes)
+        return observation, indexes, self._get_weights(indexes)
+
+    def reset(self):
+        """Reset memory to empty."""
+        super().reset()
+        self._priorities = torch.zeros(self.max_len)
+        self._sum_tree.reset()
+        self._min_tree.reset()
+
+    def append_invalid(self):
+        """Append an invalid transition."""
+        ptr = self.ptr
+        super().append_invalid()
+        self._update_trees(ptr)
 
     def append(self, observation):
         """Append new observation to the dataset.
@@ -125,19 +219,35 @@ class PrioritizedExperienceReplay(ExperienceReplay):
         TypeError
             If the new observation is not of type Observation.
         """
-        self._priorities[self.ptr] = self.max_priority
+        ptr = self.ptr
+        self._priorities[ptr] = self.max_priority
         super().append(observation)
-        self._update_weights()
+        indexes = (ptr + torch.arange(self.num_memory_steps + 1)) % self.max_len
+        self._update_trees(indexes)
+
+    def append_batch(self, observation):
+        """Append a batch of new observations to the dataset.
+
+        Parameters
+        ----------
+        observation: Observation
+
+        Raises
+        ------
+        TypeError
+            If the new observation is not of type Observation.
+        """
+        data_count = self.data_count
+        super().append_batch(observation)
+        num_new = min(self.data_count - data_count, self.max_len)
+        indexes = self.data_count - num_new + torch.arange(num_new)
+        self._priorities[indexes % self.max_len] = self.max_priority
+        padding = self.data_count + torch.arange(self.num_memory_steps)
+        self._update_trees(torch.cat((indexes, padding)) % self.max_len)
 
     def update(self, indexes, td_error):
         """Update experience replay sampling distribution with set of weights."""
         self._priorities[indexes] = (td_error + self.epsilon) ** self.alpha()
         self.alpha.update()
         self.beta.update()
-        self._update_weights()
-
-    def _update_weights(self):
-        """Update priorities and weights."""
-        num = len(self)
-        weights = torch.pow(self.probabilities * num, -self.beta())
-        self.weights[:num] = weights
+        self._update_trees(indexes)
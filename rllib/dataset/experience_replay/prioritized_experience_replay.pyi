@@ -1,10 +1,14 @@
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Type, TypeVar, Union
 
 from torch import Tensor
 
+from rllib.dataset.datatypes import Index, Observation
 from rllib.util.parameter_decay import ParameterDecay
 
 from .experience_replay import ExperienceReplay
+from .segment_tree import MinTree, SumTree
+
+T = TypeVar("T", bound="PrioritizedExperienceReplay")
 
 class PrioritizedExperienceReplay(ExperienceReplay):
     alpha: ParameterDecay
@@ -12,7 +16,10 @@ class PrioritizedExperienceReplay(ExperienceReplay):
     epsilon: Tensor
     max_priority: float
     _priorities: Tensor
+    _sum_tree: SumTree
+    _min_tree: MinTree
     priors: Tensor
+    _checkpoint_arrays: Tuple[str, ...]
     def __init__(
         self,
         alpha: Union[float, ParameterDecay] = ...,
@@ -22,10 +29,31 @@ class PrioritizedExperienceReplay(ExperienceReplay):
         *args: Any,
         **kwargs: Any,
     ) -> None: ...
-    def _update_weights(self) -> None: ...
+    @classmethod
+    def from_other(
+        cls: Type[T], other: T, num_memory_steps: Optional[int] = ...
+    ) -> T: ...
+    def _copy_weights(
+        self, other: ExperienceReplay, source: Tensor, target: Tensor
+    ) -> None: ...
     @property
     def priorities(self) -> Tensor: ...
     @priorities.setter
     def priorities(self, value: Tensor) -> None: ...
+    @property  # type: ignore
+    def weights(self) -> Tensor: ...
+    @weights.setter
+    def weights(self, value: Tensor) -> None: ...
+    @property
+    def max_weight(self) -> Tensor: ...
     @property
     def probabilities(self) -> Tensor: ...
+    def _get_tree_values(self, indexes: Index) -> Tensor: ...
+    def _value_to_probability(self, value: Tensor) -> Tensor: ...
+    def _get_probabilities(self, indexes: Index) -> Tensor: ...
+    def _probability_to_weight(self, probability: Tensor) -> Tensor: ...
+    def _get_weights(self, indexes: Index) -> Tensor: ...
+    def _sample_indexes(self, batch_size: int) -> Tensor: ...
+    def _update_trees(self, indexes: Index) -> None: ...
+    def append_batch(self, observation: Observation) -> None: ...
+    def sample_batch(self, batch_size: int) -> Tuple[Observation, Tensor, Tensor]: ...
@@ -0,0 +1,123 @@
+"""Implementation of Segment Trees used by the prioritized experience replays."""
+import math
+
+import torch
+
+
+class SegmentTree(object):
+    """A Segment Tree stores a reduction of the values of its leaves in each node.
+
+    The tree is stored in a flat tensor of size 2 * capacity, where the root is at
+    position 1 and the children of node i are at positions 2i and 2i + 1.
+    The leaves are the last `capacity' positions.
+
+    Parameters
+    ----------
+    max_len: int.
+        Number of leaves of the tree.
+    operation: callable.
+        Associative binary operation to reduce two nodes, e.g. `torch.add'.
+    neutral_element: float.
+        Neutral element of the operation, used for empty leaves.
+
+    Methods
+    -------
+    __setitem__(idx, value):
+        set the value of a (batch of) leaf(ves) in O(log N).
+    __getitem__(idx):
+        get the value of a (batch of) leaf(ves) in O(1).
+    reduce():
+        get the reduction of all the leaves in O(1).
+
+    References
+    ----------
+    Schaul, T., Quan, J., Antonoglou, I., & Silver, D. (2015).
+    Prioritized experience replay. ICLR.
+    """
+
+    def __init__(self, max_len, operation, neutral_element):
+        self.max_len = max_len
+        self.capacity = 2 ** math.ceil(math.log2(max(max_len, 2)))
+        self.depth = int(math.log2(self.capacity))
+        self.operation = operation
+        self.neutral_element = neutral_element
+        self.tree = torch.full(
+            (2 * self.capacity,), neutral_element, dtype=torch.double
+        )
+
+    def __len__(self):
+        """Return the number of leaves of the tree."""
+        return self.max_len
+
+    def __getitem__(self, idx):
+        """Get the value of the leaves at `idx'."""
+        return self.tree[self.capacity + torch.as_tensor(idx, dtype=torch.long)]
+
+    def __setitem__(self, idx, value):
+        """Set the value of the leaves at `idx' and update their ancestors."""
+        idx = torch.as_tensor(idx, dtype=torch.long).reshape(-1) + self.capacity
+        value = torch.as_tensor(value, dtype=self.tree.dtype).reshape(-1)
+        self.tree[idx] = value.expand(idx.shape)
+        for _ in range(self.depth):
+            idx = torch.unique(idx // 2)
+            self.tree[idx] = self.operation(self.tree[2 * idx], self.tree[2 * idx + 1])
+
+    def reduce(self):
+        """Return the reduction of all the leaves."""
+        return self.tree[1]
+
+    def rescale(self, factor):
+        """Multiply all the leaves by a positive factor.
+
+        It is only valid for operations that commute with a positive scaling, such as
+        the sum, the minimum, or the maximum.
+        """
+        self.tree *= factor
+
+    def reset(self):
+        """Reset all the leaves to the neutral element."""
+        self.tree.fill_(self.neutral_element)
+
+
+class SumTree(SegmentTree):
+    """Segment Tree that keeps the sum of the leaves.
+
+    It samples a leaf proportionally to its value in O(log N).
+    """
+
+    def __init__(self, max_len):
+        super().__init__(max_len, operation=torch.add, neutral_element=0.0)
+
+    def find_prefix_sum_index(self, prefix_sum):
+        """Find the leaves i such that sum_{j < i} v_j <= prefix_sum < sum_{j<=i} v_j.
+
+        Parameters
+        ----------
+        prefix_sum: Tensor.
+            Tensor of prefix sums, each one between 0 and the total sum.
+
+        Returns
+        -------
+        idx: Tensor.
+            Tensor of leaf indexes with the same shape as `prefix_sum'.
+        """
+        prefix_sum = torch.as_tensor(prefix_sum, dtype=self.tree.dtype).clone()
+        idx = torch.ones(prefix_sum.shape, dtype=torch.long)
+        for _ in range(self.depth):
+            left_sum = self.tree[2 * idx]
+            go_right = prefix_sum >= left_sum
+            prefix_sum -= left_sum * go_right
+            idx = 2 * idx + go_right.long()
+        return (idx - self.capacity).clamp_max(self.max_len - 1)
+
+    def sample(self, batch_size):
+        """Sample `batch_size' leaves proportionally to their values."""
+        prefix_sum = torch.rand(batch_size, dtype=self.tree.dtype) * self.reduce()
+        return self.find_prefix_sum_index(prefix_sum)
+
+
+class MinTree(SegmentTree):
+    """Segment Tree that keeps the minimum of the leaves."""
+
+    def __init__(self, max_len):
+        super().__init__(max_len, operation=torch.minimum, neutral_element=math.inf)
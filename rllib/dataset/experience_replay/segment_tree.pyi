@@ -0,0 +1,33 @@
+from typing import Callable, Union
+
+from torch import Tensor
+
+from rllib.dataset.datatypes import Index
+
+class SegmentTree(object):
+    max_len: int
+    capacity: int
+    depth: int
+    operation: Callable[[Tensor, Tensor], Tensor]
+    neutral_element: float
+    tree: Tensor
+    def __init__(
+        self,
+        max_len: int,
+        operation: Callable[[Tensor, Tensor], Tensor],
+        neutral_element: float,
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def __getitem__(self, idx: Index) -> Tensor: ...
+    def __setitem__(self, idx: Index, value: Union[float, Tensor]) -> None: ...
+    def reduce(self) -> Tensor: ...
+    def rescale(self, factor: Union[float, Tensor]) -> None: ...
+    def reset(self) -> None: ...
+
+class SumTree(SegmentTree):
+    def __init__(self, max_len: int) -> None: ...
+    def find_prefix_sum_index(self, prefix_sum: Tensor) -> Tensor: ...
+    def sample(self, batch_size: int) -> Tensor: ...
+
+class MinTree(SegmentTree):
+    def __init__(self, max_len: int) -> None: ...
@@ -1,15 +1,27 @@
 import numpy as np
 import pytest
-
-from rllib.dataset import ExperienceReplay
+import torch
+from torch.utils.data._utils.collate import default_collate
+
+from rllib.dataset import (
+    BootstrapExperienceReplay,
+    EXP3ExperienceReplay,
+    ExperienceReplay,
+    MemoryMappedExperienceReplay,
+    PrioritizedExperienceReplay,
+)
 from rllib.dataset.datatypes import Observation
+from rllib.dataset.experience_replay.utilities import init_er_from_er
 from rllib.dataset.transforms import (
     ActionNormalizer,
+    DeltaState,
     MeanFunction,
+    NextStateNormalizer,
     RewardClipper,
     StateNormalizer,
 )
 from rllib.environment import GymEnvironment
+from rllib.util.parameter_decay import Constant
 from rllib.util.rollout import step_env
 
 
@@ -70,6 +82,29 @@ def create_er_from_transitions(
     return memory
 
 
+@pytest.fixture(scope="class", params=[False, True])
+def columnar(request):
+    return request.param
+
+
+@pytest.fixture(scope="class", params=[0, 2])
+def num_memory_steps(request):
+    return request.param
+
+
+def get_batch(batch_size):
+    """Get a random batch of `batch_size' continuous transitions."""
+    return Observation(
+        state=torch.randn(batch_size, 3),
+        action=torch.randn(batch_size, 2),
+        reward=torch.randn(batch_size, 1),
+        next_state=torch.randn(batch_size, 3),
+        done=torch.zeros(batch_size),
+        entropy=torch.randn(batch_size),
+        log_prob_action=torch.randn(batch_size),
+    )
+
+
 class TestExperienceReplay(object):
     """Test experience replay class."""
 
@@ -118,6 +153,23 @@ class TestExperienceReplay(object):
         )
         self._test_sample_batch(memory, batch_size, num_memory_steps)
 
+    def test_sample_batch_collate(self, discrete, max_len, num_memory_steps):
+        num_episodes = 3
+        episode_length = 200
+        memory = create_er_from_episodes(
+            discrete, max_len, num_memory_steps, num_episodes, episode_length
+        )
+        np.random.seed(0)
+        observation, idx, weight = memory.sample_batch(32)
+
+        np.random.seed(0)
+        indices = memory._valid_set.sample(32)
+        obs, idx_, weight_ = default_collate([memory[i] for i in indices])
+        for x, y in zip(observation, Observation(**obs)):
+            np.testing.assert_array_equal(x.numpy(), y.numpy())
+        np.testing.assert_array_equal(idx.numpy(), idx_.numpy())
+        np.testing.assert_array_equal(weight.numpy(), weight_.numpy())
+
     def test_sample_batch_from_transitions(
         self, discrete, dim_state, dim_action, max_len, num_memory_steps, batch_size
     ):
@@ -337,3 +389,550 @@ class TestExperienceReplay(object):
             assert weight == 1.0
             for attribute in Observation(**observation):
                 assert attribute.shape[0] == max(1, num_memory_steps)
+
+
+class TestColumnarExperienceReplay(object):
+    """Test that the columnar storage behaves as the object storage."""
+
+    @pytest.fixture(scope="class", params=[True, False])
+    def discrete(self, request):
+        return request.param
+
+    @pytest.fixture(scope="class", params=[50, 1000])
+    def max_len(self, request):
+        return request.param
+
+    @pytest.fixture(scope="class", params=[0, 1, 5])
+    def num_memory_steps(self, request):
+        return request.param
+
+    @staticmethod
+    def _create_memories(discrete, max_len, num_memory_steps):
+        if discrete:
+            kwargs = dict(dim_state=(), dim_action=(), num_states=4, num_actions=2)
+        else:
+            kwargs = dict(dim_state=(3,), dim_action=(2,))
+        memory = ExperienceReplay(max_len, num_memory_steps=num_memory_steps)
+        columnar = ExperienceReplay(
+            max_len, num_memory_steps=num_memory_steps, columnar=True
+        )
+        for episode_length in [30, 20, 40]:
+            for _ in range(episode_length):
+                observation = Observation.random_example(**kwargs)
+                memory.append(observation)
+                columnar.append(observation)
+            memory.end_episode()
+            columnar.end_episode()
+        return memory, columnar
+
+    @staticmethod
+    def _assert_equal(observation, other):
+        for x, y in zip(observation, other):
+            np.testing.assert_array_equal(x.numpy(), y.numpy())
+
+    def test_storage(self, discrete, max_len, num_memory_steps):
+        memory, columnar = self._create_memories(discrete, max_len, num_memory_steps)
+        assert isinstance(columnar.memory, Observation)
+        for column in columnar.memory:
+            assert column.shape[0] == max_len
+        assert columnar.data_count == memory.data_count
+        np.testing.assert_array_equal(columnar.valid.numpy(), memory.valid.numpy())
+
+        columnar.reset()
+        assert columnar.memory is None
+        assert len(columnar.valid_indexes) == 0
+
+    def test_get_item(self, discrete, max_len, num_memory_steps):
+        memory, columnar = self._create_memories(discrete, max_len, num_memory_steps)
+        for i in memory.valid_indexes.tolist():
+            observation, idx, weight = memory[i]
+            other, other_idx, other_weight = columnar[i]
+            self._assert_equal(Observation(**observation), Observation(**other))
+            assert idx == other_idx
+            assert weight == other_weight
+
+    def test_all_raw(self, discrete, max_len, num_memory_steps):
+        memory, columnar = self._create_memories(discrete, max_len, num_memory_steps)
+        self._assert_equal(memory.all_raw, columnar.all_raw)
+
+    def test_sample_batch(self, discrete, max_len, num_memory_steps):
+        memory, columnar = self._create_memories(discrete, max_len, num_memory_steps)
+        np.random.seed(0)
+        observation, idx, weight = memory.sample_batch(32)
+        np.random.seed(0)
+        other, other_idx, other_weight = columnar.sample_batch(32)
+        self._assert_equal(observation, other)
+        np.testing.assert_array_equal(idx.numpy(), other_idx.numpy())
+        np.testing.assert_array_equal(weight.numpy(), other_weight.numpy())
+
+    def test_num_memory_steps(self, discrete, max_len, num_memory_steps):
+        memory, columnar = self._create_memories(discrete, max_len, num_memory_steps)
+        for new_num_memory_steps in [2, 0, 7]:
+            memory.num_memory_steps = new_num_memory_steps
+            columnar.num_memory_steps = new_num_memory_steps
+            assert columnar.data_count == memory.data_count
+            valid = memory.valid.numpy()
+            np.testing.assert_array_equal(columnar.valid.numpy(), valid)
+            self._assert_equal(memory.all_raw, columnar.all_raw)
+
+
+class TestPrioritizedExperienceReplay(object):
+    """Test the prioritized experience replays."""
+
+    @pytest.fixture(scope="class", params=[False, True])
+    def exp3(self, request):
+        return request.param
+
+    @staticmethod
+    def _create_memory(exp3, num_memory_steps, num_transitions=150):
+        if exp3:
+            memory = EXP3ExperienceReplay(
+                max_len=100, alpha=0.1, beta=0.2, num_memory_steps=num_memory_steps
+            )
+        else:
+            memory = PrioritizedExperienceReplay(
+                max_len=100, num_memory_steps=num_memory_steps
+            )
+        for i in range(num_transitions):
+            memory.append(Observation.random_example(dim_state=(3,), dim_action=(2,)))
+            if i % 40 == 39:
+                memory.end_episode()
+        return memory
+
+    def test_sample_batch(self, exp3, num_memory_steps):
+        memory = self._create_memory(exp3, num_memory_steps)
+        observation, idx, weight = memory.sample_batch(32)
+        for attribute in observation:
+            assert attribute.shape[:2] == (32, max(1, num_memory_steps))
+        assert idx.shape == (32,)
+        assert weight.shape == (32,)
+        assert torch.all(memory.valid[idx] == 1)
+
+    def test_update(self, exp3, num_memory_steps):
+        memory = self._create_memory(exp3, num_memory_steps)
+        idx = memory.valid_indexes[:8]
+        memory.update(idx, torch.rand(8) + 1.0)
+
+        np.testing.assert_allclose(memory.probabilities.sum().item(), 1.0, 1e-5)
+        _, sampled_idx, weight = memory.sample_batch(16)
+        np.testing.assert_allclose(
+            weight.numpy(), memory.weights[sampled_idx].numpy(), rtol=1e-5
+        )
+        np.testing.assert_allclose(
+            memory.max_weight.item(), memory.weights[memory.valid_indexes].max(), 1e-5
+        )
+
+    def test_probabilities(self):
+        memory = self._create_memory(False, 0, num_transitions=50)
+        idx = torch.arange(10)
+        td_error = torch.rand(10)
+        memory.update(idx, td_error)
+
+        priorities = memory.priorities[:50].clone()
+        priorities[idx] = (td_error + memory.epsilon) ** memory.alpha()
+        probabilities = priorities / priorities.sum()
+        weights = (50 * probabilities) ** (-memory.beta())
+        np.testing.assert_allclose(memory.probabilities.numpy(), probabilities, 1e-5)
+        np.testing.assert_allclose(memory.weights[:50].numpy(), weights, 1e-5)
+
+    def test_get_item(self, exp3, num_memory_steps):
+        memory = self._create_memory(exp3, num_memory_steps)
+        idx = memory.valid_indexes[:8]
+        memory.update(idx, torch.rand(8) + 1.0)
+        for i in idx:
+            _, _, weight = memory[i]
+            np.testing.assert_allclose(weight.item(), memory.weights[i].item(), 1e-5)
+
+    def test_set_weights(self, exp3):
+        memory = self._create_memory(exp3, 0)
+        with pytest.raises(AttributeError):
+            memory.weights = torch.ones(100)
+
+    def test_sample_valid_indexes(self, num_memory_steps):
+        memory = self._create_memory(True, num_memory_steps, num_transitions=60)
+        memory.beta = Constant(1.0)  # sample uniformly.
+        idx = memory._sample_indexes(1000)
+        assert torch.all(memory.valid[idx] == 1)
+
+    def test_reset(self, exp3, num_memory_steps):
+        memory = self._create_memory(exp3, num_memory_steps)
+        memory.reset()
+        assert memory._sum_tree.reduce() == 0
+        memory.append(Observation.random_example(dim_state=(3,), dim_action=(2,)))
+        _, idx, _ = memory.sample_batch(4)
+        assert torch.all(idx == 0)
+
+
+class TestAppendBatch(object):
+    """Test that appending a batch is equivalent to sequential appends."""
+
+    @pytest.fixture(scope="class", params=[10, 45, 130])
+    def batch_size(self, request):
+        return request.param
+
+    def test_append_batch(self, columnar, num_memory_steps, batch_size):
+        kwargs = dict(num_memory_steps=num_memory_steps, columnar=columnar)
+        memory = ExperienceReplay(max_len=100, **kwargs)
+        batch_memory = ExperienceReplay(max_len=100, **kwargs)
+        for _ in range(3):
+            observation = get_batch(batch_size)
+            for i in range(batch_size):
+                memory.append(
+                    Observation(*[x[i] if x.dim() > 0 else x for x in observation])
+                )
+            memory.end_episode()
+
+            batch_memory.append_batch(observation)
+            batch_memory.end_episode()
+
+        assert memory.data_count == batch_memory.data_count
+        np.testing.assert_array_equal(memory.valid.numpy(), batch_memory.valid.numpy())
+        for x, y in zip(memory.all_raw, batch_memory.all_raw):
+            np.testing.assert_array_equal(x.numpy(), y.numpy())
+
+    def test_append_batch_shape(self, columnar):
+        memory = ExperienceReplay(max_len=100, columnar=columnar)
+        observation = get_batch(12)
+        observation = Observation(
+            *[x.reshape(3, 4, *x.shape[1:]) if x.dim() > 0 else x for x in observation]
+        )
+        memory.append_batch(observation)
+        assert len(memory) == 12
+        assert memory.all_raw.state.shape == (12, 3)
+        assert memory.all_raw.next_action.shape == (12,)
+
+    def test_subclasses(self, columnar, num_memory_steps, batch_size):
+        kwargs = dict(num_memory_steps=num_memory_steps, columnar=columnar)
+        for memory in [
+            PrioritizedExperienceReplay(max_len=100, **kwargs),
+            EXP3ExperienceReplay(max_len=100, **kwargs),
+            BootstrapExperienceReplay(max_len=100, num_bootstraps=5, **kwargs),
+        ]:
+            memory.append_batch(get_batch(batch_size))
+            memory.end_episode()
+            memory.append_batch(get_batch(batch_size))
+            observation, idx, weight = memory.sample_batch(16)
+            assert torch.all(memory.valid[idx] == 1)
+            assert observation.state.shape == (16, max(1, num_memory_steps), 3)
+            if isinstance(memory, BootstrapExperienceReplay):
+                assert weight.shape == (16, 5)
+            else:
+                assert torch.all(weight > 0)
+
+
+class TestMemoryMappedExperienceReplay(object):
+    """Test that the memory-mapped buffer behaves as the in-memory one."""
+
+    @staticmethod
+    def _fill(memories):
+        for batch_size in [30, 45, 40]:
+            observation = get_batch(batch_size)
+            for memory in memories:
+                memory.append_batch(observation)
+                memory.end_episode()
+
+    @staticmethod
+    def _assert_equal(memory, other):
+        assert memory.data_count == other.data_count
+        np.testing.assert_array_equal(memory.valid.numpy(), other.valid.numpy())
+        for x, y in zip(memory.all_raw, other.all_raw):
+            np.testing.assert_array_equal(x.numpy(), y.numpy())
+
+    def test_storage(self, tmp_path, num_memory_steps):
+        memory = ExperienceReplay(100, num_memory_steps=num_memory_steps)
+        mmap = MemoryMappedExperienceReplay(
+            100, path=str(tmp_path), num_memory_steps=num_memory_steps
+        )
+        self._fill([memory, mmap])
+        self._assert_equal(memory, mmap)
+        assert (tmp_path / "state.npy").exists()
+
+        observation, idx, weight = mmap.sample_batch(32)
+        assert torch.all(idx[1:] >= idx[:-1])
+        assert torch.all(mmap.valid[idx] == 1)
+        assert observation.state.shape == (32, max(1, num_memory_steps), 3)
+
+    def test_persistence(self, tmp_path, num_memory_steps):
+        kwargs = dict(path=str(tmp_path), num_memory_steps=num_memory_steps)
+        memory = MemoryMappedExperienceReplay(100, **kwargs)
+        self._fill([memory])
+        memory.flush()
+
+        loaded = MemoryMappedExperienceReplay(100, **kwargs)
+        self._assert_equal(memory, loaded)
+        loaded.append_batch(get_batch(10))
+        assert loaded.data_count == memory.data_count + 10
+
+        with pytest.raises(ValueError):
+            MemoryMappedExperienceReplay(50, **kwargs)
+
+    def test_num_memory_steps(self, tmp_path, num_memory_steps):
+        memory = ExperienceReplay(100, num_memory_steps=num_memory_steps)
+        mmap = MemoryMappedExperienceReplay(
+            100, path=str(tmp_path), num_memory_steps=num_memory_steps
+        )
+        self._fill([memory, mmap])
+        for new_num_memory_steps in [3, 0]:
+            memory.num_memory_steps = new_num_memory_steps
+            mmap.num_memory_steps = new_num_memory_steps
+            self._assert_equal(memory, mmap)
+
+    def test_reset(self, tmp_path):
+        memory = MemoryMappedExperienceReplay(100, path=str(tmp_path))
+        self._fill([memory])
+        memory.reset()
+        assert len(memory.valid_indexes) == 0
+        assert len(MemoryMappedExperienceReplay(100, path=str(tmp_path))) == 0
+
+
+class TestCheckpoint(object):
+    """Test that saving and loading a buffer recovers the same buffer."""
+
+    @staticmethod
+    def _assert_equal(memory, other):
+        assert memory.data_count == other.data_count
+        np.testing.assert_array_equal(memory.valid.numpy(), other.valid.numpy())
+        np.testing.assert_allclose(memory.weights.numpy(), other.weights.numpy())
+        # The recorded episode starts are kept, even without invalid slots in between.
+        assert torch.all(other._episode_start[memory._episode_start])
+        for x, y in zip(memory.all_raw, other.all_raw):
+            np.testing.assert_array_equal(x.numpy(), y.numpy())
+
+    def test_save_load(self, tmp_path, columnar, num_memory_steps):
+        kwargs = dict(max_len=100, num_memory_steps=num_memory_steps, columnar=columnar)
+        for cls in [ExperienceReplay, PrioritizedExperienceReplay]:
+            memory, loaded = cls(**kwargs), cls(**kwargs)
+            path = str(tmp_path / type(memory).__name__)
+            # Every save after the first one only writes the new observations.
+            for batch_size in [30, 45, 40]:
+                memory.append_batch(get_batch(batch_size))
+                memory.end_episode()
+                memory.update(torch.arange(5), torch.rand(5))
+                memory.save(path)
+
+            loaded.load(path)
+            self._assert_equal(memory, loaded)
+            loaded.append_batch(get_batch(10))
+            assert loaded.data_count == memory.data_count + 10
+
+            with pytest.raises(ValueError):
+                ExperienceReplay(max_len=50).load(path)
+
+    def test_background_writer(self, tmp_path, columnar):
+        memory = ExperienceReplay(max_len=100, columnar=columnar)
+        memory.append_batch(get_batch(30))
+        write = memory.get_checkpoint_writer(str(tmp_path))
+        saved = ExperienceReplay.from_other(memory)
+
+        # Changes after the copy are not written.
+        memory.append_batch(get_batch(30))
+        write()
+        loaded = ExperienceReplay(max_len=100, columnar=columnar)
+        loaded.load(str(tmp_path))
+        self._assert_equal(saved, loaded)
+
+
+class TestCacheTransformations(object):
+    """Test that the cached transformations behave as the transformations."""
+
+    @staticmethod
+    def _assert_equal(observation, other):
+        for x, y in zip(observation, other):
+            np.testing.assert_allclose(x.numpy(), y.numpy(), rtol=1e-6)
+
+    def _assert_sample_equal(self, memory, cached):
+        np.random.seed(0)
+        observation, idx, weight = memory.sample_batch(32)
+        np.random.seed(0)
+        other, other_idx, other_weight = cached.sample_batch(32)
+        self._assert_equal(observation, other)
+        np.testing.assert_array_equal(idx.numpy(), other_idx.numpy())
+        self._assert_equal(memory.all_data, cached.all_data)
+        observation, other = memory[idx[0]][0], cached[idx[0]][0]
+        self._assert_equal(Observation(**observation), Observation(**other))
+
+    def test_cache(self, columnar, num_memory_steps):
+        transformations = [
+            MeanFunction(DeltaState()),
+            StateNormalizer(dim=(3,)),
+            RewardClipper(),
+            NextStateNormalizer(dim=(3,)),
+        ]
+        kwargs = dict(
+            max_len=100,
+            transformations=transformations,
+            num_memory_steps=num_memory_steps,
+            columnar=columnar,
+        )
+        memory = ExperienceReplay(**kwargs)
+        cached = ExperienceReplay(cache_transformations=True, **kwargs)
+        for batch_size in [30, 45, 40]:
+            observation = get_batch(batch_size)
+            memory.append_batch(observation)
+            cached.append_batch(observation)
+            memory.end_episode()
+            cached.end_episode()
+            self._assert_sample_equal(memory, cached)
+
+        # An update of the transformations invalidates the cache.
+        version = transformations[1].version
+        transformations[1].update(get_batch(10))
+        assert transformations[1].version == version + 1
+        self._assert_sample_equal(memory, cached)
+
+    def test_incremental_cache(self, columnar, num_memory_steps):
+        # Transformations without statistics only transform the new observations.
+        transformations = [MeanFunction(DeltaState()), RewardClipper()]
+        kwargs = dict(
+            max_len=100,
+            transformations=transformations,
+            num_memory_steps=num_memory_steps,
+            columnar=columnar,
+        )
+        memory = ExperienceReplay(**kwargs)
+        cached = ExperienceReplay(cache_transformations=True, **kwargs)
+        for batch_size in [30, 45, 1, 1, 40]:
+            observation = get_batch(batch_size)
+            memory.append_batch(observation)
+            cached.append_batch(observation)
+            self._assert_sample_equal(memory, cached)
+        assert cached._cache_count == cached.data_count
+
+        cached.reset()
+        assert cached._cache is None
+
+
+class TestEpisodeIndexes(object):
+    """Test the incremental indexes of valid slots and of episode starts."""
+
+    @staticmethod
+    def _assert_consistent(memory):
+        valid_set = torch.sort(memory._valid_set.to_tensor())[0]
+        np.testing.assert_array_equal(valid_set.numpy(), memory.valid_indexes.numpy())
+        starts = memory.episode_start_indexes
+        assert torch.all(memory.valid[starts] == 1)
+
+    def test_indexes(self, columnar, num_memory_steps):
+        memory = ExperienceReplay(
+            max_len=100, num_memory_steps=num_memory_steps, columnar=columnar
+        )
+        episodes = dict()
+        for episode_length in [30, 45, 1, 40, 20]:
+            observation = get_batch(episode_length)
+            start = memory.ptr
+            if episode_length > 1:
+                memory.append_batch(observation)
+            else:
+                memory.append(
+                    Observation(*[x[0] if x.dim() > 0 else x for x in observation])
+                )
+                memory.append_invalid()
+            memory.end_episode()
+            episodes[start] = observation
+            self._assert_consistent(memory)
+
+        # The start of the first two episodes has been overwritten.
+        starts = memory.episode_start_indexes
+        assert sorted(starts.tolist()) == sorted(list(episodes)[2:])
+        for start in starts.tolist():
+            episode = memory.get_episode(start)
+            state = episodes[start].state
+            np.testing.assert_array_equal(episode.state.numpy(), state.numpy())
+
+        initial_states = torch.stack(
+            [episodes[start].state[0] for start in starts.tolist()]
+        )
+        for state in memory.sample_initial_states(8):
+            assert (initial_states == state).all(-1).any()
+
+        memory.num_memory_steps = num_memory_steps + 1
+        self._assert_consistent(memory)
+        memory.reset()
+        assert len(memory._valid_set) == 0
+        assert len(memory.episode_start_indexes) == 0
+
+
+class TestBlockCopy(object):
+    """Test the block copies between experience replays."""
+
+    @staticmethod
+    def _create_memory(cls, columnar, num_memory_steps, **kwargs):
+        memory = cls(
+            max_len=100, num_memory_steps=num_memory_steps, columnar=columnar, **kwargs
+        )
+        for episode_length in [30, 45, 40, 20]:
+            memory.append_batch(get_batch(episode_length))
+            memory.end_episode()
+        return memory
+
+    @staticmethod
+    def _sequential_copy(other, num_memory_steps):
+        """Copy a buffer by appending its observations one at a time."""
+        new = ExperienceReplay(
+            max_len=other.max_len,
+            num_memory_steps=num_memory_steps,
+            columnar=other.columnar,
+        )
+        for i in range(other.max_len):
+            idx = (other.ptr + i) % other.max_len
+            if other.valid[idx]:
+                _, observation = other._get_rows(torch.tensor([idx]))
+                new.append(Observation(*[x[0] for x in observation]))
+            elif other.valid[idx - 1]:
+                new.end_episode()
+        return new
+
+    @staticmethod
+    def _chronological(memory, tensor):
+        """Sort the entries of the valid observations from the oldest one."""
+        order = (memory.ptr + torch.arange(memory.max_len)) % memory.max_len
+        return tensor[order[memory.valid[order].bool()]].numpy()
+
+    def test_from_other(self, columnar, num_memory_steps):
+        memory = self._create_memory(ExperienceReplay, columnar, num_memory_steps)
+        for new_num_memory_steps in [0, 1, 3]:
+            other = ExperienceReplay.from_other(memory, new_num_memory_steps)
+            expected = self._sequential_copy(memory, new_num_memory_steps)
+            assert other.data_count == expected.data_count
+            np.testing.assert_array_equal(other.valid.numpy(), expected.valid.numpy())
+            for x, y in zip(other.all_raw, expected.all_raw):
+                np.testing.assert_array_equal(x.numpy(), y.numpy())
+
+    def test_weights(self, columnar, num_memory_steps):
+        memory = self._create_memory(
+            PrioritizedExperienceReplay, columnar, num_memory_steps
+        )
+        indexes = memory.valid_indexes
+        memory.update(indexes, torch.rand(len(indexes)))
+        other = PrioritizedExperienceReplay.from_other(memory)
+        np.testing.assert_array_equal(
+            self._chronological(other, other.priorities),
+            self._chronological(memory, memory.priorities),
+        )
+        assert other._sum_tree.reduce() == pytest.approx(memory._sum_tree.reduce())
+        train, test = memory.split(0.5)
+        for dataset in [train, test]:
+            indexes = dataset.valid_indexes
+            np.testing.assert_array_equal(
+                dataset.priorities[indexes].numpy(), memory.priorities[indexes].numpy()
+            )
+
+        memory = self._create_memory(
+            BootstrapExperienceReplay, columnar, num_memory_steps, num_bootstraps=5
+        )
+        other = BootstrapExperienceReplay.from_other(memory, num_memory_steps)
+        np.testing.assert_array_equal(
+            self._chronological(other, other.weights),
+            self._chronological(memory, memory.weights),
+        )
+
+    def test_add_dataset(self, columnar, num_memory_steps):
+        memory = self._create_memory(ExperienceReplay, columnar, num_memory_steps)
+        other = ExperienceReplay(max_len=200, columnar=columnar)
+        other.add_dataset(memory)
+        target_er = ExperienceReplay(max_len=200, columnar=columnar)
+        init_er_from_er(target_er, memory)
+        expected = self._sequential_copy(memory, 0)
+        for x, y, z in zip(other.all_raw, target_er.all_raw, expected.all_raw):
+            np.testing.assert_array_equal(x.numpy(), z.numpy())
+            assert x.shape == y.shape
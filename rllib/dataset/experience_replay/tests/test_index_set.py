@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import torch
+
+from rllib.dataset.experience_replay.index_set import IndexSet
+
+
+@pytest.fixture(params=[1, 7, 100])
+def max_len(request):
+    return request.param
+
+
+def _assert_members(index_set, mask):
+    members = index_set.to_tensor()
+    np.testing.assert_array_equal(
+        torch.sort(members)[0].numpy(), torch.nonzero(mask).squeeze(1).numpy()
+    )
+    np.testing.assert_array_equal(
+        index_set.position[members].numpy(), np.arange(len(index_set))
+    )
+
+
+def test_add_and_remove(max_len):
+    index_set = IndexSet(max_len)
+    mask = torch.zeros(max_len, dtype=torch.bool)
+    for _ in range(50):
+        index = torch.randint(max_len, (np.random.randint(1, 5),))
+        if np.random.rand() < 0.6:
+            index_set.add(index)
+            mask[index] = True
+        else:
+            index_set.remove(index)
+            mask[index] = False
+        _assert_members(index_set, mask)
+        assert len(index_set) == mask.sum()
+
+    _assert_members(IndexSet.from_mask(mask), mask)
+
+
+def test_sample(max_len):
+    index_set = IndexSet(max_len)
+    with pytest.raises(ValueError):
+        index_set.sample(4)
+
+    index_set.add(torch.arange(0, max_len, 2))
+    sample = index_set.sample(100)
+    assert sample.shape == (100,)
+    assert torch.all(sample % 2 == 0)
+    assert all(idx in index_set for idx in sample.tolist())
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import torch
+
+from rllib.dataset.experience_replay.segment_tree import MinTree, SumTree
+
+
+@pytest.fixture(params=[1, 7, 64, 1000])
+def max_len(request):
+    return request.param
+
+
+def test_set_and_reduce(max_len):
+    sum_tree, min_tree = SumTree(max_len), MinTree(max_len)
+    values = torch.rand(max_len)
+    sum_tree[torch.arange(max_len)] = values
+    min_tree[torch.arange(max_len)] = values
+    np.testing.assert_allclose(sum_tree.reduce().item(), values.sum().item(), 1e-5)
+    np.testing.assert_allclose(min_tree.reduce().item(), values.min().item())
+    np.testing.assert_allclose(sum_tree[torch.arange(max_len)].numpy(), values)
+
+    idx = torch.randint(max_len, (5,))
+    values[idx] = torch.rand(5) + 1.0
+    sum_tree[idx] = values[idx]
+    min_tree[idx] = values[idx]
+    np.testing.assert_allclose(sum_tree.reduce().item(), values.sum().item(), 1e-5)
+    np.testing.assert_allclose(min_tree.reduce().item(), values.min().item())
+
+    sum_tree.reset()
+    min_tree.reset()
+    assert sum_tree.reduce() == 0
+    assert min_tree.reduce() == float("inf")
+
+
+def test_find_prefix_sum_index(max_len):
+    sum_tree = SumTree(max_len)
+    values = torch.rand(max_len)
+    values[::2] = 0  # empty leaves must never be found.
+    values[-1] = 1.0
+    sum_tree[torch.arange(max_len)] = values
+
+    cumsum = torch.cumsum(values.double(), 0)
+    prefix_sum = torch.rand(100, dtype=torch.double) * cumsum[-1]
+    idx = sum_tree.find_prefix_sum_index(prefix_sum)
+    expected_idx = torch.searchsorted(cumsum, prefix_sum, right=True)
+    np.testing.assert_array_equal(idx.numpy(), expected_idx.numpy())
+    assert torch.all(values[idx] > 0)
+
+
+def test_sample_distribution():
+    torch.manual_seed(0)
+    sum_tree = SumTree(4)
+    sum_tree[torch.arange(4)] = torch.tensor([1.0, 2.0, 0.0, 5.0])
+    counts = torch.bincount(sum_tree.sample(80000), minlength=4)
+    np.testing.assert_allclose(
+        counts.numpy() / 80000, np.array([1.0, 2.0, 0.0, 5.0]) / 8.0, atol=1e-2
+    )
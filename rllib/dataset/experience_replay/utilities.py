@@ -8,7 +8,8 @@ from rllib.dataset.datatypes import Observation
 def init_er_from_er(target_er, source_er):
     """Initialize an Experience Replay from an Experience Replay.
 
-    Copy all the transitions in the source ER to the target ER.
+    Copy all the valid transitions in the source ER to the target ER as one batch.
+    The transitions are transformed, unless the source ER is raw.
 
     Parameters
     ----------
@@ -17,9 +18,10 @@ def init_er_from_er(target_er, source_er):
     source_er: Experience Replay
         Experience replay to be used.
     """
-    for i in range(len(source_er)):
-        observation, idx, weight = source_er[i]
-        target_er.append(Observation(**observation))
+    if len(source_er.valid_indexes) == 0:
+        return
+    observation = source_er.all_raw if source_er.raw else source_er.all_data
+    target_er.append_batch(observation)
 
 
 def init_er_from_environment(target_er, environment):
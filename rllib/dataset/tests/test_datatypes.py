@@ -1,3 +1,5 @@
+import pickle
+
 import numpy as np
 import pytest
 import torch
@@ -119,3 +121,22 @@ class TestObservation(object):
         for x, x1 in zip(o, o1):
             assert Observation._is_equal_nan(x, x1)
             assert x is not x1
+
+    def test_slots(self):
+        state, action, reward, next_state, done = self.init()
+        o = Observation(state, action, reward, next_state, done).to_torch()
+        assert not hasattr(o, "__dict__")
+        with pytest.raises(AttributeError):
+            o.not_a_field = 1.0
+
+        assert list(o._asdict()) == list(Observation.__slots__)
+        for x, x1 in zip(o, o._asdict().values()):
+            assert x is x1
+
+        o1 = pickle.loads(pickle.dumps(o))
+        assert o == o1
+
+        # Observations pickled before they had slots.
+        o1 = Observation.__new__(Observation)
+        o1.__setstate__(o._asdict())
+        assert o == o1
@@ -1,5 +1,6 @@
 """Interface for Transformers of a dataset."""
 
+import functools
 from abc import ABCMeta
 
 import torch.jit
@@ -20,8 +21,24 @@ class AbstractTransform(nn.Module, metaclass=ABCMeta):
     update(observation):
         update the parameters of the transformer.
 
+    Attributes
+    ----------
+    version: int
+        Number of calls to `update'. Subclasses that override `update' increase it
+        automatically, so that the data sets can invalidate their cached data.
+
     """
 
+    def __init__(self):
+        super().__init__()
+        self.version = 0
+
+    def __init_subclass__(cls, **kwargs):
+        """Wrap the `update' method of the subclasses to count its calls."""
+        super().__init_subclass__(**kwargs)
+        if "update" in cls.__dict__:
+            cls.update = _count_updates(cls.__dict__["update"])
+
     def forward(self, observation: Observation):
         """Apply transformation to observation tuple.
 
@@ -64,3 +81,15 @@ class AbstractTransform(nn.Module, metaclass=ABCMeta):
 
         """
         pass
+
+
+def _count_updates(update):
+    """Decorate an `update' method so that it increases the transform version."""
+
+    @functools.wraps(update)
+    def wrapper(self, *args, **kwargs):
+        output = update(self, *args, **kwargs)
+        self.version = getattr(self, "version", 0) + 1
+        return output
+
+    return wrapper
@@ -1,11 +1,15 @@
 from abc import ABCMeta
-from typing import Any
+from typing import Any, Callable
 
 import torch.nn as nn
 
 from rllib.dataset.datatypes import Observation
 
 class AbstractTransform(nn.Module, metaclass=ABCMeta):
+    version: int
+    def __init__(self) -> None: ...
     def forward(self, observation: Observation, **kwargs: Any) -> Observation: ...
     def inverse(self, observation: Observation) -> Observation: ...
     def update(self, observation: Observation) -> None: ...
+
+def _count_updates(update: Callable[..., None]) -> Callable[..., None]: ...
@@ -5,7 +5,12 @@ from .abstract_environment import AbstractEnvironment
 
 
 class FakeEnvironment(AbstractEnvironment):
-    """A fake environment wraps models into an environment."""
+    """A fake environment wraps models into an environment.
+
+    The environment is batched when `initial_state_fn' returns a batch of states
+    [N x dim_state]. Then, every step simulates all the particles at once with a
+    single call to each model, and the transitions stay as tensors.
+    """
 
     def __init__(
         self,
@@ -35,9 +40,12 @@ class FakeEnvironment(AbstractEnvironment):
             raise AssertionError("Can't call step() before calling reset().")
 
         next_state = self.next_state(self.state, action)
-        reward = self.reward(self.state, action)
-        done = self.done(self.state, action)
+        reward = self.reward(self.state, action, next_state)
+        done = self.done(self.state, action, next_state)
         info = self.info()
+
+        self._state = next_state
+        self._time += 1
         return next_state, reward, done, info
 
     def next_state(self, state, action, next_state=None):
@@ -75,4 +83,4 @@ class FakeEnvironment(AbstractEnvironment):
     @property
     def name(self):
         """Return class name."""
-        return "Fake Environment" if self._name is None else self.name
+        return "Fake Environment" if self._name is None else self._name
@@ -37,6 +37,14 @@ class MDP(AbstractEnvironment, Env):
     step(action): int
         execute a one step simulation and return the next state.
 
+    Notes
+    -----
+    The transitions are compiled once into padded tables with the next states,
+    rewards and cumulative probabilities of the outcomes of each state-action pair.
+    Hence, `step' samples a next state with a single vectorized categorical sample.
+    If the state is an array of states, all of them are stepped at once with an
+    array of actions.
+
     TODO: Add non-sparse MDPs (such as random MDPs).
     """
 
@@ -73,9 +81,94 @@ class MDP(AbstractEnvironment, Env):
         self._time = 0
 
         self.check_transitions(transitions, num_states, num_actions)
+        self.terminal_states = terminal_states if terminal_states is not None else []
         self.transitions = transitions
 
-        self.terminal_states = terminal_states if terminal_states is not None else []
+    @property
+    def transitions(self):
+        """Return the transitions of the MDP."""
+        return self._transitions
+
+    @transitions.setter
+    def transitions(self, value):
+        self._transitions = value
+        self._compile_transitions()
+
+    @property
+    def kernel(self):
+        """Return the dense transition kernel with shape [S x A x S]."""
+        if self._kernel is None:
+            self._compile_kernel()
+        return self._kernel
+
+    @property
+    def reward_matrix(self):
+        """Return the expected reward with shape [S x A]."""
+        if self._reward_matrix is None:
+            self._compile_kernel()
+        return self._reward_matrix
+
+    def _compile_kernel(self):
+        """Compile the transitions into a dense kernel and reward matrix."""
+        from rllib.environment.utilities import transitions2kernelreward
+
+        self._kernel, self._reward_matrix = transitions2kernelreward(
+            self.transitions, self.num_states, self.num_actions
+        )
+
+    def _compile_transitions(self):
+        """Compile the transitions into outcome tables.
+
+        The rewards keep their shape, so the table of rewards has shape
+        [S x A x max_outcomes x dim_reward]. The dense kernel and reward matrix are only
+        compiled when they are accessed, as they are quadratic in the number of states.
+
+        Raises
+        ------
+        ValueError
+            If a state-action pair has no transitions.
+        """
+        self._kernel, self._reward_matrix = None, None
+
+        pairs = list(product(range(self.num_states), range(self.num_actions)))
+        for state, action in pairs:
+            if not self.transitions.get((state, action)):
+                raise ValueError(
+                    f"The state-action pair ({state}, {action}) has no transitions."
+                )
+
+        max_outcomes = max(len(outcomes) for outcomes in self.transitions.values())
+        shape = (self.num_states, self.num_actions, max_outcomes)
+        reward = self.transitions[pairs[0]][0]["reward"]
+        self._next_states = np.zeros(shape, dtype=np.int64)
+        self._rewards = np.zeros(shape + np.atleast_1d(reward).shape)
+        self._cum_probs = np.ones(shape)
+        for state, action in pairs:
+            outcomes = self.transitions[(state, action)]
+            for i, outcome in enumerate(outcomes):
+                self._next_states[state, action, i] = outcome["next_state"]
+                self._rewards[state, action, i] = outcome["reward"]
+                self._cum_probs[state, action, i] = outcome["probability"]
+            cum_probs = np.cumsum(self._cum_probs[state, action, : len(outcomes)])
+            self._cum_probs[state, action, : len(outcomes)] = cum_probs / cum_probs[-1]
+
+        # Offset the cumulative probabilities of each state-action pair by its index,
+        # so that a single sorted search samples the outcomes of a batch of pairs.
+        self._rows = np.arange(self.num_states * self.num_actions).reshape(
+            self.num_states, self.num_actions
+        )
+        self._cum_probs += self._rows[..., np.newaxis]
+
+    @property
+    def terminal_states(self):
+        """Return the terminal states of the MDP."""
+        return self._terminal_states
+
+    @terminal_states.setter
+    def terminal_states(self, value):
+        self._terminal_states = value
+        self._is_terminal = np.zeros(self.num_states, dtype=bool)
+        self._is_terminal[list(value)] = True
 
     @property
     def state(self):
@@ -113,36 +206,34 @@ class MDP(AbstractEnvironment, Env):
 
         Parameters
         ----------
-        action: int
+        action: int or ndarray
 
         Returns
         -------
-        next_state: int
-        reward: float
-        done: bool
+        next_state: int or ndarray
+        reward: ndarray
+        done: bool or ndarray
         info: dict
 
         """
         self._time += 1
         if isinstance(action, torch.Tensor):
-            action = action.item()
-        transitions = self.transitions[(self.state, action)]
-        probs = []
-        for transition in transitions:
-            probs.append(transition["probability"])
-
-        next_transition_idx = np.random.choice(len(probs), p=probs)
-        self.state = transitions[next_transition_idx]["next_state"]
-        reward = transitions[next_transition_idx]["reward"]
-
-        if self.state in self.terminal_states:
-            done = True
-            next_state = self.num_states - 1
-        else:
-            done = False
-            next_state = self.state
-
-        return next_state, np.atleast_1d(reward), done, {}
+            action = action.numpy()
+        state, action = np.asarray(self.state), np.asarray(action, dtype=np.int64)
+
+        rows = self._rows[state, action]
+        u = rows + np.random.random_sample(rows.shape)
+        outcome = np.searchsorted(self._cum_probs.ravel(), u, side="right")
+        next_state = self._next_states.ravel()[outcome]
+        reward = self._rewards.reshape((-1,) + self._rewards.shape[3:])[outcome]
+
+        done = self._is_terminal[next_state]
+        self.state = next_state if next_state.ndim else next_state.item()
+        next_state = np.where(done, self.num_states - 1, next_state)
+
+        if not next_state.ndim:
+            return next_state.item(), reward, done.item(), {}
+        return next_state, reward, done, {}
 
     @staticmethod
     def check_transitions(transitions, num_states, num_actions):
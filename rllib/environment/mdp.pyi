@@ -1,5 +1,7 @@
 from typing import Callable, Dict, List, Optional, Tuple, Union
 
+import numpy as np
+
 from rllib.dataset.datatypes import Action
 
 from .abstract_environment import AbstractEnvironment
@@ -9,8 +11,15 @@ Transition = Dict[Tuple[int, int], List[Dict[str, Union[float, int]]]]
 class MDP(AbstractEnvironment):
     _state: int
     _time: float
-    transitions: Transition
-    terminal_states: List[int]
+    _transitions: Transition
+    _terminal_states: List[int]
+    _is_terminal: np.ndarray
+    _next_states: np.ndarray
+    _rewards: np.ndarray
+    _cum_probs: np.ndarray
+    _rows: np.ndarray
+    _kernel: Optional[np.ndarray]
+    _reward_matrix: Optional[np.ndarray]
     initial_state: Callable[..., int]
     def __init__(
         self,
@@ -21,15 +30,31 @@ class MDP(AbstractEnvironment):
         terminal_states: Optional[List[int]] = ...,
     ): ...
     @property
-    def state(self) -> int: ...
+    def transitions(self) -> Transition: ...
+    @transitions.setter
+    def transitions(self, value: Transition) -> None: ...
+    @property
+    def kernel(self) -> np.ndarray: ...
+    @property
+    def reward_matrix(self) -> np.ndarray: ...
+    def _compile_kernel(self) -> None: ...
+    def _compile_transitions(self) -> None: ...
+    @property
+    def terminal_states(self) -> List[int]: ...
+    @terminal_states.setter
+    def terminal_states(self, value: List[int]) -> None: ...
+    @property
+    def state(self) -> Union[int, np.ndarray]: ...
     @state.setter
-    def state(self, value: int) -> None: ...
+    def state(self, value: Union[int, np.ndarray]) -> None: ...
     def set_state(self, value: int) -> None: ...
     def get_state(self) -> int: ...
     def reset(self) -> int: ...
     @property
     def time(self) -> float: ...
-    def step(self, action: Action) -> Tuple[int, float, bool, dict]: ...
+    def step(
+        self, action: Action
+    ) -> Tuple[Union[int, np.ndarray], np.ndarray, Union[bool, np.ndarray], dict]: ...
     @staticmethod
     def check_transitions(
         transitions: Transition, num_states: int, num_actions: int
@@ -3,7 +3,8 @@ import importlib
 import numpy as np
 import pytest
 
-from rllib.environment import GymEnvironment
+from rllib.environment import GymEnvironment, transitions2kernelreward
+from rllib.environment.mdps import RandomMDP, SingleChainProblem
 
 
 @pytest.fixture(params=[True, False])
@@ -327,3 +328,69 @@ class TestTwoStateProblem(MDPTest):
             else:
                 assert reward == 0
             state = next_state
+
+
+class TestBatchedStep(object):
+    """Test batched stepping of MDPs."""
+
+    def test_kernel(self):
+        env = RandomMDP(num_states=20, num_actions=5)
+        kernel, reward = transitions2kernelreward(env.transitions, 20, 5)
+        np.testing.assert_allclose(env.kernel, kernel)
+        np.testing.assert_allclose(env.reward_matrix, reward)
+
+    def test_shape(self):
+        env = RandomMDP(num_states=20, num_actions=5)
+        env.state = np.random.randint(20, size=(4, 8))
+        next_state, reward, done, info = env.step(np.random.randint(5, size=(4, 8)))
+        assert next_state.shape == (4, 8)
+        assert reward.shape == (4, 8, 1)
+        assert done.shape == (4, 8)
+        np.testing.assert_equal(env.state, next_state)
+
+    def test_deterministic_equality(self):
+        env = SingleChainProblem(chain_length=5)
+        states = np.arange(env.num_states).repeat(env.num_actions)
+        actions = np.tile(np.arange(env.num_actions), env.num_states)
+
+        env.state = states
+        next_states, rewards, _, _ = env.step(actions)
+        for state, action, next_state, reward in zip(
+            states, actions, next_states, rewards
+        ):
+            env.state = state
+            assert env.step(action)[:2] == (next_state, reward)
+
+    def test_sample_frequency(self):
+        env = RandomMDP(num_states=20, num_actions=5)
+        env.state = np.zeros(20000, dtype=np.int64)
+        next_state, _, _, _ = env.step(np.zeros(20000, dtype=np.int64))
+        frequency = np.bincount(next_state, minlength=20) / 20000
+        np.testing.assert_allclose(frequency, env.kernel[0, 0], atol=0.02)
+
+    def test_vector_reward(self):
+        env = SingleChainProblem(chain_length=5)
+        transitions = {
+            pair: [{**outcome, "reward": [outcome["reward"], -1.0]} for outcome in out]
+            for pair, out in env.transitions.items()
+        }
+        env.transitions = transitions
+        env.state = 0
+        next_state, reward, _, _ = env.step(1)
+        assert reward.shape == (2,)
+        np.testing.assert_equal(reward, transitions[(0, 1)][0]["reward"])
+
+        env.state = np.zeros(8, dtype=np.int64)
+        next_state, reward, _, _ = env.step(np.ones(8, dtype=np.int64))
+        assert reward.shape == (8, 2)
+
+    def test_missing_transitions(self):
+        env = SingleChainProblem(chain_length=5)
+        transitions = dict(env.transitions)
+        del transitions[(0, 1)]
+        with pytest.raises(ValueError):
+            env.transitions = transitions
+
+        transitions[(0, 1)] = []
+        with pytest.raises(ValueError):
+            env.transitions = transitions
@@ -66,7 +66,8 @@ class CartPole(ODESystem):
 
         total_mass = pendulum_mass + cart_mass
 
-        x, theta, v, omega = state
+        x, theta, v, omega = [state[..., i] for i in range(4)]
+        action = action[..., 0]
 
         x_dot = v
         theta_dot = omega
@@ -89,7 +90,7 @@ class CartPole(ODESystem):
             + total_mass * g * bk.sin(theta)
         ) / det
 
-        return np.array((x_dot, theta_dot, v_dot, omega_dot))
+        return bk.stack((x_dot, theta_dot, v_dot, omega_dot), -1)
 
 
 class CartPoleEnv(SystemEnvironment):
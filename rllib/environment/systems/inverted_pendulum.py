@@ -96,9 +96,10 @@ class InvertedPendulum(ODESystem):
         else:
             action = action.clamp(-1.0, 1.0)
 
-        self.last_action = action[0]
+        if action.ndim == 1:
+            self.last_action = action[0]
 
-        angle, angular_velocity = state
+        angle, angular_velocity = state[..., 0], state[..., 1]
 
         x_ddot = (
             gravity / length * bk.sin(angle)
@@ -106,7 +107,7 @@ class InvertedPendulum(ODESystem):
             - friction / inertia * angular_velocity
         )
 
-        return np.array((angular_velocity, x_ddot))
+        return bk.stack((angular_velocity, x_ddot), -1)
 
     @property
     def action_space(self):
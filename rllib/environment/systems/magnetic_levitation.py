@@ -4,6 +4,7 @@ import numpy as np
 
 from rllib.environment import SystemEnvironment
 from rllib.environment.systems.ode_system import ODESystem
+from rllib.util.utilities import get_backend
 
 
 class MagneticLevitation(ODESystem):
@@ -93,7 +94,8 @@ class MagneticLevitation(ODESystem):
 
         """
         # Physical dynamics
-        x1, x2, x3 = state
+        bk = get_backend(state)
+        x1, x2, x3 = state[..., 0], state[..., 1], state[..., 2]
 
         alpha = self.alpha(x1, x2, x3)
         beta = self.beta(x1, x2, x3)
@@ -101,9 +103,9 @@ class MagneticLevitation(ODESystem):
 
         x1_dot = x2
         x2_dot = alpha
-        x3_dot = beta + gamma * action
+        x3_dot = beta + gamma * action[..., 0]
 
-        return np.array([x1_dot, x2_dot, x3_dot])
+        return bk.stack((x1_dot, x2_dot, x3_dot), -1)
 
 
 class MagneticLevitationEnv(SystemEnvironment):
@@ -4,6 +4,8 @@ import numpy as np
 import torch
 from scipy import integrate, signal
 
+from rllib.util.integrators import AbstractIntegrator
+
 from .abstract_system import AbstractSystem
 from .linear_system import LinearSystem
 
@@ -19,6 +21,10 @@ class ODESystem(AbstractSystem):
     step_size : float
     dim_state: Tuple
     dim_action : Tuple
+    integrator: Type[OdeSolver] or AbstractIntegrator, optional.
+        Integrator of the ode. By default, scipy's `RK45`, for which a new solver is
+        constructed at every step and only single numpy states are supported. To step
+        torch states or batches of states, use an `AbstractIntegrator`, e.g., `RK4()`.
     """
 
     def __init__(
@@ -33,14 +39,36 @@ class ODESystem(AbstractSystem):
         self.integrator = integrator
 
     def step(self, action):
-        """See `AbstractSystem.step'."""
-        integrator = self.integrator(
-            lambda t, y: self.func(t, y, action), 0, self.state, t_bound=self.step_size
-        )
+        """See `AbstractSystem.step'.
 
-        while integrator.status == "running":
-            integrator.step()
-        self.state = integrator.y
+        With an `AbstractIntegrator', the state may be an array or a tensor with
+        leading batch dimensions `[N, dim_state]`. With a scipy `OdeSolver`, only
+        single numpy states are supported.
+        """
+        if isinstance(self.integrator, AbstractIntegrator):
+            if isinstance(self.state, torch.Tensor):
+                action = torch.as_tensor(action, dtype=self.state.dtype)
+            self.state = self.integrator.step(
+                self.func, self._time, self.state, self.step_size, action
+            )
+        elif isinstance(self.state, torch.Tensor) or np.ndim(self.state) > len(
+            self.dim_state
+        ):
+            raise TypeError(
+                "Scipy integrators only step single numpy states. To step torch states "
+                "or batches, set the integrator to an AbstractIntegrator, e.g., RK4()."
+            )
+        else:
+            integrator = self.integrator(
+                lambda t, y: self.func(t, y, action),
+                0,
+                self.state,
+                t_bound=self.step_size,
+            )
+
+            while integrator.status == "running":
+                integrator.step()
+            self.state = integrator.y
         self._time += self.step_size
 
         return self.state
@@ -113,3 +141,34 @@ class ODESystem(AbstractSystem):
     def time(self):
         """See `AbstractSystem.time'."""
         return self._time
+
+
+if __name__ == "__main__":
+    import timeit
+
+    from rllib.environment.systems.inverted_pendulum import InvertedPendulum
+    from rllib.util.integrators import RK4, RK45, Euler, SemiImplicitEuler
+
+    system = InvertedPendulum(mass=1.0, length=1.0, friction=0.1)
+    state, action = np.array([0.1, 0.0]), np.array([0.1])
+
+    def _step(batch_state, batch_action):
+        system.state = batch_state
+        return system.step(batch_action)
+
+    for integrator in [integrate.RK45, RK45(), RK4(), Euler(), SemiImplicitEuler()]:
+        system.integrator = integrator
+        name = getattr(integrator, "__name__", type(integrator).__name__)
+        time = timeit.timeit(lambda: _step(state, action), number=1000)
+        print(f"{name:<20} single numpy state: {time * 1e3:.1f} us/step")
+
+    for batch_size in [1, 100, 10000]:
+        batch_state = torch.tensor(state).repeat(batch_size, 1)
+        batch_action = torch.tensor(action).repeat(batch_size, 1)
+        for integrator in [RK4(), RK45()]:
+            system.integrator = integrator
+            time = timeit.timeit(lambda: _step(batch_state, batch_action), number=100)
+            print(
+                f"{type(integrator).__name__:<20} batch of {batch_size:>5}: "
+                f"{time * 1e4:.1f} us/step"
+            )
@@ -1,8 +1,9 @@
-from typing import Callable, Optional, Tuple, Type
+from typing import Callable, Optional, Tuple, Type, Union
 
 from scipy.integrate import OdeSolver
 
 from rllib.dataset.datatypes import Action, State
+from rllib.util.integrators import AbstractIntegrator
 
 from .abstract_system import AbstractSystem
 from .linear_system import LinearSystem
@@ -10,14 +11,14 @@ from .linear_system import LinearSystem
 class ODESystem(AbstractSystem):
     step_size: float
     func: Callable
-    integrator: Type[OdeSolver]
+    integrator: Union[AbstractIntegrator, Type[OdeSolver]]
     def __init__(
         self,
         func: Callable,
         step_size: float,
         dim_state: Tuple,
         dim_action: Tuple,
-        integrator: Type[OdeSolver] = ...,
+        integrator: Union[AbstractIntegrator, Type[OdeSolver]] = ...,
     ) -> None: ...
     def step(self, action: Action) -> State: ...
     def linearize(
@@ -3,6 +3,7 @@
 import numpy as np
 
 from rllib.environment.systems.ode_system import ODESystem
+from rllib.util.utilities import get_backend
 
 
 class PitchControl(ODESystem):
@@ -71,14 +72,15 @@ class PitchControl(ODESystem):
 
         """
         # Physical dynamics
-        alpha, q, theta = state
-        (u,) = action
+        bk = get_backend(state)
+        alpha, q = state[..., 0], state[..., 1]
+        u = action[..., 0]
 
         alpha_dot = -self.cld * alpha + self.omega * q + self.cw * u
         q_dot = -self.cmld * alpha - self.cm * q + self.eta * self.cw * u
         theta_dot = self.omega * q
 
-        return np.array([alpha_dot, q_dot, theta_dot])
+        return bk.stack((alpha_dot, q_dot, theta_dot), -1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+import torch
+from scipy import integrate
+
+from rllib.environment.systems.cart1d import Cart1d
+from rllib.environment.systems.cart_pole import CartPole
+from rllib.environment.systems.inverted_pendulum import InvertedPendulum
+from rllib.environment.systems.magnetic_levitation import MagneticLevitation
+from rllib.environment.systems.pitch_control import PitchControl
+from rllib.environment.systems.underwater_vehicle import UnderwaterVehicle
+from rllib.util.integrators import RK4
+
+
+@pytest.fixture(
+    params=[
+        lambda: CartPole(1.0, 1.0, 1.0),
+        lambda: InvertedPendulum(1.0, 1.0, 0.1),
+        lambda: MagneticLevitation(),
+        lambda: PitchControl(),
+        lambda: UnderwaterVehicle(),
+        lambda: Cart1d(),
+    ]
+)
+def system(request):
+    return request.param()
+
+
+def state_action(system, batch_size):
+    state = 0.1 * np.random.rand(batch_size, system.dim_state[0]) + 0.05
+    action = np.random.rand(batch_size, system.dim_action[0])
+    return state, action
+
+
+def test_default_integrator(system):
+    state, action = state_action(system, 1)
+    state, action = state[0], action[0]
+    solver = integrate.RK45(
+        lambda t, y: system.func(t, y, action), 0, state, t_bound=system.step_size
+    )
+    while solver.status == "running":
+        solver.step()
+
+    system.reset(state)
+    np.testing.assert_array_equal(system.step(action), solver.y)
+
+    system.reset(np.stack((state, state)))
+    with pytest.raises(TypeError):
+        system.step(np.stack((action, action)))
+
+
+def test_batch_step(system):
+    system.integrator = RK4()
+    state, action = state_action(system, 8)
+
+    next_state = []
+    for i in range(8):
+        system.reset(state[i])
+        next_state.append(system.step(action[i]))
+
+    system.reset(state)
+    np_next_state = system.step(action)
+    assert np_next_state.shape == state.shape
+    np.testing.assert_allclose(np_next_state, np.stack(next_state), atol=1e-6)
+
+    system.reset(torch.tensor(state))
+    torch_next_state = system.step(torch.tensor(action))
+    assert torch_next_state.shape == state.shape
+    np.testing.assert_allclose(torch_next_state.numpy(), np_next_state)
+
+
+def test_gradient(system):
+    system.integrator = RK4()
+    state, action = state_action(system, 8)
+    state = torch.tensor(state, requires_grad=True)
+    action = torch.tensor(action, requires_grad=True)
+
+    system.reset(state)
+    system.step(action).sum().backward()
+    assert state.grad.shape == state.shape
+    assert action.grad.shape == action.shape
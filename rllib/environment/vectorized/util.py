@@ -4,6 +4,7 @@ from abc import ABCMeta
 import numpy as np
 from gym import Env
 
+from rllib.util.integrators import RK4
 from rllib.util.utilities import get_backend
 
 
@@ -97,9 +98,6 @@ class VectorizedEnv(Env, metaclass=ABCMeta):
 def rk4(derivs, y0, t, *args, **kwargs):
     """Integrate 1D or ND system of ODEs using 4-th order Runge-Kutta.
 
-    This is a toy implementation which may be useful if you find
-    yourself stranded on a system w/o scipy.  Otherwise use
-    :func:`scipy.integrate`.
     *y0*
         initial state vector
     *t*
@@ -128,23 +126,7 @@ def rk4(derivs, y0, t, *args, **kwargs):
             return -alpha*x + exp(-t)
         y0 = 1
         yout = rk4(derivs, y0, t)
-    If you have access to scipy, you should probably be using the
-    scipy.integrate tools rather than this function.
+    The integration is done with `rllib.util.integrators.RK4`, which supports
+    leading batch dimensions in y0 and autograd through torch states.
     """
-    bk = get_backend(y0)
-    yout = bk.zeros((len(t), *y0.shape))
-
-    yout[0] = y0
-
-    for i in np.arange(len(t) - 1):
-        thist = t[i]
-        dt = t[i + 1] - thist
-        dt2 = dt / 2.0
-        y0 = yout[i]
-
-        k1 = derivs(y0, thist, *args, **kwargs)
-        k2 = derivs(y0 + dt2 * k1, thist + dt2, *args, **kwargs)
-        k3 = derivs(y0 + dt2 * k2, thist + dt2, *args, **kwargs)
-        k4 = derivs(y0 + dt * k3, thist + dt, *args, **kwargs)
-        yout[i + 1] = y0 + dt / 6.0 * (k1 + 2 * k2 + 2 * k3 + k4)
-    return yout
+    return RK4().integrate(lambda t_, y: derivs(y, t_, *args, **kwargs), y0, t)
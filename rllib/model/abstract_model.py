@@ -147,6 +147,10 @@ class AbstractModel(nn.Module, metaclass=ABCMeta):
         """Get ensemble head."""
         return ""
 
+    def get_num_heads(self) -> int:
+        """Get number of ensemble heads."""
+        return 1
+
     @torch.jit.export
     def set_goal(self, goal):
         """Set reward model goal."""
@@ -57,6 +57,7 @@ class AbstractModel(nn.Module, metaclass=ABCMeta):
     def get_head(self) -> int: ...
     def get_head_idx(self) -> Tensor: ...
     def get_prediction_strategy(self) -> str: ...
+    def get_num_heads(self) -> int: ...
     def set_goal(self, goal: Optional[Tensor]) -> None: ...
     @property
     def is_rnn(self) -> bool: ...
@@ -4,7 +4,7 @@ import numpy as np
 import torch
 import torch.jit
 
-from rllib.util.neural_networks.neural_networks import Ensemble
+from rllib.util.neural_networks.neural_networks import Ensemble, StackedEnsemble
 
 from .nn_model import NNModel
 from .utilities import PredictionStrategy
@@ -21,6 +21,9 @@ class EnsembleModel(NNModel):
         String that indicates how to compute the predictions of the ensemble.
     deterministic: bool, optional (default=False).
         Bool that indicates if the ensemble members are probabilistic or deterministic.
+    independent_heads: bool, optional (default=False).
+        Bool that indicates if the ensemble members share the hidden layers or are
+        independent networks with stacked weights, see `StackedEnsemble'.
 
     Other Parameters
     ----------------
@@ -32,15 +35,18 @@ class EnsembleModel(NNModel):
         num_heads=5,
         prediction_strategy="moment_matching",
         deterministic=False,
+        independent_heads=False,
         *args,
         **kwargs,
     ):
         super().__init__(deterministic=False, *args, **kwargs)
         self.num_heads = num_heads
+        self.independent_heads = independent_heads
 
+        ensemble = StackedEnsemble if independent_heads else Ensemble
         self.nn = torch.nn.ModuleList(
             [
-                Ensemble(
+                ensemble(
                     num_heads=num_heads,
                     prediction_strategy=prediction_strategy,
                     deterministic=deterministic,
@@ -99,6 +105,11 @@ class EnsembleModel(NNModel):
         """Get ensemble head."""
         return self.nn[0].get_prediction_strategy()
 
+    @torch.jit.export
+    def get_num_heads(self) -> int:
+        """Get number of ensemble heads."""
+        return self.num_heads
+
     @property
     def name(self):
         """Get Model name."""
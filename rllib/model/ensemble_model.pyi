@@ -10,9 +10,16 @@ from .nn_model import NNModel
 
 class EnsembleModel(NNModel):
     num_heads: int
+    independent_heads: bool
     nn: torch.nn.ModuleList
     def __init__(
-        self, num_heads: int, prediction_strategy: str = ..., *args: Any, **kwargs: Any
+        self,
+        num_heads: int,
+        prediction_strategy: str = ...,
+        deterministic: bool = ...,
+        independent_heads: bool = ...,
+        *args: Any,
+        **kwargs: Any,
     ) -> None: ...
     def forward(self, *args: Tensor, **kwargs: Any) -> TupleDistribution: ...
     def sample_posterior(self) -> None: ...
@@ -29,3 +36,5 @@ class EnsembleModel(NNModel):
     def set_prediction_strategy(self, prediction: str) -> None: ...
     @torch.jit.export
     def get_prediction_strategy(self) -> str: ...
+    @torch.jit.export
+    def get_num_heads(self) -> int: ...
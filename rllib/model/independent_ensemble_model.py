@@ -3,6 +3,7 @@
 import numpy as np
 import torch
 
+from rllib.util.neural_networks.utilities import broadcast_head_indexes
 from rllib.util.utilities import safe_cholesky
 
 from .abstract_model import AbstractModel
@@ -45,6 +46,7 @@ class IndependentEnsembleModel(AbstractModel):
         self.num_heads = len(models)
         self.models = models
         self.head_ptr = 0
+        self.head_indexes = torch.zeros(1).long()
 
     def forward(self, state, action, next_state=None):
         """Compute the next prediction of the ensemble."""
@@ -72,7 +74,7 @@ class IndependentEnsembleModel(AbstractModel):
         elif self.prediction_strategy in ["set_head", "posterior"]:  # Thompson sampling
             mean, scale = self.models[self.head_ptr].forward(state, action, next_state)
         elif self.prediction_strategy == "set_head_idx":  # TS-INF
-            mean, scale = self.models[self.head_idx].forward(state, action, next_state)
+            mean, scale = self._gather_heads(state, action, next_state)
         elif self.prediction_strategy == "sample_multiple_head":
             head_idx = torch.randint(self.num_heads, size=(self.num_heads,)).unsqueeze(
                 -1
@@ -91,6 +93,19 @@ class IndependentEnsembleModel(AbstractModel):
             raise NotImplementedError
         return mean, scale
 
+    def _gather_heads(self, state, action, next_state=None):
+        """Predict each particle with its own head, see `set_head_idx'."""
+        predictions = [model(state, action, next_state) for model in self.models]
+        mean = torch.stack([prediction[0] for prediction in predictions])
+        scale = torch.stack([prediction[1] for prediction in predictions])
+
+        head_idx = broadcast_head_indexes(self.head_indexes, mean.shape[1:-1])
+        head_idx = head_idx.unsqueeze(0).unsqueeze(-1)
+        mean = mean.gather(0, head_idx.expand((1,) + mean.shape[1:])).squeeze(0)
+        head_idx = head_idx.unsqueeze(-1).expand((1,) + scale.shape[1:])
+        scale = scale.gather(0, head_idx).squeeze(0)
+        return mean, scale
+
     @classmethod
     def default(cls, environment, num_heads=5, *args, **kwargs):
         """See AbstractModel.default()."""
@@ -125,6 +140,16 @@ class IndependentEnsembleModel(AbstractModel):
         """Get ensemble head."""
         return self.head_ptr
 
+    @torch.jit.export
+    def set_head_idx(self, head_indexes):
+        """Set ensemble head for particles."""
+        self.head_indexes = head_indexes
+
+    @torch.jit.export
+    def get_head_idx(self):
+        """Get ensemble head index."""
+        return self.head_indexes
+
     @torch.jit.export
     def set_prediction_strategy(self, prediction):
         """Set ensemble prediction strategy."""
@@ -135,6 +160,11 @@ class IndependentEnsembleModel(AbstractModel):
         """Get ensemble head."""
         return self.prediction_strategy
 
+    @torch.jit.export
+    def get_num_heads(self):
+        """Get number of ensemble heads."""
+        return self.num_heads
+
     @property
     def is_rnn(self) -> bool:
         """Check if model is an RNN."""
@@ -12,6 +12,7 @@ class IndependentEnsembleModel(AbstractModel):
     prediction_strategy: str
     models: torch.nn.ModuleList
     head_ptr: int
+    head_indexes: torch.Tensor
     def __init__(
         self,
         models: torch.nn.ModuleList,
@@ -14,7 +14,9 @@ class LinearModel(AbstractModel):
         a, b = to_torch(a), to_torch(b)
 
         super().__init__(
-            dim_state=a.shape[1], dim_action=b.shape[1], deterministic=noise is None
+            dim_state=(a.shape[1],),
+            dim_action=(b.shape[1],),
+            deterministic=noise is None,
         )
 
         self.a = a.t()
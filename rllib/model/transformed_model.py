@@ -218,6 +218,11 @@ class TransformedModel(AbstractModel):
         """Get ensemble head."""
         return self.base_model.get_prediction_strategy()
 
+    @torch.jit.export
+    def get_num_heads(self) -> int:
+        """Get number of ensemble heads."""
+        return self.base_model.get_num_heads()
+
     def set_goal(self, goal):
         """Set reward model goal."""
         self.base_model.set_goal(goal)
@@ -36,11 +36,19 @@ class TabularPolicy(NNPolicy):
         return self.nn.head.weight
 
     def set_value(self, state, new_value):
-        """Set value to value function at a given state."""
-        if new_value.ndim < 1 or new_value.shape[-1] != self.nn.head.weight.shape[0]:
+        """Set value to value function at a given state.
+
+        The state may also be a tensor of states, in which case new_value is either a
+        tensor of actions or a tensor of logits with shape [num_states x num_actions].
+        """
+        if (
+            new_value.ndim < 1
+            or new_value.shape[-1] != self.nn.head.weight.shape[0]
+            or not new_value.is_floating_point()
+        ):
             new_value = torch.log(
                 one_hot_encode(new_value, num_classes=self.num_actions) + 1e-12
             )
 
         with torch.no_grad():
-            self.nn.head.weight[:, state] = new_value
+            self.nn.head.weight[:, state] = new_value.transpose(0, -1)
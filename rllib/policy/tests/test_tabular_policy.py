@@ -23,3 +23,15 @@ class TestTabularPolicy(object):
         torch.testing.assert_allclose(
             policy.table, torch.tensor([[0.3, 1.0, l1, 1], [0.7, 1.0, l2, 1]])
         )
+
+    def test_set_batch_value(self):
+        policy = TabularPolicy(num_states=2, num_actions=2)
+        policy.set_value(torch.arange(2), torch.tensor([1, 0]))
+        l1 = torch.log(torch.tensor(1e-12))
+        l2 = torch.log(torch.tensor(1.0 + 1e-12))
+        torch.testing.assert_allclose(policy.table, torch.tensor([[l1, l2], [l2, l1]]))
+
+        policy.set_value(torch.arange(2), torch.tensor([[0.3, 0.7], [0.2, 0.8]]))
+        torch.testing.assert_allclose(
+            policy.table, torch.tensor([[0.3, 0.2], [0.7, 0.8]])
+        )
@@ -0,0 +1,284 @@
+"""Batched fixed-step and adaptive integrators of ordinary differential equations.
+
+The integrators work both with numpy arrays and torch tensors and integrate all the
+leading (batch) dimensions of the state at once. They integrate an ode dy/dt = f(t, y)
+given by a callable `func(t, y, *args)`, i.e., the same signature as scipy.
+"""
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+import torch
+
+from rllib.util.utilities import get_backend
+
+
+class AbstractIntegrator(object, metaclass=ABCMeta):
+    """Abstract integrator of an ordinary differential equation.
+
+    Parameters
+    ----------
+    differentiable: bool, optional (default=True).
+        Flag that indicates whether to keep the autograd graph of torch states through
+        the integration. If False, the integration runs without tracking gradients.
+    """
+
+    def __init__(self, differentiable=True):
+        self.differentiable = differentiable
+
+    def step(self, func, t, y, dt, *args):
+        """Integrate the ode for a single step of length `dt`.
+
+        Parameters
+        ----------
+        func: callable
+            Right hand side of the ode, with signature func(t, y, *args).
+        t: float
+            Initial time.
+        y: ndarray or Tensor
+            Initial state, with arbitrary leading batch dimensions.
+        dt: float
+            Length of the step.
+        args:
+            Additional arguments passed to func.
+
+        Returns
+        -------
+        y: ndarray or Tensor
+            State at time t + dt.
+        """
+        if isinstance(y, torch.Tensor) and not self.differentiable:
+            with torch.no_grad():
+                return self._step(func, t, y, dt, *args)
+        return self._step(func, t, y, dt, *args)
+
+    def integrate(self, func, y0, t, *args):
+        """Integrate the ode over a sequence of times.
+
+        Parameters
+        ----------
+        func: callable
+            Right hand side of the ode, with signature func(t, y, *args).
+        y0: ndarray or Tensor
+            Initial state at time t[0], with arbitrary leading batch dimensions.
+        t: array_like
+            Sequence of times.
+        args:
+            Additional arguments passed to func.
+
+        Returns
+        -------
+        y: ndarray or Tensor
+            States at each time, with shape [len(t) x y0.shape].
+        """
+        y = [y0]
+        for t0, t1 in zip(t[:-1], t[1:]):
+            y.append(self.step(func, t0, y[-1], t1 - t0, *args))
+        return get_backend(y0).stack(y)
+
+    @abstractmethod
+    def _step(self, func, t, y, dt, *args):
+        """Integrate the ode for a single step of length `dt`."""
+        raise NotImplementedError
+
+
+class ExplicitRungeKutta(AbstractIntegrator):
+    """Explicit Runge-Kutta integrator given by its Butcher tableau.
+
+    The non-zero coefficients of the tableau are precomputed at construction, so each
+    stage only adds the derivatives that it actually depends on.
+
+    Parameters
+    ----------
+    a: array_like
+        Runge-Kutta matrix of shape [num_stages x num_stages].
+    b: array_like
+        Weights of each stage.
+    c: array_like
+        Nodes of each stage.
+    """
+
+    A = None
+    B = None
+    C = None
+
+    def __init__(self, a=None, b=None, c=None, differentiable=True):
+        super().__init__(differentiable=differentiable)
+        a = np.asarray(self.A if a is None else a, dtype=np.float64)
+        b = np.asarray(self.B if b is None else b, dtype=np.float64)
+        c = np.asarray(self.C if c is None else c, dtype=np.float64)
+        self._stages = [
+            (float(c_i), [(j, float(a_ij)) for j, a_ij in enumerate(a_i[:i]) if a_ij])
+            for i, (a_i, c_i) in enumerate(zip(a, c))
+        ]
+        self._weights = [(i, float(b_i)) for i, b_i in enumerate(b) if b_i]
+
+    def _stage_derivatives(self, func, t, y, dt, *args):
+        """Compute the derivatives at every stage of the method."""
+        k = []
+        for c_i, a_i in self._stages:
+            y_i = y
+            for j, a_ij in a_i:
+                y_i = y_i + (dt * a_ij) * k[j]
+            k.append(func(t + c_i * dt, y_i, *args))
+        return k
+
+    @staticmethod
+    def _combine(y, k, weights, dt):
+        """Combine the stage derivatives with the weights."""
+        for i, b_i in weights:
+            y = y + (dt * b_i) * k[i]
+        return y
+
+    def _step(self, func, t, y, dt, *args):
+        """See `AbstractIntegrator._step'."""
+        k = self._stage_derivatives(func, t, y, dt, *args)
+        return self._combine(y, k, self._weights, dt)
+
+
+class Euler(ExplicitRungeKutta):
+    """Forward Euler integrator."""
+
+    A = [[0.0]]
+    B = [1.0]
+    C = [0.0]
+
+
+class RK4(ExplicitRungeKutta):
+    """Classical 4-th order Runge-Kutta integrator."""
+
+    A = [
+        [0.0, 0.0, 0.0, 0.0],
+        [0.5, 0.0, 0.0, 0.0],
+        [0.0, 0.5, 0.0, 0.0],
+        [0.0, 0.0, 1.0, 0.0],
+    ]
+    B = [1 / 6, 1 / 3, 1 / 3, 1 / 6]
+    C = [0.0, 0.5, 0.5, 1.0]
+
+
+class RK45(ExplicitRungeKutta):
+    """Adaptive Dormand-Prince 5(4) Runge-Kutta integrator.
+
+    Each call to `step` integrates the interval [t, t + dt] with as many sub-steps as
+    required by the tolerances. The sub-step size is shared by the whole batch and is
+    controlled by the largest error in the batch.
+
+    Parameters
+    ----------
+    rtol: float, optional (default=1e-3).
+        Relative tolerance.
+    atol: float, optional (default=1e-6).
+        Absolute tolerance.
+    max_sub_steps: int, optional (default=1000).
+        Maximum number of accepted and rejected sub-steps per step. If the interval is
+        not integrated within them, `step` raises a RuntimeError.
+
+    References
+    ----------
+    Dormand, J. R., & Prince, P. J. (1980).
+    A family of embedded Runge-Kutta formulae. Journal of computational and applied
+    mathematics.
+    """
+
+    A = [
+        [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+        [1 / 5, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+        [3 / 40, 9 / 40, 0.0, 0.0, 0.0, 0.0, 0.0],
+        [44 / 45, -56 / 15, 32 / 9, 0.0, 0.0, 0.0, 0.0],
+        [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729, 0.0, 0.0, 0.0],
+        [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656, 0.0, 0.0],
+        [35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.0],
+    ]
+    B = [35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84, 0.0]
+    C = [0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0]
+    E = [
+        71 / 57600,
+        0.0,
+        -71 / 16695,
+        71 / 1920,
+        -17253 / 339200,
+        22 / 525,
+        -1 / 40,
+    ]
+
+    def __init__(self, rtol=1e-3, atol=1e-6, max_sub_steps=1000, differentiable=True):
+        super().__init__(differentiable=differentiable)
+        self.rtol = rtol
+        self.atol = atol
+        self.max_sub_steps = max_sub_steps
+        self._error_weights = [(i, float(e_i)) for i, e_i in enumerate(self.E) if e_i]
+
+    def _error_norm(self, y, y_new, error):
+        """Compute the largest rms norm of the scaled error in the batch."""
+        bk = get_backend(y)
+        if bk is torch:
+            y, y_new, error = y.detach(), y_new.detach(), error.detach()
+        scale = self.atol + self.rtol * bk.maximum(bk.abs(y), bk.abs(y_new))
+        error_norm = ((error / scale) ** 2).reshape(-1, *y.shape[-1:]).mean(-1) ** 0.5
+        return float(error_norm.max()) if error_norm.shape[0] else 0.0
+
+    def _step(self, func, t, y, dt, *args):
+        """See `AbstractIntegrator._step'."""
+        t_end, h = t + dt, dt
+        for _ in range(self.max_sub_steps):
+            if t >= t_end:
+                break
+            h = min(h, t_end - t)
+            k = self._stage_derivatives(func, t, y, h, *args)
+            y_new = self._combine(y, k, self._weights, h)
+            error = self._combine(0 * y, k, self._error_weights, h)
+            error_norm = self._error_norm(y, y_new, error)
+
+            if error_norm <= 1:
+                t, y = t + h, y_new
+            if error_norm == 0:
+                factor = 10.0
+            else:
+                factor = min(10.0, max(0.2, 0.9 * error_norm ** -0.2))
+            h = h * factor
+        if t < t_end:
+            raise RuntimeError(
+                f"RK45 did not reach t + dt in max_sub_steps={self.max_sub_steps} "
+                "sub-steps, increase max_sub_steps or the tolerances."
+            )
+        return y
+
+
+class SemiImplicitEuler(AbstractIntegrator):
+    """Semi-implicit (symplectic) Euler integrator.
+
+    The state is split into positions and velocities y = [q, v]. The velocities are
+    updated first with the current derivative, and the positions are then updated with
+    the derivative evaluated at the updated velocities.
+
+    Parameters
+    ----------
+    num_positions: int, optional.
+        Number of position coordinates at the beginning of the state. By default, the
+        first half of the state.
+    """
+
+    def __init__(self, num_positions=None, differentiable=True):
+        super().__init__(differentiable=differentiable)
+        self.num_positions = num_positions
+
+    def _step(self, func, t, y, dt, *args):
+        """See `AbstractIntegrator._step'."""
+        bk = get_backend(y)
+        num_positions = self.num_positions
+        if num_positions is None:
+            num_positions = y.shape[-1] // 2
+
+        q, v = y[..., :num_positions], y[..., num_positions:]
+        v = v + dt * func(t, y, *args)[..., num_positions:]
+        y_v = self._cat(bk, q, v)
+        q = q + dt * func(t, y_v, *args)[..., :num_positions]
+        return self._cat(bk, q, v)
+
+    @staticmethod
+    def _cat(bk, q, v):
+        """Concatenate positions and velocities."""
+        if bk is np:
+            return np.concatenate((q, v), -1)
+        else:
+            return torch.cat((q, v), -1)
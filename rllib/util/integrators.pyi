@@ -0,0 +1,64 @@
+from abc import ABCMeta
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from rllib.dataset.datatypes import Array
+
+class AbstractIntegrator(object, metaclass=ABCMeta):
+    differentiable: bool
+    def __init__(self, differentiable: bool = ...) -> None: ...
+    def step(
+        self, func: Callable[..., Array], t: float, y: Array, dt: float, *args: Any
+    ) -> Array: ...
+    def integrate(
+        self, func: Callable[..., Array], y0: Array, t: Sequence[float], *args: Any
+    ) -> Array: ...
+    def _step(
+        self, func: Callable[..., Array], t: float, y: Array, dt: float, *args: Any
+    ) -> Array: ...
+
+class ExplicitRungeKutta(AbstractIntegrator):
+    A: Optional[Sequence[Sequence[float]]]
+    B: Optional[Sequence[float]]
+    C: Optional[Sequence[float]]
+    _stages: List[Tuple[float, List[Tuple[int, float]]]]
+    _weights: List[Tuple[int, float]]
+    def __init__(
+        self,
+        a: Optional[Iterable[Iterable[float]]] = ...,
+        b: Optional[Iterable[float]] = ...,
+        c: Optional[Iterable[float]] = ...,
+        differentiable: bool = ...,
+    ) -> None: ...
+    def _stage_derivatives(
+        self, func: Callable[..., Array], t: float, y: Array, dt: float, *args: Any
+    ) -> List[Array]: ...
+    @staticmethod
+    def _combine(
+        y: Array, k: List[Array], weights: List[Tuple[int, float]], dt: float
+    ) -> Array: ...
+
+class Euler(ExplicitRungeKutta): ...
+class RK4(ExplicitRungeKutta): ...
+
+class RK45(ExplicitRungeKutta):
+    E: Sequence[float]
+    rtol: float
+    atol: float
+    max_sub_steps: int
+    _error_weights: List[Tuple[int, float]]
+    def __init__(
+        self,
+        rtol: float = ...,
+        atol: float = ...,
+        max_sub_steps: int = ...,
+        differentiable: bool = ...,
+    ) -> None: ...
+    def _error_norm(self, y: Array, y_new: Array, error: Array) -> float: ...
+
+class SemiImplicitEuler(AbstractIntegrator):
+    num_positions: Optional[int]
+    def __init__(
+        self, num_positions: Optional[int] = ..., differentiable: bool = ...
+    ) -> None: ...
+    @staticmethod
+    def _cat(bk: Any, q: Array, v: Array) -> Array: ...
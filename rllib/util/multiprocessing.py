@@ -1,4 +1,6 @@
 """Multi-Processing Utilities."""
+import numpy as np
+import torch
 import torch.multiprocessing as mp
 
 
@@ -86,10 +88,202 @@ def modify_parallel(function, args_list, num_cpu=None):
     if num_calls == 1:
         function(*args_list[0])
     else:
-        processes = []
-        for rank in range(num_calls):
-            p = mp.Process(target=function, args=(*args_list[rank],))
-            processes.append(p)
+        for start in range(0, num_calls, max(num_cpu, 1)):
+            processes = []
+            for args in args_list[start : start + max(num_cpu, 1)]:
+                p = mp.Process(target=function, args=(*args,))
+                p.start()
+                processes.append(p)
 
-        for p in processes:
-            p.join()
+            for p in processes:
+                p.join()
+
+
+def _environment_worker(pipe, environments, buffers, discrete_action):
+    """Reset or step the environments of a worker of an `EnvironmentPool'.
+
+    The worker waits for (command, indexes) requests. It reads the actions from and
+    writes the transitions to the shared buffers, and only sends back the infos.
+    Discrete actions are passed to the environments as integers, and continuous
+    actions as arrays.
+    """
+    state, action, reward, done = buffers
+    while True:
+        command, indexes = pipe.recv()
+        if command == "close":
+            for environment in environments.values():
+                environment.close()
+            pipe.close()
+            break
+
+        try:
+            infos = []
+            for i in indexes:
+                environment = environments[i]
+                if command == "reset":
+                    state[i] = torch.as_tensor(environment.reset(), dtype=state.dtype)
+                    infos.append(dict())
+                    continue
+
+                action_ = action[i].item() if discrete_action else action[i].numpy()
+                next_state, reward_, done_, info = environment.step(action_)
+                state[i] = torch.as_tensor(next_state, dtype=state.dtype)
+                reward[i] = torch.as_tensor(reward_, dtype=reward.dtype)
+                done[i] = bool(done_)
+                infos.append(info)
+            pipe.send(infos)
+        except Exception as exception:
+            pipe.send(exception)
+
+
+class EnvironmentPool(object):
+    """A pool of environments that live in long-lived worker processes.
+
+    The environments are split among the workers, and each worker resets and steps
+    its environments on request. The states, actions, rewards and done flags are
+    exchanged through pre-allocated shared-memory tensors, only the (small) info
+    dictionaries are pickled. All the environments must have the same spaces.
+
+    Parameters
+    ----------
+    environments: List[AbstractEnvironment]
+        Environments to step in parallel. They are copied to the workers.
+    num_workers: int, optional.
+        Number of worker processes. By default, one per cpu.
+
+    Methods
+    -------
+    reset(indexes):
+        Reset the environments at `indexes' and return their initial states.
+    step(action, indexes):
+        Step the environments at `indexes' with one action each.
+    close():
+        Close the environments and stop the workers.
+    """
+
+    def __init__(self, environments, num_workers=None):
+        environment = environments[0]
+        self.num_environments = len(environments)
+        self.discrete_state = environment.discrete_state
+        self.discrete_action = environment.discrete_action
+        self.action_scale = environment.action_scale
+        self.goal = environment.goal
+        self.name = environment.name
+
+        num_workers = mp.cpu_count() if num_workers is None else num_workers
+        num_workers = max(1, min(num_workers, self.num_environments))
+
+        def _zeros(shape, discrete):
+            dtype = torch.long if discrete else torch.double
+            return torch.zeros(self.num_environments, *shape, dtype=dtype)
+
+        self._state = _zeros(environment.dim_state, self.discrete_state)
+        self._action = _zeros(environment.dim_action, self.discrete_action)
+        self._reward = _zeros(environment.dim_reward, False)
+        self._done = torch.zeros(self.num_environments, dtype=torch.bool)
+        buffers = (self._state, self._action, self._reward, self._done)
+        for buffer in buffers:
+            buffer.share_memory_()
+
+        self._worker = np.zeros(self.num_environments, dtype=int)
+        self._pipes, self._processes = [], []
+        for rank, indexes in enumerate(
+            np.array_split(np.arange(self.num_environments), num_workers)
+        ):
+            self._worker[indexes] = rank
+            pipe, worker_pipe = mp.Pipe()
+            process = mp.Process(
+                target=_environment_worker,
+                args=(
+                    worker_pipe,
+                    {i: environments[i] for i in indexes},
+                    buffers,
+                    self.discrete_action,
+                ),
+                daemon=True,
+            )
+            process.start()
+            worker_pipe.close()
+            self._pipes.append(pipe)
+            self._processes.append(process)
+
+    def __len__(self):
+        """Return the number of environments."""
+        return self.num_environments
+
+    def __enter__(self):
+        """Enter into the pool context."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the pool when leaving the context."""
+        self.close()
+
+    def _request(self, command, indexes):
+        """Send a command to the workers of `indexes' and gather their infos."""
+        indexes = np.arange(self.num_environments) if indexes is None else indexes
+        indexes = np.atleast_1d(np.asarray(indexes, dtype=int))
+        workers = np.unique(self._worker[indexes])
+        for rank in workers:  # Send all the requests before waiting for any.
+            worker_indexes = indexes[self._worker[indexes] == rank]
+            self._pipes[rank].send((command, worker_indexes.tolist()))
+
+        # Receive every reply before raising, so no reply is left in the pipes.
+        infos, errors = dict(), []
+        for rank in workers:
+            worker_infos = self._pipes[rank].recv()
+            if isinstance(worker_infos, Exception):
+                errors.append(worker_infos)
+                continue
+            worker_indexes = indexes[self._worker[indexes] == rank]
+            infos.update(zip(worker_indexes.tolist(), worker_infos))
+        if errors:
+            raise errors[0]
+        return indexes, [infos[i] for i in indexes.tolist()]
+
+    def reset(self, indexes=None):
+        """Reset the environments at `indexes', by default all of them.
+
+        Returns
+        -------
+        state: ndarray
+            Initial states of the environments, with shape [len(indexes), ...].
+        """
+        indexes, _ = self._request("reset", indexes)
+        return self._state[indexes].numpy()
+
+    def step(self, action, indexes=None):
+        """Step the environments at `indexes', by default all of them.
+
+        Parameters
+        ----------
+        action: ndarray
+            Actions of the environments, with shape [len(indexes), ...].
+        indexes: array_like, optional.
+
+        Returns
+        -------
+        next_state: ndarray
+        reward: ndarray
+        done: ndarray
+        infos: List[dict]
+        """
+        indexes = np.arange(self.num_environments) if indexes is None else indexes
+        indexes = np.atleast_1d(np.asarray(indexes, dtype=int))
+        self._action[indexes] = torch.as_tensor(action, dtype=self._action.dtype)
+        indexes, infos = self._request("step", indexes)
+        return (
+            self._state[indexes].numpy(),
+            self._reward[indexes].numpy(),
+            self._done[indexes].numpy(),
+            infos,
+        )
+
+    def close(self):
+        """Close the environments and stop the workers."""
+        for pipe, process in zip(self._pipes, self._processes):
+            if process.is_alive():
+                pipe.send(("close", None))
+                process.join()
+            pipe.close()
+        self._pipes, self._processes = [], []
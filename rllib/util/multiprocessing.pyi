@@ -1,7 +1,12 @@
 """Multi-Processing Utilities."""
-from typing import Any, Callable, List, Optional, Tuple
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import torch.multiprocessing as mp
+from torch import Tensor
+
+from rllib.environment import AbstractEnvironment
 
 def run_parallel_returns(
     function: Callable[..., Any],
@@ -13,3 +18,38 @@ def run_parallel_returns(
 def modify_parallel(
     function: Callable[..., None], args_list: List[Tuple], num_cpu: Optional[int] = ...
 ) -> None: ...
+def _environment_worker(
+    pipe: Connection,
+    environments: Dict[int, AbstractEnvironment],
+    buffers: Tuple[Tensor, Tensor, Tensor, Tensor],
+    discrete_action: bool,
+) -> None: ...
+
+class EnvironmentPool(object):
+    num_environments: int
+    discrete_state: bool
+    discrete_action: bool
+    action_scale: Any
+    goal: Any
+    name: str
+    _state: Tensor
+    _action: Tensor
+    _reward: Tensor
+    _done: Tensor
+    _worker: np.ndarray
+    _pipes: List[Connection]
+    _processes: List[mp.Process]
+    def __init__(
+        self, environments: List[AbstractEnvironment], num_workers: Optional[int] = ...
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def __enter__(self) -> EnvironmentPool: ...
+    def __exit__(self, *args: Any) -> None: ...
+    def _request(
+        self, command: str, indexes: Optional[Sequence[int]]
+    ) -> Tuple[np.ndarray, List[dict]]: ...
+    def reset(self, indexes: Optional[Sequence[int]] = ...) -> np.ndarray: ...
+    def step(
+        self, action: np.ndarray, indexes: Optional[Sequence[int]] = ...
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[dict]]: ...
+    def close(self) -> None: ...
@@ -8,7 +8,14 @@ import torch.nn as nn
 
 from rllib.util.utilities import safe_cholesky
 
-from .utilities import inverse_softplus, parse_layers, update_parameters
+from .utilities import (
+    EnsembleLinear,
+    broadcast_head_indexes,
+    inverse_softplus,
+    parse_layers,
+    parse_nonlinearity,
+    update_parameters,
+)
 
 
 class FeedForwardNN(nn.Module):
@@ -243,8 +250,10 @@ class Ensemble(HeteroGaussianNN):
         A different random head is used for each element of a batch.
         - 'set_head': set a single head with .set_head() and return its output.
         This is useful for Thompson's Sampling (for example).
-        - 'set_head_idx': set a head with .set_head_idx() and return its output.
-        Crucially, it has to have the same batch_size as the predicted state-actions.
+        - 'set_head_idx': set a head for each element of a batch with .set_head_idx()
+        and return its output. The head indexes are broadcast to the batch_size of
+        the predicted state-actions, e.g., one head per particle kept along a
+        rollout for TS-INF.
     """
 
     num_heads: int
@@ -300,18 +309,7 @@ class Ensemble(HeteroGaussianNN):
             Cholesky factorization of covariance matrix of size.
             [batch_size x out_dim x out_dim].
         """
-        x = self.hidden_layers(x)
-        out = self.head(x)
-
-        out = torch.reshape(out, out.shape[:-1] + (-1, self.num_heads))
-
-        if self.deterministic:
-            scale = torch.zeros_like(out)
-        else:
-            scale = nn.functional.softplus(
-                self._scale(x) + self._init_scale_transformed
-            ).clamp(self._min_scale, self._max_scale)
-            scale = torch.reshape(scale, scale.shape[:-1] + (-1, self.num_heads))
+        out, scale = self._forward_heads(x)
 
         if self.prediction_strategy == "moment_matching":
             # Does not differentiate between epistemic and aleatoric uncertainty.
@@ -327,16 +325,10 @@ class Ensemble(HeteroGaussianNN):
             mean = out[..., self.head_ptr]
             scale = torch.diag_embed(scale[..., self.head_ptr])
         elif self.prediction_strategy == "sample_multiple_head":  # TS-1
-            head_idx = torch.randint(self.num_heads, out.shape[:-1]).unsqueeze(-1)
-            mean = out.gather(-1, head_idx).squeeze(-1)
-            scale = torch.diag_embed(scale.gather(-1, head_idx).squeeze(-1))
+            head_idx = torch.randint(self.num_heads, out.shape[:-2])
+            mean, scale = self._gather_heads(out, scale, head_idx)
         elif self.prediction_strategy == "set_head_idx":  # TS-INF
-            '''
-            Not correctly implemented, 
-            mpc solver never sets head_idx, also different head_ids for different states in the batch
-            '''
-            mean = out.gather(-1, self.head_idx)
-            scale = torch.diag_embed(scale.gather(-1, self.head_idx))
+            mean, scale = self._gather_heads(out, scale, self.head_indexes)
         elif self.prediction_strategy == "multi_head":
             mean = out.transpose(-1, -2)
             scale = torch.diag_embed(scale.transpose(-1, -2))
@@ -345,6 +337,49 @@ class Ensemble(HeteroGaussianNN):
 
         return mean, scale
 
+    def _forward_heads(self, x):
+        """Compute the mean and scale of all heads.
+
+        Returns
+        -------
+        out: torch.Tensor
+            Means of size [batch_size x out_dim x num_heads].
+        scale: torch.Tensor
+            Scales of size [batch_size x out_dim x num_heads].
+        """
+        x = self.hidden_layers(x)
+        out = self.head(x)
+
+        out = torch.reshape(out, out.shape[:-1] + (-1, self.num_heads))
+
+        if self.deterministic:
+            scale = torch.zeros_like(out)
+        else:
+            scale = nn.functional.softplus(
+                self._scale(x) + self._init_scale_transformed
+            ).clamp(self._min_scale, self._max_scale)
+            scale = torch.reshape(scale, scale.shape[:-1] + (-1, self.num_heads))
+        return out, scale
+
+    @staticmethod
+    def _gather_heads(out, scale, head_idx):
+        """Gather the output of one head for each element of the batch.
+
+        Parameters
+        ----------
+        out: torch.Tensor
+            Outputs of all the heads of size [batch_size x out_dim x num_heads].
+        scale: torch.Tensor
+            Scales of all the heads of size [batch_size x out_dim x num_heads].
+        head_idx: torch.Tensor
+            Head of each element, broadcastable to [batch_size].
+        """
+        head_idx = broadcast_head_indexes(head_idx, out.shape[:-2])
+        head_idx = head_idx.unsqueeze(-1).unsqueeze(-1).expand(out.shape[:-1] + (1,))
+        mean = out.gather(-1, head_idx).squeeze(-1)
+        scale = torch.diag_embed(scale.gather(-1, head_idx).squeeze(-1))
+        return mean, scale
+
     @torch.jit.export
     def set_head(self, new_head: int):
         """Set the Ensemble head.
@@ -389,6 +424,53 @@ class Ensemble(HeteroGaussianNN):
         return self.prediction_strategy
 
 
+class StackedEnsemble(Ensemble):
+    """Ensemble of independent Neural Networks with stacked weights.
+
+    Unlike `Ensemble', the heads do not share the inner layers. Each layer stores the
+    weights of all the heads in a tensor of size [num_heads x in_dim x out_dim] and
+    evaluates them with a single batched matrix multiplication, instead of iterating
+    over separate networks as `IndependentEnsembleModel'.
+
+    The prediction strategies are the same as in `Ensemble'.
+    """
+
+    def __init__(self, in_dim, out_dim, num_heads, *args, **kwargs):
+        super().__init__(in_dim, out_dim, num_heads, *args, **kwargs)
+        assert len(in_dim) == 1, "No images allowed."
+        non_linearity = parse_nonlinearity(self.kwargs["non_linearity"])
+        layers_ = list()
+        in_dim = in_dim[0]
+        for layer in self.kwargs["layers"]:
+            layers_.append(EnsembleLinear(in_dim, layer, num_heads))
+            layers_.append(non_linearity())
+            in_dim = layer
+
+        biased_head = self.kwargs["biased_head"]
+        self.hidden_layers = nn.Sequential(*layers_)
+        self.head = EnsembleLinear(in_dim, out_dim[0], num_heads, bias=biased_head)
+        self._scale = EnsembleLinear(in_dim, out_dim[0], num_heads, bias=biased_head)
+
+    def _forward_heads(self, x):
+        """Compute the mean and scale of all heads with batched multiplications."""
+        batch_shape = x.shape[:-1]
+        x = x.reshape(1, -1, x.shape[-1]).expand(self.num_heads, -1, -1)
+        x = self.hidden_layers(x)
+        out = self.head(x)
+
+        if self.deterministic:
+            scale = torch.zeros_like(out)
+        else:
+            scale = nn.functional.softplus(
+                self._scale(x) + self._init_scale_transformed
+            ).clamp(self._min_scale, self._max_scale)
+
+        # [num_heads x batch_size x out_dim] -> [batch_size x out_dim x num_heads].
+        out = out.permute(1, 2, 0).reshape(batch_shape + (-1, self.num_heads))
+        scale = scale.permute(1, 2, 0).reshape(batch_shape + (-1, self.num_heads))
+        return out, scale
+
+
 class FelixNet(FeedForwardNN):
     """A Module that implements FelixNet."""
 
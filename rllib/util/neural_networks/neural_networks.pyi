@@ -72,9 +72,24 @@ class Ensemble(HeteroGaussianNN):
         prediction_strategy: str = ...,
     ) -> T: ...
     def forward(self, *args: Tensor, **kwargs: Any) -> Tuple[Tensor, Tensor]: ...
+    def _forward_heads(self, x: Tensor) -> Tuple[Tensor, Tensor]: ...
+    @staticmethod
+    def _gather_heads(
+        out: Tensor, scale: Tensor, head_idx: Tensor
+    ) -> Tuple[Tensor, Tensor]: ...
     def set_head(self, new_head: int) -> None: ...
     def get_head(self) -> int: ...
 
+class StackedEnsemble(Ensemble):
+    def __init__(
+        self,
+        in_dim: Tuple,
+        out_dim: Tuple,
+        num_heads: int,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None: ...
+
 class FelixNet(FeedForwardNN):
     _scale: nn.Linear
     def __init__(
@@ -12,6 +12,7 @@ from rllib.util.neural_networks.neural_networks import (
     FelixNet,
     HeteroGaussianNN,
     HomoGaussianNN,
+    StackedEnsemble,
 )
 from rllib.util.neural_networks.utilities import count_vars
 from rllib.util.utilities import tensor_to_distribution
@@ -338,6 +339,41 @@ class TestEnsembleNN(object):
         assert o.has_rsample
         assert not o.has_enumerate_support
 
+    def test_set_head_idx(self, out_dim, num_heads, deterministic):
+        in_dim = (4,)
+        net = Ensemble(
+            in_dim, out_dim, num_heads=num_heads, deterministic=deterministic
+        )
+        t = torch.randn((3, 8) + in_dim)
+        net.set_prediction_strategy("multi_head")
+        heads_mean, heads_scale = net(t)
+
+        head_idx = torch.arange(8) % num_heads
+        net.set_prediction_strategy("set_head_idx")
+        net.set_head_idx(head_idx)
+        mean, scale = net(t)
+        assert mean.shape == torch.Size((3, 8) + out_dim)
+        assert scale.shape == torch.Size((3, 8) + out_dim + out_dim)
+        torch.testing.assert_close(mean, heads_mean[:, torch.arange(8), head_idx])
+        torch.testing.assert_close(scale, heads_scale[:, torch.arange(8), head_idx])
+
+        net.set_head_idx(torch.arange(5) % num_heads)  # not one head per particle.
+        with pytest.raises(ValueError):
+            net(t)
+
+    def test_sample_multiple_head(self, out_dim, num_heads):
+        in_dim = (4,)
+        net = Ensemble(in_dim, out_dim, num_heads=num_heads)
+        t = torch.randn((8,) + in_dim)
+        net.set_prediction_strategy("multi_head")
+        heads_mean, _ = net(t)
+
+        net.set_prediction_strategy("sample_multiple_head")
+        mean, _ = net(t)
+        for particle in range(8):
+            distance = (heads_mean[particle] - mean[particle]).abs().sum(-1)
+            assert distance.min() < 1e-6
+
     def test_layers(self, out_dim, num_heads, layers, deterministic):
         in_dim = (4,)
         net = Ensemble(in_dim, out_dim, layers=layers, num_heads=num_heads)
@@ -411,6 +447,55 @@ class TestEnsembleNN(object):
         assert not o.has_enumerate_support
 
 
+class TestStackedEnsemble(object):
+    @pytest.fixture(scope="class", params=[True, False])
+    def deterministic(self, request):
+        return request.param
+
+    def test_output_shape(self, out_dim, batch_size, num_heads, deterministic):
+        in_dim = (4,)
+        net = StackedEnsemble(
+            in_dim, out_dim, num_heads=num_heads, deterministic=deterministic
+        )
+        if batch_size is None:
+            t = torch.randn(in_dim)
+            o = tensor_to_distribution(net(t)).sample()
+            assert o.shape == torch.Size(out_dim)
+        else:
+            t = torch.randn((batch_size, 2) + in_dim)
+            o = tensor_to_distribution(net(t)).sample()
+            assert o.shape == torch.Size((batch_size, 2) + out_dim)
+
+        net.set_prediction_strategy("multi_head")
+        mean, scale = net(t)
+        batch_shape = (batch_size, 2) if batch_size is not None else ()
+        assert mean.shape == torch.Size(batch_shape + (num_heads,) + out_dim)
+        assert scale.shape == torch.Size(
+            batch_shape + (num_heads,) + out_dim + out_dim
+        )
+
+    def test_layers(self, out_dim, num_heads, layers):
+        net = StackedEnsemble((4,), out_dim, layers=layers, num_heads=num_heads)
+
+        # Check nn.parameters (+2: head and scale)
+        assert 2 * (len(layers) + 2) == len([*net.parameters()])
+        for param in net.parameters():
+            assert param.shape[0] == num_heads
+
+    def test_independent_heads(self, layers):
+        net = StackedEnsemble((4,), (2,), layers=layers, num_heads=5)
+        net.set_prediction_strategy("multi_head")
+        mean, _ = net(torch.randn(32, 4))
+        mean[:, 1].sum().backward()
+
+        for param in net.parameters():
+            if param.grad is None:  # the scale does not affect the mean.
+                continue
+            assert param.grad[1].abs().sum() > 0
+            other_grads = param.grad[[0, 2, 3, 4]]
+            torch.testing.assert_close(other_grads, torch.zeros_like(other_grads))
+
+
 class TestFelixNet(object):
     @pytest.fixture(scope="class")
     def net(self):
@@ -13,7 +13,9 @@ from rllib.util.neural_networks.neural_networks import (
     HomoGaussianNN,
 )
 from rllib.util.neural_networks.utilities import (
+    EnsembleLinear,
     TileCode,
+    broadcast_head_indexes,
     get_batch_size,
     init_head_bias,
     init_head_weight,
@@ -30,6 +32,19 @@ def test_inverse_softplus():
     torch.testing.assert_allclose(t, inverse_softplus(nn.functional.softplus(t)))
 
 
+def test_broadcast_head_indexes():
+    head_idx = torch.tensor([0, 2, 1])
+    out = broadcast_head_indexes(head_idx, torch.Size([4, 3]))
+    torch.testing.assert_close(out, head_idx.expand(4, 3))
+    out = broadcast_head_indexes(torch.tensor(1), torch.Size([4, 3]))
+    torch.testing.assert_close(out, torch.ones(4, 3).long())
+
+    with pytest.raises(ValueError):
+        broadcast_head_indexes(head_idx, torch.Size([3, 4]))
+    with pytest.raises(ValueError):
+        broadcast_head_indexes(torch.zeros(2, 4, 3).long(), torch.Size([4, 3]))
+
+
 def test_zero_bias():
     in_dim = (4,)
     out_dim = (2,)
@@ -55,6 +70,20 @@ def test_init_head():
             torch.testing.assert_allclose(param, torch.ones_like(param.data))
 
 
+@pytest.mark.parametrize("bias", [True, False])
+def test_ensemble_linear(bias):
+    layer = EnsembleLinear(4, 3, num_heads=5, bias=bias)
+    x = torch.randn(5, 32, 4)
+    out = layer(x)
+    assert out.shape == (5, 32, 3)
+
+    for i in range(5):
+        expected = x[i] @ layer.weight[i]
+        if bias:
+            expected = expected + layer.bias[i]
+        torch.testing.assert_close(out[i], expected)
+
+
 class TestUpdateParams(object):
     @pytest.fixture(params=[1.0, 0.9, 0.5, 0.2, 0.0], scope="class")
     def tau(self, request):
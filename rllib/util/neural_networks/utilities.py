@@ -64,6 +64,58 @@ class View(nn.Module):
         return x.view(x.size(0), -1)
 
 
+class EnsembleLinear(nn.Module):
+    """Linear layers of an ensemble with stacked weights.
+
+    The layer applies `num_heads' independent linear maps with a single batched
+    matrix multiplication. The input has size [num_heads x batch_size x in_features]
+    and the output has size [num_heads x batch_size x out_features].
+
+    Parameters
+    ----------
+    in_features: int
+        Size of the input of each head.
+    out_features: int
+        Size of the output of each head.
+    num_heads: int
+        Number of heads.
+    bias: bool, optional (default=True).
+        Flag that indicates if the layer has a bias term or not.
+    """
+
+    def __init__(self, in_features, out_features, num_heads, bias=True):
+        super().__init__()
+        self.in_features = in_features
+        self.out_features = out_features
+        self.num_heads = num_heads
+        self.weight = nn.Parameter(torch.empty(num_heads, in_features, out_features))
+        if bias:
+            self.bias = nn.Parameter(torch.empty(num_heads, 1, out_features))
+        else:
+            self.register_parameter("bias", None)
+        self.reset_parameters()
+
+    def reset_parameters(self):
+        """Initialize each head as `nn.Linear'."""
+        bound = 1 / np.sqrt(self.in_features) if self.in_features > 0 else 0
+        nn.init.uniform_(self.weight, -bound, bound)
+        if self.bias is not None:
+            nn.init.uniform_(self.bias, -bound, bound)
+
+    def forward(self, x):
+        """Apply the linear map of each head to its input."""
+        if self.bias is None:
+            return torch.bmm(x, self.weight)
+        return torch.baddbmm(self.bias, x, self.weight)
+
+    def extra_repr(self):
+        """Get the layer description."""
+        return (
+            f"in_features={self.in_features}, out_features={self.out_features}, "
+            f"num_heads={self.num_heads}, bias={self.bias is not None}"
+        )
+
+
 def parse_nonlinearity(non_linearity):
     """Parse non-linearity."""
     if hasattr(nn, non_linearity):
@@ -685,6 +737,42 @@ def gather_along_index(input_tensor, index, dim):
     return gather_along_index(input_tensor, index, dim)
 
 
+def broadcast_head_indexes(head_indexes, batch_shape):
+    """Broadcast the ensemble head of each particle to a batch shape.
+
+    The indexes are aligned with the trailing batch dimensions, e.g., indexes of size
+    [num_particles] broadcast to a batch of size [batch_size x num_particles].
+
+    Parameters
+    ----------
+    head_indexes: Tensor
+        Long tensor with the head of each particle.
+    batch_shape: torch.Size
+        Batch shape of the predictions.
+
+    Returns
+    -------
+    head_indexes: Tensor
+        Head indexes of size batch_shape.
+
+    Raises
+    ------
+    ValueError
+        If the head indexes do not broadcast to the batch shape.
+    """
+    num_dims = head_indexes.ndim
+    trailing_shape = batch_shape[len(batch_shape) - num_dims :]
+    if num_dims > len(batch_shape) or any(
+        size not in (1, batch_size)
+        for size, batch_size in zip(head_indexes.shape, trailing_shape)
+    ):
+        raise ValueError(
+            f"Head indexes of size {tuple(head_indexes.shape)} do not broadcast to "
+            f"the batch of size {tuple(batch_shape)}, set one head per particle."
+        )
+    return head_indexes.long().expand(batch_shape)
+
+
 def atleast_nd(input_tensor, n=1):
     """Make an input tensor at least `n`-dimensional.
 
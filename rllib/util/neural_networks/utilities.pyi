@@ -14,6 +14,18 @@ class Swish(nn.Module):
 class Mish(nn.Module):
     def forward(self, *args: Tensor, **kwargs: Any) -> Tensor: ...
 
+class EnsembleLinear(nn.Module):
+    in_features: int
+    out_features: int
+    num_heads: int
+    weight: nn.Parameter
+    bias: Optional[nn.Parameter]
+    def __init__(
+        self, in_features: int, out_features: int, num_heads: int, bias: bool = ...
+    ) -> None: ...
+    def reset_parameters(self) -> None: ...
+    def forward(self, *args: Tensor, **kwargs: Any) -> Tensor: ...
+
 def parse_nonlinearity(non_linearity: str) -> nn.Module: ...
 def parse_layers(
     layers: Sequence[int], in_dim: Tuple, non_linearity: str
@@ -70,6 +82,7 @@ def stop_learning(module: nn.Module) -> None: ...
 def resume_learning(module: nn.Module) -> None: ...
 def gather_along_index(input_tensor: Tensor, index: Tensor, dim: int) -> Tensor: ...
 def broadcast_to_tensor(input_tensor: Tensor, target_tensor: Tensor) -> Tensor: ...
+def broadcast_head_indexes(head_indexes: Tensor, batch_shape: Size) -> Tensor: ...
 def atleast_nd(input_tensor: Tensor, n: int = ...) -> Tensor: ...
 def to_torch(vector: Union[Tensor, np.ndarray, float, int]) -> Tensor: ...
 
@@ -0,0 +1,137 @@
+"""Opt-in profiler that attributes wall-clock time to named sections of the code."""
+import contextlib
+import time
+from collections import defaultdict
+
+import numpy as np
+
+_DISABLED_SECTION = contextlib.nullcontext()
+
+
+class _Section(object):
+    """Context manager that records the time spent inside a profiler section."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        """Start counting the time."""
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args):
+        """Record the elapsed time."""
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+
+class Profiler(object):
+    """Class that aggregates the time spent in named sections of the code.
+
+    When disabled, `section' returns a shared no-op context manager, so the
+    instrumented code only pays for a function call and an attribute lookup.
+
+    Parameters
+    ----------
+    enabled: bool, optional (default=False).
+        Flag that indicates whether to record the sections.
+
+    Notes
+    -----
+    Nested sections are inclusive, e.g., the time of a `learn' section that runs
+    inside an `observe' section is counted in both.
+
+    Examples
+    --------
+    >>> profiler = Profiler(enabled=True)
+    >>> with profiler.section("env_step"):
+    ...     pass
+    >>> profiler.add_steps(1)
+    >>> sorted(profiler.summary().keys())
+    ['steps_per_sec', 'time_env_step']
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.times = defaultdict(list)
+        self.num_steps = 0
+        self.start_time = None
+
+    def section(self, name):
+        """Return a context manager that records the time spent in section `name'."""
+        if not self.enabled:
+            return _DISABLED_SECTION
+        return _Section(self, name)
+
+    def record(self, name, duration):
+        """Record the duration, in seconds, of a call to section `name'."""
+        if self.start_time is None:
+            self.start_time = time.perf_counter() - duration
+        self.times[name].append(duration)
+
+    def add_steps(self, num_steps=1):
+        """Count environment steps to compute the throughput."""
+        if not self.enabled:
+            return
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        self.num_steps += num_steps
+
+    @property
+    def steps_per_sec(self):
+        """Return the number of steps per second since the last reset."""
+        if self.start_time is None or not self.num_steps:
+            return 0.0
+        return self.num_steps / max(time.perf_counter() - self.start_time, 1e-12)
+
+    def summary(self):
+        """Return the mean time, in seconds, of each section and the throughput."""
+        summary = {f"time_{name}": float(np.mean(t)) for name, t in self.times.items()}
+        if self.num_steps:
+            summary["steps_per_sec"] = self.steps_per_sec
+        return summary
+
+    def log(self, logger, reset=True):
+        """Log the summary to a logger and the histograms of the sections.
+
+        Parameters
+        ----------
+        logger: Logger
+            Logger where to store the mean times and the steps per second. If the
+            logger has a tensorboard writer, the histograms of the durations of each
+            section are also stored.
+        reset: bool, optional (default=True).
+            Flag that indicates whether to reset the profiler after logging.
+        """
+        if not self.enabled:
+            return
+        summary = self.summary()
+        if summary:
+            logger.update(**summary)
+        if logger.writer is not None:
+            for name, times in self.times.items():
+                logger.writer.add_histogram(
+                    f"profile/{name}", np.array(times), global_step=logger.episode
+                )
+        if reset:
+            self.reset()
+
+    def reset(self):
+        """Reset the recorded sections and the step counter."""
+        self.times = defaultdict(list)
+        self.num_steps = 0
+        self.start_time = None
+
+    def __str__(self):
+        """Return a table with the time spent in each section."""
+        str_ = ""
+        for name, times in sorted(self.times.items()):
+            str_ += name.ljust(20)
+            str_ += f"Calls: {len(times)}".ljust(15)
+            str_ += f"Mean: {1e3 * np.mean(times):.3g} ms".ljust(20)
+            str_ += f"Total: {np.sum(times):.3g} s\n"
+        if self.num_steps:
+            str_ += f"Steps/sec: {self.steps_per_sec:.3g}\n"
+        return str_
@@ -0,0 +1,28 @@
+"""Opt-in profiler that attributes wall-clock time to named sections of the code."""
+
+from typing import ContextManager, Dict, List, Optional
+
+from rllib.util.logger import Logger
+
+class _Section(object):
+    profiler: Profiler
+    name: str
+    start: float
+    def __init__(self, profiler: Profiler, name: str) -> None: ...
+    def __enter__(self) -> None: ...
+    def __exit__(self, *args: object) -> None: ...
+
+class Profiler(object):
+    enabled: bool
+    times: Dict[str, List[float]]
+    num_steps: int
+    start_time: Optional[float]
+    def __init__(self, enabled: bool = ...) -> None: ...
+    def section(self, name: str) -> ContextManager[None]: ...
+    def record(self, name: str, duration: float) -> None: ...
+    def add_steps(self, num_steps: int = ...) -> None: ...
+    @property
+    def steps_per_sec(self) -> float: ...
+    def summary(self) -> Dict[str, float]: ...
+    def log(self, logger: Logger, reset: bool = ...) -> None: ...
+    def reset(self) -> None: ...
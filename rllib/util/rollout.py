@@ -1,27 +1,56 @@
 """Helper functions to conduct a rollout with policies or agents."""
 
 import time
+
+import numpy as np
 import torch
 from gym.wrappers.monitoring.video_recorder import VideoRecorder
 from tqdm import tqdm
 
 from rllib.dataset.datatypes import Observation
+from rllib.environment.fake_environment import FakeEnvironment
+from rllib.util.multiprocessing import EnvironmentPool
 from rllib.util.neural_networks.utilities import broadcast_to_tensor, to_torch
+from rllib.util.profiler import Profiler
 from rllib.util.training.utilities import Evaluate
 from rllib.util.utilities import (
+    deterministic_action,
     get_entropy_and_log_p,
     sample_model,
     tensor_to_distribution,
 )
 
+_DISABLED_PROFILER = Profiler(enabled=False)
+
+
+def step_env(
+    environment, state, action, action_scale, pi=None, render=False, profiler=None
+):
+    """Perform a single step in an environment.
+
+    If a `Profiler' is given, the time of the environment step and of the
+    construction of the observation are recorded in the sections `env_step' and
+    `observation'.
+    """
+    profiler = _DISABLED_PROFILER if profiler is None else profiler
+    with profiler.section("env_step"):
+        try:
+            next_state, reward, done, info = environment.step(action)
+        except TypeError:
+            next_state, reward, done, info = environment.step(action.item())
+
+    with profiler.section("observation"):
+        observation = _get_observation(
+            state, action, reward, next_state, done, action_scale, pi
+        )
+    state = next_state
+    if render:
+        environment.render()
+    return observation, state, done, info
 
-def step_env(environment, state, action, action_scale, pi=None, render=False):
-    """Perform a single step in an environment."""
-    try:
-        next_state, reward, done, info = environment.step(action)
-    except TypeError:
-        next_state, reward, done, info = environment.step(action.item())
 
+def _get_observation(state, action, reward, next_state, done, action_scale, pi):
+    """Build the observation of an environment step."""
     action = to_torch(action)
 
     if pi is not None:
@@ -35,7 +64,7 @@ def step_env(environment, state, action, action_scale, pi=None, render=False):
     else:
         entropy, log_prob_action = 0.0, 1.0
 
-    observation = Observation(
+    return Observation(
         state=state,
         action=action,
         reward=reward,
@@ -44,10 +73,73 @@ def step_env(environment, state, action, action_scale, pi=None, render=False):
         entropy=entropy,
         log_prob_action=log_prob_action,
     ).to_torch()
-    state = next_state
-    if render:
-        environment.render()
-    return observation, state, done, info
+
+
+def step_envs(environments, state, action, action_scale, pi=None, indexes=None):
+    """Perform a single step in a batch of environments.
+
+    The i-th rows of `state' and `action' belong to the environment `indexes[i]',
+    and `pi' is the batched distribution of the actions. The entropy and the
+    log-probabilities of the actions are computed once for the whole batch.
+    The environments are either a list or an `EnvironmentPool', which steps all of
+    them at once in its workers.
+
+    Returns
+    -------
+    observations: List[Observation]
+    next_states: List[State]
+    dones: List[bool]
+    infos: List[dict]
+    """
+    indexes = range(len(state)) if indexes is None else indexes
+    entropy, log_prob_action = torch.zeros(len(state)), torch.ones(len(state))
+    if pi is not None:
+        try:
+            with torch.no_grad():
+                entropy, log_prob_action = get_entropy_and_log_p(
+                    pi, to_torch(action), action_scale
+                )
+        except RuntimeError:
+            pass
+
+    if isinstance(environments, EnvironmentPool):
+        next_states, rewards, dones, infos = environments.step(action, indexes)
+        observations = [
+            Observation(
+                state=state[i],
+                action=action[i],
+                reward=rewards[i],
+                next_state=next_states[i],
+                done=dones[i],
+                entropy=entropy[i],
+                log_prob_action=log_prob_action[i],
+            ).to_torch()
+            for i in range(len(indexes))
+        ]
+        return observations, list(next_states), dones.tolist(), infos
+
+    observations, next_states, dones, infos = [], [], [], []
+    for i, index in enumerate(indexes):
+        observation, next_state, done, info = step_env(
+            environment=environments[index],
+            state=state[i],
+            action=action[i],
+            action_scale=action_scale,
+        )
+        observation.entropy = entropy[i]
+        observation.log_prob_action = log_prob_action[i]
+        observations.append(observation)
+        next_states.append(next_state)
+        dones.append(done)
+        infos.append(info)
+    return observations, next_states, dones, infos
+
+
+def reset_envs(environments, indexes):
+    """Reset the environments at `indexes' of a list or of an `EnvironmentPool'."""
+    if isinstance(environments, EnvironmentPool):
+        return list(environments.reset(indexes))
+    return [environments[i].reset() for i in indexes]
 
 
 def step_model(
@@ -98,6 +190,40 @@ def step_model(
     return observation, next_state, done
 
 
+def step_fake_env(environment, action, done, action_scale=1.0, pi=None):
+    """Perform a single step of a batch of particles in a fake environment.
+
+    Unlike `step_env', the actions, the transitions and the entropy of the whole
+    batch stay as torch tensors. The rewards of the particles that are already
+    `done' are masked.
+    """
+    state = environment.state
+    next_state, reward, done_, info = environment.step(action)
+
+    broadcast_done = broadcast_to_tensor(done, target_tensor=reward)
+    reward = reward * (~broadcast_done).float()
+    done = done | torch.as_tensor(done_).bool()
+
+    if pi is not None:
+        try:
+            entropy, log_prob_action = get_entropy_and_log_p(pi, action, action_scale)
+        except RuntimeError:
+            entropy, log_prob_action = 0.0, 1.0
+    else:
+        entropy, log_prob_action = 0.0, 1.0
+
+    observation = Observation(
+        state=state,
+        action=action,
+        reward=reward,
+        next_state=next_state,
+        done=done.float(),
+        entropy=entropy,
+        log_prob_action=log_prob_action,
+    ).to_torch()
+    return observation, next_state, done, info
+
+
 def record(environment, agent, path, num_episodes=1, max_steps=1000):
     """Record an episode."""
     recorder = VideoRecorder(environment, path=path)
@@ -131,8 +257,10 @@ def rollout_episode(
     done = False
     start_time = time.time()
     time_step = 0
+    profiler = agent.profiler
     while not done:
-        action = agent.act(state)  # Scaled action, not in (-1, 1)
+        with profiler.section("act"):
+            action = agent.act(state)  # Scaled action, not in (-1, 1)
         obs, state, done, info = step_env(
             environment=environment,
             state=state,
@@ -140,8 +268,11 @@ def rollout_episode(
             action_scale=agent.policy.action_scale,
             pi=agent.pi,
             render=render,
+            profiler=profiler,
         )
-        agent.observe(obs)
+        with profiler.section("observe"):
+            agent.observe(obs)
+        profiler.add_steps()
         # Log info.
         agent.logger.update(**info)
 
@@ -157,6 +288,7 @@ def rollout_episode(
         for callback in callbacks:
             pass
             # callback(agent, environment, agent.total_episodes)
+    profiler.log(agent.logger)
     agent.end_episode()
     print(f"Episode_time: {time.time() - start_time}")
 
@@ -173,6 +305,7 @@ def rollout_agent(
     eval_frequency=0,
     save_milestones=None,
     callbacks=None,
+    evaluator=None,
 ):
     """Conduct a rollout of an agent in an environment.
 
@@ -198,6 +331,10 @@ def rollout_agent(
         List with episodes in which to save the agent.
     callbacks: List[Callable[[AbstractAgent, AbstractEnvironment,int], None]], optional.
         List of functions for evaluating/plotting the agent.
+    evaluator: ParallelEvaluator, optional.
+        Evaluator of the agent. If given, the evaluations run in background on a
+        snapshot of the policy while the agent keeps training, instead of running an
+        evaluation episode in `environment'.
     """
     save_milestones = list() if save_milestones is None else save_milestones
     callbacks = list() if callbacks is None else callbacks
@@ -219,7 +356,11 @@ def rollout_agent(
         if episode in save_milestones:
             agent.save(f"{agent.name}_{episode}.pkl")
 
-        if eval_frequency and episode % eval_frequency == 0:
+        if evaluator is not None:
+            evaluator.wait(agent, block=False)
+        if eval_frequency and episode % eval_frequency == 0 and evaluator is not None:
+            evaluator.evaluate(agent, background=True)
+        elif eval_frequency and episode % eval_frequency == 0:
             with Evaluate(agent):
                 rollout_episode(
                     environment=environment,
@@ -230,9 +371,185 @@ def rollout_agent(
                     use_early_termination=use_early_termination,
                     callbacks=callbacks,
                 )
+    if evaluator is not None:
+        evaluator.wait(agent)
+    agent.end_interaction()
+
+
+def observe_episode(agent, trajectory, infos):
+    """Feed a finished episode to the agent, one observation at a time.
+
+    The profile of the agent is logged and reset before the episode ends, as in
+    `rollout_episode'.
+    """
+    agent.start_episode()
+    for observation, info in zip(trajectory, infos):
+        with agent.profiler.section("observe"):
+            agent.observe(observation)
+        agent.logger.update(**info)
+    agent.profiler.log(agent.logger)
+    agent.end_episode()
+
+
+def rollout_agent_vectorized(
+    environments,
+    agent,
+    num_episodes=1,
+    max_steps=1000,
+    use_early_termination=True,
+    print_frequency=0,
+):
+    """Conduct a rollout of an agent in a batch of environments that step in lockstep.
+
+    At every step, the agent acts once on the stacked states of the environments that
+    are still running. When an environment finishes an episode, the episode is fed to
+    the agent with `observe_episode' and the environment is reset, until
+    `num_episodes' episodes have started.
+
+    Parameters
+    ----------
+    environments: List[AbstractEnvironment] or EnvironmentPool
+        Copies of the environment with which the agent interacts.
+        They must share the goal of the first environment. With an `EnvironmentPool',
+        the environments step in parallel in its worker processes.
+    agent: AbstractAgent
+        Agent that interacts with the environments.
+        Its `act' must only depend on the current state.
+    num_episodes: int, optional (default=1)
+        Number of episodes, across all the environments.
+    max_steps: int.
+        Maximum number of steps per episode.
+    use_early_termination: bool, optional (default=True).
+        Flag that indicates whether an episode finishes when the environment is done.
+    print_frequency: int, optional.
+        Print agent stats every `print_frequency' episodes if > 0.
+
+    Notes
+    -----
+    The episodes are fed to the agent only when they finish. Hence, the counters of
+    the agent, and the learning steps triggered by `observe', lag behind the steps of
+    the environments that are still running.
+    """
+    if isinstance(environments, EnvironmentPool):
+        agent.set_goal(environments.goal)
+    else:
+        agent.set_goal(environments[0].goal)
+    states = reset_envs(environments, range(min(len(environments), num_episodes)))
+    num_envs = len(states)
+    trajectories = [[] for _ in range(num_envs)]
+    infos = [[] for _ in range(num_envs)]
+    active = list(range(num_envs))
+    num_started, num_finished = num_envs, 0
+
+    profiler = agent.profiler
+    while len(active):
+        with profiler.section("act"):
+            action = agent.act(np.stack([states[i] for i in active]))
+        with profiler.section("env_step"):
+            observations, next_states, dones, step_infos = step_envs(
+                environments=environments,
+                state=[states[i] for i in active],
+                action=action,
+                action_scale=agent.policy.action_scale,
+                pi=agent.pi,
+                indexes=active,
+            )
+        profiler.add_steps(len(active))
+
+        running = []
+        for j, i in enumerate(active):
+            trajectories[i].append(observations[j])
+            infos[i].append(step_infos[j])
+            states[i] = next_states[j]
+            done = dones[j] and use_early_termination
+            if not done and len(trajectories[i]) < max_steps:
+                running.append(i)
+                continue
+
+            observe_episode(agent, trajectories[i], infos[i])
+            trajectories[i], infos[i] = [], []
+            num_finished += 1
+            if print_frequency and num_finished % print_frequency == 0:
+                print(agent)
+
+            if num_started < num_episodes:
+                states[i] = reset_envs(environments, [i])[0]
+                num_started += 1
+                running.append(i)
+        active = running
     agent.end_interaction()
 
 
+def evaluate_policy_vectorized(
+    environments, policy, num_episodes=1, max_steps=1000, use_early_termination=True
+):
+    """Evaluate the deterministic actions of a policy in a batch of environments.
+
+    The environments step in lockstep, and at every step the policy acts once on the
+    stacked states of the environments that are still running. No observations are
+    built, only the returns of the episodes are accumulated.
+
+    Parameters
+    ----------
+    environments: List[AbstractEnvironment] or EnvironmentPool
+        Copies of the environment in which to evaluate the policy.
+        With an `EnvironmentPool', the environments step in its worker processes.
+    policy: AbstractPolicy
+        Policy to evaluate. See `deterministic_action'.
+    num_episodes: int, optional (default=1)
+        Number of episodes, across all the environments.
+    max_steps: int.
+        Maximum number of steps per episode.
+    use_early_termination: bool, optional (default=True).
+        Flag that indicates whether an episode finishes when the environment is done.
+
+    Returns
+    -------
+    returns: ndarray
+        Undiscounted returns of each episode, with shape [num_episodes x dim_reward].
+    """
+    states = reset_envs(environments, range(min(len(environments), num_episodes)))
+    num_envs = len(states)
+    episode_returns, episode_steps = [0.0] * num_envs, [0] * num_envs
+    active = list(range(num_envs))
+    num_started, returns = num_envs, []
+
+    while len(active):
+        state = to_torch(np.stack([states[i] for i in active]))
+        with torch.no_grad():
+            action = deterministic_action(policy, state).numpy()
+        if isinstance(environments, EnvironmentPool):
+            next_states, rewards, dones, _ = environments.step(action, active)
+        else:
+            next_states, rewards, dones = [], [], []
+            for j, i in enumerate(active):
+                discrete = environments[i].discrete_action
+                action_ = action[j].item() if discrete else action[j]
+                next_state, reward, done, _ = environments[i].step(action_)
+                next_states.append(next_state)
+                rewards.append(reward)
+                dones.append(done)
+
+        running = []
+        for j, i in enumerate(active):
+            states[i] = next_states[j]
+            episode_returns[i] = episode_returns[i] + np.atleast_1d(rewards[j])
+            episode_steps[i] += 1
+            done = dones[j] and use_early_termination
+            if not done and episode_steps[i] < max_steps:
+                running.append(i)
+                continue
+
+            returns.append(episode_returns[i])
+            episode_returns[i], episode_steps[i] = 0.0, 0
+            if num_started < num_episodes:
+                states[i] = reset_envs(environments, [i])[0]
+                num_started += 1
+                running.append(i)
+        active = running
+    return np.stack(returns)
+
+
 def rollout_policy(
     environment, policy, num_episodes=1, max_steps=1000, render=False, memory=None
 ):
@@ -258,7 +575,18 @@ def rollout_policy(
     trajectories: List[Trajectory]=List[List[Observation]]
         A list of trajectories.
 
+    Notes
+    -----
+    In a `FakeEnvironment', the policy is rolled out in torch on all the initial
+    states returned by the environment at once. Each observation of the trajectory
+    is then batched and its rewards are the per-particle rewards.
     """
+    if isinstance(environment, FakeEnvironment):
+        return [
+            rollout_policy_on_fake_env(environment, policy, max_steps, memory)
+            for _ in tqdm(range(num_episodes))
+        ]
+
     trajectories = []
     for _ in tqdm(range(num_episodes)):
         state = environment.reset()
@@ -280,7 +608,7 @@ def rollout_policy(
             )
             trajectory.append(obs)
             if memory is not None:
-                memory.append(obs)
+                memory.append_batch(obs)
 
             time_step += 1
             if max_steps <= time_step:
@@ -290,6 +618,51 @@ def rollout_policy(
     return trajectories
 
 
+def rollout_policy_on_fake_env(environment, policy, max_steps=1000, memory=None):
+    """Conduct a batched rollout of a policy in a fake environment.
+
+    Parameters
+    ----------
+    environment: FakeEnvironment
+        Fake environment whose initial states are a batch of particles.
+    policy: AbstractPolicy
+        Policy that interacts with the environment.
+    max_steps: int.
+        Maximum number of steps per episode.
+    memory: ExperienceReplay, optional.
+        Memory where to store the simulated transitions.
+
+    Returns
+    -------
+    trajectory: Trajectory=List[Observation]
+        A list of batched observations.
+    """
+    state = environment.reset()
+    done = torch.zeros(state.shape[:-1], dtype=torch.bool)
+    trajectory = []
+    for _ in range(max_steps):
+        pi = tensor_to_distribution(policy(state), **policy.dist_params)
+        action = pi.sample()
+        if not policy.discrete_action:
+            action = policy.action_scale * action.clamp(-1.0, 1.0)
+
+        observation, state, done, _ = step_fake_env(
+            environment=environment,
+            action=action,
+            done=done,
+            action_scale=policy.action_scale,
+            pi=pi,
+        )
+        trajectory.append(observation)
+        if memory is not None:
+            memory.append_batch(observation)
+
+        if torch.all(done):
+            break
+
+    return trajectory
+
+
 def rollout_model(
     dynamical_model,
     reward_model,
@@ -374,7 +747,7 @@ def rollout_model(
         )
         trajectory.append(observation)
         if memory is not None:
-            memory.append(observation)
+            memory.append_batch(observation)
 
         state = next_state
         if torch.all(done):
@@ -436,10 +809,77 @@ def rollout_actions(
         )
         trajectory.append(observation)
         if memory is not None:
-            memory.append(observation)
+            memory.append_batch(observation)
 
         state = next_state
         if torch.all(done):
             break
 
     return trajectory
+
+
+def rollout_actions_returns(
+    dynamical_model,
+    reward_model,
+    action_sequence,
+    initial_state,
+    termination_model=None,
+    gamma=1.0,
+    terminal_reward=None,
+):
+    """Compute the discounted returns of action sequences interacting with a model.
+
+    Unlike `rollout_actions', the transitions are not stored. Hence, there is no
+    `Observation' construction, no entropy or log-probability computation and no
+    stacking of the trajectory. The discounted returns are accumulated while the
+    models are sampled, and gradients flow through the returns.
+
+    Parameters
+    ----------
+    dynamical_model: AbstractModel
+        Dynamical Model with which the actions interact.
+    reward_model: AbstractReward
+        Reward Model with which the actions interact.
+    action_sequence: Action
+        Action Sequence that interacts with the models.
+        The dimensions are [horizon x num samples x dim action].
+    initial_state: State
+        Starting states for the interaction.
+        The dimensions are [num samples x dim state].
+    termination_model: Callable, optional.
+        Termination condition. The rewards after termination are masked.
+    gamma: float, optional (default=1.0).
+        Discount factor.
+    terminal_reward: Callable, optional.
+        Reward of the final state, discounted by gamma ** horizon. The samples that
+        are done do not get the terminal reward.
+
+    Returns
+    -------
+    returns: Tensor
+        Discounted returns with dimensions [num samples x dim reward].
+    """
+    state = initial_state
+    done = torch.full(state.shape[:-1], False, dtype=torch.bool)
+    returns, discount = 0.0, 1.0
+
+    for action in action_sequence:
+        next_state = sample_model(dynamical_model, state, action)
+        reward = sample_model(reward_model, state, action, next_state)
+        not_done = (~broadcast_to_tensor(done, target_tensor=reward)).float()
+        returns = returns + discount * not_done * reward
+
+        if termination_model is not None:
+            done_ = sample_model(termination_model, state, action, next_state)
+            done = done | done_.bool()
+
+        state = next_state
+        discount = discount * gamma
+        if torch.all(done):
+            break
+
+    if terminal_reward:  # discounted by the number of steps taken, unless done.
+        terminal = terminal_reward(state)
+        not_done = (~broadcast_to_tensor(done, target_tensor=terminal)).float()
+        returns = returns + discount * not_done * terminal
+    return returns
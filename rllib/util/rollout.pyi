@@ -1,4 +1,4 @@
-from typing import Callable, List, Optional, Tuple, Union
+from typing import Callable, List, Optional, Sequence, Tuple, Union
 
 from numpy import ndarray
 from torch import Tensor
@@ -8,8 +8,12 @@ from rllib.agent import AbstractAgent
 from rllib.dataset.datatypes import Action, Observation, State, Trajectory
 from rllib.dataset.experience_replay import ExperienceReplay
 from rllib.environment import AbstractEnvironment
+from rllib.environment.fake_environment import FakeEnvironment
 from rllib.model import AbstractModel
 from rllib.policy import AbstractPolicy
+from rllib.util.multiprocessing import EnvironmentPool
+from rllib.util.profiler import Profiler
+from rllib.util.training.agent_training import ParallelEvaluator
 
 def step_env(
     environment: AbstractEnvironment,
@@ -18,7 +22,29 @@ def step_env(
     action_scale: Action,
     pi: Optional[Distribution] = ...,
     render: bool = ...,
+    profiler: Optional[Profiler] = ...,
 ) -> Tuple[Observation, Union[int, ndarray], bool, dict]: ...
+def _get_observation(
+    state: Union[int, ndarray],
+    action: Union[int, ndarray],
+    reward: Union[float, ndarray],
+    next_state: Union[int, ndarray],
+    done: bool,
+    action_scale: Action,
+    pi: Optional[Distribution],
+) -> Observation: ...
+def step_envs(
+    environments: Union[List[AbstractEnvironment], EnvironmentPool],
+    state: List[Union[int, ndarray]],
+    action: ndarray,
+    action_scale: Action,
+    pi: Optional[Distribution] = ...,
+    indexes: Optional[Sequence[int]] = ...,
+) -> Tuple[List[Observation], List[Union[int, ndarray]], List[bool], List[dict]]: ...
+def reset_envs(
+    environments: Union[List[AbstractEnvironment], EnvironmentPool],
+    indexes: Sequence[int],
+) -> List[Union[int, ndarray]]: ...
 def step_model(
     dynamical_model: AbstractModel,
     reward_model: AbstractModel,
@@ -29,6 +55,13 @@ def step_model(
     action_scale: Action = 1.0,
     pi: Optional[Distribution] = ...,
 ) -> Tuple[Observation, Tensor, Tensor]: ...
+def step_fake_env(
+    environment: FakeEnvironment,
+    action: Tensor,
+    done: Tensor,
+    action_scale: Action = ...,
+    pi: Optional[Distribution] = ...,
+) -> Tuple[Observation, Tensor, Tensor, dict]: ...
 def record(
     environment: AbstractEnvironment,
     agent: AbstractAgent,
@@ -59,7 +92,26 @@ def rollout_agent(
     callbacks: Optional[
         List[Callable[[AbstractAgent, AbstractEnvironment, int], None]]
     ] = ...,
+    evaluator: Optional[ParallelEvaluator] = ...,
+) -> None: ...
+def observe_episode(
+    agent: AbstractAgent, trajectory: Trajectory, infos: List[dict]
+) -> None: ...
+def rollout_agent_vectorized(
+    environments: Union[List[AbstractEnvironment], EnvironmentPool],
+    agent: AbstractAgent,
+    num_episodes: int = ...,
+    max_steps: int = ...,
+    use_early_termination: bool = ...,
+    print_frequency: int = ...,
 ) -> None: ...
+def evaluate_policy_vectorized(
+    environments: Union[List[AbstractEnvironment], EnvironmentPool],
+    policy: AbstractPolicy,
+    num_episodes: int = ...,
+    max_steps: int = ...,
+    use_early_termination: bool = ...,
+) -> ndarray: ...
 def rollout_policy(
     environment: AbstractEnvironment,
     policy: AbstractPolicy,
@@ -68,6 +120,12 @@ def rollout_policy(
     render: bool = ...,
     memory: Optional[ExperienceReplay] = ...,
 ) -> List[Trajectory]: ...
+def rollout_policy_on_fake_env(
+    environment: FakeEnvironment,
+    policy: AbstractPolicy,
+    max_steps: int = ...,
+    memory: Optional[ExperienceReplay] = ...,
+) -> Trajectory: ...
 def rollout_model(
     dynamical_model: AbstractModel,
     reward_model: AbstractModel,
@@ -86,3 +144,12 @@ def rollout_actions(
     termination_model: Optional[AbstractModel] = ...,
     memory: Optional[ExperienceReplay] = ...,
 ) -> Trajectory: ...
+def rollout_actions_returns(
+    dynamical_model: AbstractModel,
+    reward_model: AbstractModel,
+    action_sequence: Action,
+    initial_state: State,
+    termination_model: Optional[AbstractModel] = ...,
+    gamma: float = ...,
+    terminal_reward: Optional[Callable[[Tensor], Tensor]] = ...,
+) -> Tensor: ...
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+import torch
+
+from rllib.environment.vectorized.util import rk4
+from rllib.util.integrators import RK4, RK45, Euler, SemiImplicitEuler
+
+
+def linear_ode(t, y, decay):
+    return -decay * y
+
+
+def oscillator(t, y):
+    return np.stack((y[..., 1], -y[..., 0]), -1)
+
+
+@pytest.fixture(params=[Euler, RK4, RK45, SemiImplicitEuler])
+def integrator(request):
+    return request.param()
+
+
+class TestIntegrators(object):
+    def test_batch_shape(self, integrator):
+        y0 = np.random.randn(4, 8, 2)
+        y = integrator.step(linear_ode, 0.0, y0, 0.01, 0.5)
+        assert y.shape == y0.shape
+
+        y = integrator.integrate(linear_ode, y0, np.linspace(0, 1, 11), 0.5)
+        assert y.shape == (11, 4, 8, 2)
+        np.testing.assert_allclose(y[0], y0)
+
+    def test_torch_numpy_equality(self, integrator):
+        y0 = np.random.randn(8, 2)
+        np_y = integrator.step(linear_ode, 0.0, y0, 0.1, 0.5)
+        torch_y = integrator.step(linear_ode, 0.0, torch.tensor(y0), 0.1, 0.5)
+        np.testing.assert_allclose(torch_y.numpy(), np_y)
+
+    def test_gradient(self, integrator):
+        y0 = torch.randn(8, 2, requires_grad=True)
+        integrator.step(linear_ode, 0.0, y0, 0.1, 0.5).sum().backward()
+        assert y0.grad.shape == y0.shape
+
+        integrator.differentiable = False
+        assert not integrator.step(linear_ode, 0.0, y0, 0.1, 0.5).requires_grad
+
+    def test_accuracy(self, integrator):
+        y0 = np.random.randn(8, 2)
+        t = np.linspace(0, 1, 101)
+        y = integrator.integrate(linear_ode, y0, t, 0.5)
+        error = np.abs(y[-1] - y0 * np.exp(-0.5)).max()
+        tolerance = {Euler: 1e-2, SemiImplicitEuler: 1e-2, RK4: 1e-8, RK45: 1e-4}
+        assert error < tolerance[type(integrator)]
+
+
+def test_rk45_sub_steps():
+    integrator = RK45(rtol=1e-8, atol=1e-10)
+    y0 = np.random.randn(8, 2)
+    y = integrator.step(linear_ode, 0.0, y0, 1.0, 5.0)
+    np.testing.assert_allclose(y, y0 * np.exp(-5.0), rtol=1e-6)
+
+
+def test_rk45_max_sub_steps():
+    integrator = RK45(max_sub_steps=3)
+    with pytest.raises(RuntimeError, match="max_sub_steps"):
+        integrator.step(lambda t, y: -50 * y, 0.0, np.ones(2), 10.0)
+
+
+def test_semi_implicit_euler_energy():
+    t = 0.1 * np.arange(1000)
+    y = SemiImplicitEuler().integrate(oscillator, np.array([1.0, 0.0]), t)
+    energy = (y ** 2).sum(-1)
+    assert np.abs(energy - 1).max() < 0.2
+
+    y = Euler().integrate(oscillator, np.array([1.0, 0.0]), t)
+    energy = (y ** 2).sum(-1)
+    assert np.abs(energy - 1).max() > 1.0
+
+
+def test_vectorized_rk4():
+    y0 = np.random.randn(8, 2)
+    t = np.linspace(0, 1, 11)
+    y = rk4(lambda y_, t_, decay: linear_ode(t_, y_, decay), y0, t, 0.5)
+    np.testing.assert_allclose(y, RK4().integrate(linear_ode, y0, t, 0.5))
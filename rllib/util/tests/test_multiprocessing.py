@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+import torch
+
+from rllib.environment import GymEnvironment
+from rllib.util.multiprocessing import EnvironmentPool, modify_parallel
+
+
+@pytest.fixture(params=["Pendulum-v1", "CartPole-v0", "Taxi-v3"])
+def environment_name(request):
+    return request.param
+
+
+def _set_value(tensor, index, value):
+    tensor[index] = value
+
+
+def test_modify_parallel():
+    tensor = torch.zeros(3).share_memory_()
+    modify_parallel(_set_value, [(tensor, i, i + 1.0) for i in range(3)], num_cpu=2)
+    np.testing.assert_array_equal(tensor.numpy(), [1.0, 2.0, 3.0])
+
+
+def test_environment_pool(environment_name):
+    num_environments = 3
+    environments = [
+        GymEnvironment(environment_name, seed=i) for i in range(num_environments)
+    ]
+    local = [GymEnvironment(environment_name, seed=i) for i in range(num_environments)]
+    with EnvironmentPool(environments, num_workers=2) as pool:
+        assert len(pool) == num_environments
+        state = pool.reset()
+        np.testing.assert_allclose(
+            state, np.stack([env.reset() for env in local]), rtol=1e-6
+        )
+
+        for _ in range(5):
+            action = np.stack([env.action_space.sample() for env in local])
+            next_state, reward, done, infos = pool.step(action)
+            assert len(infos) == num_environments
+            for i, env in enumerate(local):
+                next_state_, reward_, done_, _ = env.step(action[i])
+                np.testing.assert_allclose(next_state[i], next_state_, rtol=1e-6)
+                np.testing.assert_allclose(reward[i], reward_, rtol=1e-6)
+                assert done[i] == done_
+
+        state = pool.reset([1])
+        np.testing.assert_allclose(state[0], local[1].reset(), rtol=1e-6)
+
+
+class FailingEnvironment(GymEnvironment):
+    def step(self, action):
+        raise RuntimeError("step failed")
+
+
+def test_environment_pool_error():
+    environments = [FailingEnvironment("Pendulum-v1", seed=0)]
+    environments += [GymEnvironment("Pendulum-v1", seed=i) for i in range(1, 3)]
+    with EnvironmentPool(environments, num_workers=2) as pool:
+        pool.reset()
+        action = np.zeros((3, 1))
+        with pytest.raises(RuntimeError):
+            pool.step(action)
+        # The replies of the other workers are received, so later requests work.
+        assert not any(pipe.poll(0.1) for pipe in pool._pipes)
+        local = GymEnvironment("Pendulum-v1", seed=2)
+        local.reset()
+        state = pool.reset([2])
+        np.testing.assert_allclose(state[0], local.reset(), rtol=1e-6)
+
+
+class TypeErrorEnvironment(GymEnvironment):
+    def step(self, action):
+        raise TypeError("step failed")
+
+
+def test_environment_pool_type_error():
+    # A TypeError of the environment is raised, the step is not retried.
+    environments = [TypeErrorEnvironment("Pendulum-v1", seed=0)]
+    with EnvironmentPool(environments, num_workers=1) as pool:
+        pool.reset()
+        with pytest.raises(TypeError, match="step failed"):
+            pool.step(np.zeros((1, 1)))
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from rllib.environment import GymEnvironment
+from rllib.util.logger import Logger
+from rllib.util.profiler import Profiler
+from rllib.util.rollout import step_env
+
+
+@pytest.fixture(params=[True, False])
+def tensorboard(request):
+    return request.param
+
+
+def test_disabled():
+    profiler = Profiler()
+    with profiler.section("act"):
+        pass
+    profiler.add_steps(10)
+    assert profiler.summary() == {}
+    assert profiler.section("act") is profiler.section("observe")
+
+
+def test_sections():
+    profiler = Profiler(enabled=True)
+    for _ in range(3):
+        with profiler.section("act"):
+            time.sleep(0.01)
+        with profiler.section("env_step"):
+            pass
+        profiler.add_steps()
+
+    assert len(profiler.times["act"]) == 3
+    assert len(profiler.times["env_step"]) == 3
+    summary = profiler.summary()
+    assert summary["time_act"] >= 0.01
+    assert summary["time_act"] > summary["time_env_step"]
+    assert 0 < summary["steps_per_sec"] < 100
+
+    profiler.reset()
+    assert profiler.summary() == {}
+
+
+def test_log(tensorboard, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    logger = Logger("profiler", tensorboard=tensorboard)
+    profiler = Profiler(enabled=True)
+    with profiler.section("act"):
+        pass
+    profiler.add_steps()
+    profiler.log(logger)
+    logger.end_episode()
+
+    assert len(logger.get("time_act")) == 1
+    assert len(logger.get("steps_per_sec")) == 1
+    assert profiler.summary() == {}
+
+
+def test_step_env():
+    environment = GymEnvironment("Pendulum-v1")
+    state = environment.reset()
+    profiler = Profiler(enabled=True)
+    action = environment.action_space.sample()
+    step_env(environment, state, action, 1.0, profiler=profiler)
+
+    assert set(profiler.times.keys()) == {"env_step", "observation"}
@@ -1,10 +1,30 @@
+import numpy as np
 import pytest
+import torch
 
 from rllib.agent import RandomAgent
+from rllib.dataset.utilities import stack_list_of_tuples
 from rllib.environment import GymEnvironment
+from rllib.environment.fake_environment import FakeEnvironment
 from rllib.environment.mdps import EasyGridWorld
+from rllib.model import LinearModel
 from rllib.policy import RandomPolicy
-from rllib.util.rollout import rollout_agent, rollout_policy
+from rllib.reward.quadratic_reward import QuadraticReward
+from rllib.util.logger import Logger
+from rllib.util.multiprocessing import EnvironmentPool
+from rllib.util.neural_networks.utilities import to_torch
+from rllib.util.rollout import (
+    evaluate_policy_vectorized,
+    rollout_actions,
+    rollout_actions_returns,
+    rollout_agent,
+    rollout_agent_vectorized,
+    rollout_policy,
+    step_envs,
+)
+from rllib.util.training.agent_training import ParallelEvaluator
+from rllib.util.utilities import tensor_to_distribution
+from rllib.util.value_estimation import discount_sum
 
 
 @pytest.fixture(
@@ -37,3 +57,167 @@ def test_rollout_easy_grid_world():
 
     policy = agent.policy
     rollout_policy(environment, policy)
+
+
+def test_step_envs(environment):
+    environments = [environment] + [GymEnvironment(environment.name) for _ in range(2)]
+    policy = RandomPolicy(
+        environment.dim_state,
+        environment.dim_action,
+        num_actions=environment.num_actions,
+    )
+    state = np.stack([env.reset() for env in environments])
+    pi = tensor_to_distribution(policy(to_torch(state)), **policy.dist_params)
+    action = pi.sample()
+    if not policy.discrete_action:
+        action = policy.action_scale * action.clamp(-1.0, 1.0)
+
+    observations, next_states, dones, infos = step_envs(
+        environments, state, action.numpy(), policy.action_scale, pi
+    )
+    assert len(observations) == len(next_states) == len(dones) == len(environments)
+    for i, observation in enumerate(observations):
+        np.testing.assert_allclose(observation.state, state[i])
+        assert observation.log_prob_action.shape == ()
+        assert observation.entropy.shape == ()
+
+
+def test_rollout_policy_fake_env():
+    dim_state, dim_action, num_particles = 2, 1, 16
+    initial_state = torch.randn(num_particles, dim_state)
+    environment = FakeEnvironment(
+        dynamical_model=LinearModel(torch.eye(dim_state), torch.ones(dim_state, 1)),
+        reward_model=QuadraticReward(torch.eye(dim_state), torch.eye(dim_action)),
+        initial_state_fn=lambda: initial_state,
+    )
+    policy = RandomPolicy((dim_state,), (dim_action,))
+    trajectory = rollout_policy(environment, policy, max_steps=10)[0]
+
+    assert len(trajectory) == 10
+    assert environment.time == 10
+    assert trajectory[0].state.shape == (num_particles, dim_state)
+    assert trajectory[0].action.shape == (num_particles, dim_action)
+    assert trajectory[0].entropy.shape == (num_particles,)
+    for observation, next_observation in zip(trajectory[:-1], trajectory[1:]):
+        torch.testing.assert_close(observation.next_state, next_observation.state)
+    returns = torch.stack([observation.reward for observation in trajectory]).sum(0)
+    assert returns.shape == (num_particles,)
+
+
+def test_evaluate_policy_vectorized(environment):
+    environments = [environment] + [GymEnvironment(environment.name) for _ in range(2)]
+    policy = RandomPolicy(
+        environment.dim_state,
+        environment.dim_action,
+        num_actions=environment.num_actions,
+    )
+    returns = evaluate_policy_vectorized(
+        environments, policy, num_episodes=5, max_steps=10
+    )
+    assert returns.shape == (5, environment.dim_reward[0])
+
+    with EnvironmentPool(environments, num_workers=2) as pool:
+        pool_returns = evaluate_policy_vectorized(
+            pool, policy, num_episodes=5, max_steps=10
+        )
+    assert pool_returns.shape == returns.shape
+
+
+def test_evaluate_policy_vectorized_type_error():
+    class TypeErrorEnvironment(GymEnvironment):
+        def step(self, action):
+            self.num_steps = getattr(self, "num_steps", 0) + 1
+            raise TypeError("step failed")
+
+    environment = TypeErrorEnvironment("Pendulum-v1")
+    policy = RandomPolicy(environment.dim_state, environment.dim_action)
+    with pytest.raises(TypeError, match="step failed"):
+        evaluate_policy_vectorized([environment], policy, max_steps=10)
+    assert environment.num_steps == 1
+
+
+def test_rollout_agent_vectorized_profile(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    environments = [GymEnvironment("Pendulum-v1") for _ in range(2)]
+    agent = RandomAgent.default(environments[0], profile=True)
+    agent.logger = Logger("profile")
+    rollout_agent_vectorized(environments, agent, num_episodes=3, max_steps=10)
+
+    # The profile is logged and reset at the end of each episode. The environments
+    # finish together, so the steps are logged at the end of the first episode.
+    assert len(agent.logger.get("time_observe")) == 3
+    for key in ["time_act", "time_env_step", "steps_per_sec"]:
+        assert len(agent.logger.get(key)) == 2
+    assert "steps_per_sec" not in agent.profiler.summary()
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_parallel_evaluator(background, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    environments = [GymEnvironment("Pendulum-v1") for _ in range(2)]
+    agent = RandomAgent.default(environments[0])
+    agent.logger = Logger("evaluator")
+    evaluator = ParallelEvaluator(environments, num_episodes=3, max_steps=10)
+
+    returns = evaluator.evaluate(agent, background=background)
+    assert (returns is None) == background
+    returns = evaluator.wait(agent)
+    assert returns.shape == (3, 1)
+    assert agent.logger.all["eval_return_mean-0"] == [returns.mean()]
+    assert agent.logger.all["eval_return_std-0"] == [returns.std()]
+
+
+@pytest.mark.parametrize("gamma", [1.0, 0.9])
+def test_rollout_actions_returns(gamma):
+    dynamical_model = LinearModel(0.9 * torch.eye(2), torch.ones(2, 1))
+    reward_model = QuadraticReward(torch.eye(2), torch.eye(1))
+    action_sequence = torch.randn(10, 8, 4, 1)
+    state = torch.randn(8, 4, 2)
+
+    trajectory = stack_list_of_tuples(
+        rollout_actions(dynamical_model, reward_model, action_sequence, state), dim=-2
+    )
+    expected = discount_sum(trajectory.reward, gamma)
+    expected = expected + gamma ** 10 * trajectory.next_state[..., -1, :].sum(-1)
+
+    returns = rollout_actions_returns(
+        dynamical_model,
+        reward_model,
+        action_sequence,
+        state,
+        gamma=gamma,
+        terminal_reward=lambda x: x.sum(-1),
+    )
+    assert returns.shape == expected.shape == (8, 4)
+    torch.testing.assert_close(returns, expected)
+
+
+@pytest.mark.parametrize("num_done", [2, 4])
+def test_rollout_actions_returns_termination(num_done):
+    gamma = 0.9
+    dynamical_model = LinearModel(0.9 * torch.eye(2), torch.ones(2, 1))
+    reward_model = QuadraticReward(torch.eye(2), torch.eye(1))
+    action_sequence = torch.randn(10, 8, 4, 1)
+    state = torch.randn(8, 4, 2)
+    done = torch.arange(4) < num_done  # these samples are done after the first step.
+
+    def termination_model(state, action, next_state):
+        return torch.distributions.Bernoulli(probs=done.float())
+
+    trajectory = stack_list_of_tuples(
+        rollout_actions(dynamical_model, reward_model, action_sequence, state), dim=-2
+    )
+    expected = discount_sum(trajectory.reward, gamma)
+    expected = expected + gamma ** 10 * trajectory.next_state[..., -1, :].sum(-1)
+    expected = torch.where(done, trajectory.reward[..., 0, :], expected)
+
+    returns = rollout_actions_returns(
+        dynamical_model,
+        reward_model,
+        action_sequence,
+        state,
+        termination_model=termination_model,
+        gamma=gamma,
+        terminal_reward=lambda x: x.sum(-1),
+    )
+    torch.testing.assert_close(returns, expected)
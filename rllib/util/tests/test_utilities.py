@@ -6,6 +6,7 @@ from torch.distributions import Categorical, MultivariateNormal, kl_divergence
 
 from rllib.util.distributions import Delta
 from rllib.util.utilities import (
+    deterministic_sample,
     get_backend,
     integrate,
     mellow_max,
@@ -23,6 +24,17 @@ class TestGetBackend(object):
             get_backend([1, 2, 3])
 
 
+class TestDeterministicSample(object):
+    def test_discrete_distribution(self):
+        d = Categorical(torch.tensor([[0.1, 0.6, 0.3], [0.5, 0.2, 0.3]]))
+        torch.testing.assert_close(deterministic_sample(d), torch.tensor([1, 0]))
+
+    def test_continuous_distribution(self):
+        mean = torch.randn(4, 2)
+        d = MultivariateNormal(mean, torch.eye(2))
+        torch.testing.assert_close(deterministic_sample(d), mean)
+
+
 class TestIntegrate(object):
     def test_discrete_distribution(self):
         d = Categorical(torch.tensor([0.1, 0.2, 0.3, 0.4]))
@@ -3,9 +3,13 @@ try:
     import matplotlib.pyplot as plt
 except ImportError:
     pass  # If there is an import error it should not be used.
+import copy
+import threading
+
 import numpy as np
 
-from rllib.util.rollout import rollout_agent
+from rllib.util.multiprocessing import EnvironmentPool
+from rllib.util.rollout import evaluate_policy_vectorized, rollout_agent
 
 from .utilities import Evaluate
 
@@ -36,18 +40,38 @@ def train_agent(agent, environment, plot_flag=True, *args, **kwargs):
     print(agent)
 
 
-def evaluate_agent(agent, environment, num_episodes, max_steps, render=True, use_early_termination=True):
+def evaluate_agent(
+    agent,
+    environment,
+    num_episodes,
+    max_steps,
+    render=True,
+    use_early_termination=True,
+):
     """Evaluate an agent in an environment.
 
     Parameters
     ----------
     agent: AbstractAgent
-    environment: AbstractEnvironment
+    environment: AbstractEnvironment or List[AbstractEnvironment] or EnvironmentPool
+        If a list of environment copies or an `EnvironmentPool' is given, the
+        episodes run in parallel with a `ParallelEvaluator' and are not rendered.
     num_episodes: int
     max_steps: int
     render: bool
     use_early_termination: bool
     """
+    if isinstance(environment, (list, tuple, EnvironmentPool)):
+        evaluator = ParallelEvaluator(
+            environment,
+            num_episodes=num_episodes,
+            max_steps=max_steps,
+            use_early_termination=use_early_termination,
+        )
+        returns = evaluator.evaluate(agent)[:, 0].mean()
+        print(f"Test Cumulative Rewards: {returns}")
+        return
+
     with Evaluate(agent):
         rollout_agent(
             environment,
@@ -55,7 +79,121 @@ def evaluate_agent(agent, environment, num_episodes, max_steps, render=True, use
             max_steps=max_steps,
             num_episodes=num_episodes,
             render=render,
-            use_early_termination=use_early_termination
+            use_early_termination=use_early_termination,
         )
         returns = np.mean(agent.logger.get("eval_return-0")[-num_episodes:])
         print(f"Test Cumulative Rewards: {returns}")
+
+
+class ParallelEvaluator(object):
+    """Evaluate snapshots of the policy of an agent in a batch of environments.
+
+    Each evaluation copies the acting policy of the agent and runs `num_episodes'
+    deterministic episodes in lockstep with `evaluate_policy_vectorized'. It can run
+    in a background thread, so that the agent keeps training with the original
+    policy. When an evaluation finishes, the mean and the standard deviation of the
+    returns are logged in the logger of the agent as `eval_return_mean-i' and
+    `eval_return_std-i', for each reward index i.
+
+    Parameters
+    ----------
+    environments: List[AbstractEnvironment] or EnvironmentPool
+        Copies of the environment in which to evaluate the agent.
+    num_episodes: int, optional.
+        Number of evaluation episodes. By default, one per environment.
+    max_steps: int, optional (default=1000).
+        Maximum number of steps per episode.
+    use_early_termination: bool, optional (default=True).
+        Flag that indicates whether an episode finishes when the environment is done.
+
+    Notes
+    -----
+    The results of a background evaluation are logged from the main thread, by the
+    next call to `wait' or `evaluate'. Hence, they are part of the statistics of the
+    episode during which they are collected.
+    """
+
+    def __init__(
+        self,
+        environments,
+        num_episodes=None,
+        max_steps=1000,
+        use_early_termination=True,
+    ):
+        self.environments = environments
+        self.num_episodes = len(environments) if num_episodes is None else num_episodes
+        self.max_steps = max_steps
+        self.use_early_termination = use_early_termination
+        self.returns = None
+        self._results = None
+        self._thread = None
+
+    def evaluate(self, agent, background=False):
+        """Evaluate a snapshot of the acting policy of the agent.
+
+        Parameters
+        ----------
+        agent: AbstractAgent
+        background: bool, optional (default=False).
+            Flag that indicates whether to run the evaluation in a background thread.
+
+        Returns
+        -------
+        returns: ndarray, optional.
+            Returns of each episode, with shape [num_episodes x dim_reward]. In
+            background, it returns None and the returns are stored in `returns' by
+            `wait'.
+        """
+        self.wait(agent)
+        policy = copy.deepcopy(agent.acting_policy)
+        if isinstance(self.environments, EnvironmentPool):
+            policy.set_goal(self.environments.goal)
+        else:
+            policy.set_goal(self.environments[0].goal)
+
+        if background:
+            self._thread = threading.Thread(target=self._run, args=(policy,))
+            self._thread.start()
+            return None
+        self._run(policy)
+        return self.wait(agent)
+
+    def wait(self, agent, block=True):
+        """Wait for the running evaluation and log its results.
+
+        Parameters
+        ----------
+        agent: AbstractAgent
+        block: bool, optional (default=True).
+            Flag that indicates whether to wait until the evaluation finishes. If
+            False, the results are only logged if the evaluation already finished.
+
+        Returns
+        -------
+        returns: ndarray, optional.
+            Returns of the last finished evaluation.
+        """
+        if self._thread is not None:
+            if not block and self._thread.is_alive():
+                return self.returns
+            self._thread.join()
+            self._thread = None
+
+        if self._results is not None:
+            self.returns, self._results = self._results, None
+            mean, std = self.returns.mean(0), self.returns.std(0)
+            for i in range(len(mean)):
+                agent.logger.update(
+                    **{f"eval_return_mean-{i}": mean[i], f"eval_return_std-{i}": std[i]}
+                )
+        return self.returns
+
+    def _run(self, policy):
+        """Run the evaluation episodes with the policy snapshot."""
+        self._results = evaluate_policy_vectorized(
+            self.environments,
+            policy,
+            num_episodes=self.num_episodes,
+            max_steps=self.max_steps,
+            use_early_termination=self.use_early_termination,
+        )
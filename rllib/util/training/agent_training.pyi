@@ -1,9 +1,13 @@
-from typing import Any
+from threading import Thread
+from typing import Any, List, Optional, Union
 
 import torch.nn as nn
+from numpy import ndarray
 
 from rllib.agent import AbstractAgent
 from rllib.environment import AbstractEnvironment
+from rllib.policy import AbstractPolicy
+from rllib.util.multiprocessing import EnvironmentPool
 
 def train_agent(
     agent: AbstractAgent,
@@ -14,8 +18,30 @@ def train_agent(
 ) -> None: ...
 def evaluate_agent(
     agent: AbstractAgent,
-    environment: AbstractEnvironment,
+    environment: Union[AbstractEnvironment, List[AbstractEnvironment], EnvironmentPool],
     num_episodes: int,
     max_steps: int,
     render: bool = ...,
+    use_early_termination: bool = ...,
 ) -> None: ...
+
+class ParallelEvaluator(object):
+    environments: Union[List[AbstractEnvironment], EnvironmentPool]
+    num_episodes: int
+    max_steps: int
+    use_early_termination: bool
+    returns: Optional[ndarray]
+    _results: Optional[ndarray]
+    _thread: Optional[Thread]
+    def __init__(
+        self,
+        environments: Union[List[AbstractEnvironment], EnvironmentPool],
+        num_episodes: Optional[int] = ...,
+        max_steps: int = ...,
+        use_early_termination: bool = ...,
+    ) -> None: ...
+    def evaluate(
+        self, agent: AbstractAgent, background: bool = ...
+    ) -> Optional[ndarray]: ...
+    def wait(self, agent: AbstractAgent, block: bool = ...) -> Optional[ndarray]: ...
+    def _run(self, policy: AbstractPolicy) -> None: ...
@@ -15,6 +15,7 @@ from rllib.util.utilities import tensor_to_distribution
 
 from .utilities import (
     calibration_score,
+    ensemble_model_loss,
     get_model_validation_score,
     model_loss,
     sharpness,
@@ -34,7 +35,24 @@ def train_nn_step(model, observation, optimizer, weight=1.0, dynamical_model=Non
 
 
 def train_ensemble_step(model, observation, optimizer, mask, dynamical_model=None):
-    """Train a model ensemble."""
+    """Train a model ensemble.
+
+    The heads of an ensemble with independent heads are trained at once, by weighting
+    the loss of each head with its bootstrap mask. Otherwise, the heads share layers
+    and are trained one after the other.
+    """
+    if getattr(model, "independent_heads", False):
+        optimizer.zero_grad()
+        with PredictionStrategy(model, prediction_strategy="multi_head"):
+            loss = ensemble_model_loss(
+                model, observation, dynamical_model=dynamical_model
+            )
+        # Add up the heads, so that each head gets the gradient of its own loss.
+        ensemble_loss = (mask * loss).mean(0).sum()
+        ensemble_loss.backward()
+        optimizer.step()
+        return ensemble_loss / model.num_heads
+
     ensemble_loss = 0
 
     model_list = list(range(model.num_heads))
@@ -0,0 +1,81 @@
+import pytest
+import torch
+
+from rllib.dataset.datatypes import Observation
+from rllib.model import EnsembleModel
+from rllib.model.utilities import PredictionStrategy
+from rllib.util.training.model_learning import train_ensemble_step
+from rllib.util.training.utilities import _ensemble_loss, _loss, ensemble_model_loss
+
+BATCH_SIZE = 16
+NUM_HEADS = 3
+DIM_STATE, DIM_ACTION = 4, 2
+
+
+@pytest.fixture(params=[True, False])
+def deterministic(request):
+    return request.param
+
+
+def get_observation(batch_size=BATCH_SIZE, time=2):
+    return Observation(
+        state=torch.randn(batch_size, time, DIM_STATE),
+        action=torch.randn(batch_size, time, DIM_ACTION),
+        next_state=torch.randn(batch_size, time, DIM_STATE),
+    )
+
+
+def test_ensemble_loss(deterministic):
+    mean = torch.randn(BATCH_SIZE, 2, NUM_HEADS, DIM_STATE)
+    scale_tril = torch.randn(BATCH_SIZE, 2, NUM_HEADS, DIM_STATE, DIM_STATE).tril()
+    scale_tril.diagonal(dim1=-2, dim2=-1).copy_(torch.rand(DIM_STATE) + 0.5)
+    if deterministic:
+        scale_tril = torch.zeros_like(scale_tril)
+    target = torch.randn(BATCH_SIZE, 2, DIM_STATE)
+
+    loss = _ensemble_loss((mean, scale_tril), target)
+    assert loss.shape == (BATCH_SIZE, NUM_HEADS)
+    for i in range(NUM_HEADS):
+        head_loss = _loss((mean[..., i, :], scale_tril[..., i, :, :]), target)
+        torch.testing.assert_close(loss[:, i], head_loss)
+
+
+def test_ensemble_cross_entropy_loss():
+    logits = torch.randn(BATCH_SIZE, NUM_HEADS, 3)
+    target = torch.randint(3, (BATCH_SIZE,))
+
+    loss = _ensemble_loss((logits,), target)
+    assert loss.shape == (BATCH_SIZE, NUM_HEADS)
+    for i in range(NUM_HEADS):
+        torch.testing.assert_close(loss[:, i], _loss((logits[:, i],), target))
+
+
+def test_train_ensemble_step(deterministic):
+    torch.manual_seed(0)
+    model = EnsembleModel(
+        dim_state=(DIM_STATE,),
+        dim_action=(DIM_ACTION,),
+        num_heads=NUM_HEADS,
+        deterministic=deterministic,
+        independent_heads=True,
+        layers=[16],
+    )
+    observation = get_observation()
+    mask = torch.randint(2, (BATCH_SIZE, NUM_HEADS)).float()
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.0)
+
+    loss = train_ensemble_step(model, observation, optimizer, mask)
+    grads = [param.grad for param in model.parameters()]
+
+    # Each head gets the gradient of its own loss, not scaled by the number of heads.
+    with PredictionStrategy(model, prediction_strategy="multi_head"):
+        head_losses = ensemble_model_loss(model, observation)
+    for i in range(NUM_HEADS):
+        model.zero_grad()
+        (mask[:, i] * head_losses[:, i]).mean().backward(retain_graph=True)
+        for param, grad in zip(model.parameters(), grads):
+            if grad is not None:
+                torch.testing.assert_close(grad[i], param.grad[i])
+
+    # The logged loss is the average of the head losses.
+    torch.testing.assert_close(loss, (mask * head_losses).mean())
@@ -157,6 +157,31 @@ def _loss(prediction, target):
     return loss
 
 
+def ensemble_model_loss(model, observation, dynamical_model=None):
+    """Get the loss of each head of an ensemble with a `multi_head' prediction.
+
+    Returns
+    -------
+    loss: Tensor
+        Loss of each head, of size [batch_size x num_heads].
+    """
+    target = get_target(model, observation)
+    prediction = get_prediction(model, observation, dynamical_model)
+    return _ensemble_loss(prediction, target)
+
+
+def _ensemble_loss(prediction, target):
+    """Compute `_loss' for the prediction of each head, stacked in the last dim."""
+    if len(prediction) == 1:
+        heads = prediction[0].unbind(-2)
+        head_predictions = [(logits,) for logits in heads]
+    else:
+        head_predictions = zip(prediction[0].unbind(-2), prediction[1].unbind(-3))
+    return torch.stack(
+        [_loss(head_prediction, target) for head_prediction in head_predictions], -1
+    )
+
+
 def rollout_predictions(dynamical_model, model, initial_state, action_sequence):
     """Rollout a sequence of predictions using a dynamical model."""
     state = initial_state
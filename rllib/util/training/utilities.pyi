@@ -37,6 +37,11 @@ def model_loss(
     observation: Observation,
     dynamical_model: Optional[AbstractModel] = ...,
 ) -> Tensor: ...
+def ensemble_model_loss(
+    model: AbstractModel,
+    observation: Observation,
+    dynamical_model: Optional[AbstractModel] = ...,
+) -> Tensor: ...
 def rollout_predictions(
     dynamical_model: AbstractModel,
     model: AbstractModel,
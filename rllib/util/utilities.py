@@ -415,3 +415,34 @@ def sample_action(policy, state):
     else:
         action = pi.sample()
     return action
+
+
+def deterministic_sample(pi):
+    """Get the mode of a discrete distribution and the mean of a continuous one.
+
+    If the mean is not implemented, it is estimated with 100 samples.
+    """
+    if pi.has_enumerate_support:
+        return torch.argmax(pi.probs, dim=-1)
+    try:
+        return pi.mean
+    except NotImplementedError:
+        return pi.sample((100,)).mean(dim=0)
+
+
+def deterministic_action(policy, state):
+    """Get the deterministic action of a policy, as the agents do in evaluation mode.
+
+    The action is the `deterministic_sample' of the policy distribution.
+
+    Parameters
+    ----------
+    policy: AbstractPolicy.
+    state: Tensor.
+    """
+    action = deterministic_sample(
+        tensor_to_distribution(policy(state), **policy.dist_params)
+    )
+    if not policy.discrete_action:
+        action = policy.action_scale * action.clamp(-1.0, 1.0)
+    return action
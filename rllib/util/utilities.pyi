@@ -49,6 +49,8 @@ class MovingAverage(object):
 
 def moving_average_filter(x: Array, y: Array, horizon: int) -> Array: ...
 def sample_action(policy: AbstractPolicy, state: Tensor) -> Tensor: ...
+def deterministic_sample(pi: Distribution) -> Tensor: ...
+def deterministic_action(policy: AbstractPolicy, state: Tensor) -> Tensor: ...
 
 class RewardTransformer(object):
     offset: float